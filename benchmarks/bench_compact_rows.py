@@ -0,0 +1,60 @@
+"""Compare memory held by dict rows and compact records for the orders list.
+
+Usage: python benchmarks/bench_compact_rows.py [rows]
+"""
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+os.environ["MECSIS_DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.db")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from mecsis.database.connection import database_manager  # noqa: E402
+from mecsis.services.orders import order_service  # noqa: E402
+
+
+def seed(rows: int) -> None:
+    with database_manager.get_connection() as conn:
+        conn.execute("INSERT INTO brands (name) VALUES ('Fiat')")
+        conn.execute("INSERT INTO vehicle_models (brand_id, name) VALUES (1, 'Uno')")
+        conn.execute("INSERT INTO clients (full_name, document) VALUES ('Cliente Benchmark', '00000000000')")
+        conn.execute(
+            "INSERT INTO vehicles (client_id, brand_id, model_id, license_plate) VALUES (1, 1, 1, 'BEN0001')"
+        )
+        conn.executemany(
+            "INSERT INTO orders (order_number, client_id, vehicle_id, summary, total_amount, expected_delivery) "
+            "VALUES (?, 1, 1, ?, ?, '2024-01-31')",
+            ((f"OS-2024-{index:06d}", f"Revisao completa {index}", index * 1.5) for index in range(rows)),
+        )
+
+
+def measure(compact: bool) -> int:
+    gc.collect()
+    tracemalloc.start()
+    records = order_service.list_summary(compact=compact)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(records) == ROWS
+    del records
+    return current
+
+
+def main() -> None:
+    seed(ROWS)
+    dict_bytes = measure(compact=False)
+    compact_bytes = measure(compact=True)
+    print(f"rows:            {ROWS}")
+    print(f"dict rows:       {dict_bytes / 1024 / 1024:8.1f} MB ({dict_bytes / ROWS:6.0f} B/row)")
+    print(f"compact records: {compact_bytes / 1024 / 1024:8.1f} MB ({compact_bytes / ROWS:6.0f} B/row)")
+    print(f"saved per row:   {(dict_bytes - compact_bytes) / ROWS:6.0f} B ({1 - compact_bytes / dict_bytes:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Multi-process contention test for several terminals sharing one mecsis.db.
+
+Each scenario seeds a fresh database, starts N worker processes against the same
+file and replays a mix of order operations at a fixed rate per worker. Latencies are
+measured from the scheduled start of each call, so a worker stuck behind a lock does
+not hide the calls it failed to issue on time.
+
+Usage:
+    python benchmarks/load_test.py --workers 1,2,4,8 --journal-modes delete,wal
+    python benchmarks/load_test.py --duration 30 --rate 5 --json resultados.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+DEFAULT_MIX = "get_full_order=35,search=25,get_counts=20,update_order=12,create_order=8"
+SEARCH_TERMS = ("OS-", "Cliente 1", "LDT", "Cliente 2", "00", "LDT1")
+# Mirrors utils.config.JOURNAL_MODES; the application ignores anything else.
+JOURNAL_MODES = ("delete", "wal")
+
+
+def _bootstrap(db_path: str, journal_mode: str) -> None:
+    # The database manager reads its settings on import, so the environment comes first.
+    os.environ["MECSIS_DB_PATH"] = db_path
+    os.environ["MECSIS_JOURNAL_MODE"] = journal_mode
+    os.environ["MECSIS_BACKUP_INTERVAL_HOURS"] = "0"
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def seed(db_path: str, journal_mode: str, clients: int, orders: int) -> None:
+    _bootstrap(db_path, journal_mode)
+    from mecsis.database.connection import database_manager
+    from mecsis.services.orders import order_service
+
+    with database_manager.get_connection() as conn:
+        conn.execute("INSERT INTO brands (name) VALUES ('Fiat')")
+        conn.execute("INSERT INTO vehicle_models (brand_id, name) VALUES (1, 'Uno')")
+        conn.executemany(
+            "INSERT INTO services (name, default_price) VALUES (?, ?)",
+            ((f"Servico {index}", 50.0 + index) for index in range(20)),
+        )
+        conn.executemany(
+            "INSERT INTO collaborators (full_name, document) VALUES (?, ?)",
+            ((f"Mecanico {index}", f"COL{index:04d}") for index in range(5)),
+        )
+        conn.executemany(
+            "INSERT INTO clients (full_name, document) VALUES (?, ?)",
+            ((f"Cliente {index}", f"{index:011d}") for index in range(1, clients + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO vehicles (client_id, brand_id, model_id, license_plate) VALUES (?, 1, 1, ?)",
+            ((index, f"LDT{index:04d}") for index in range(1, clients + 1)),
+        )
+    rng = random.Random(0)
+    for _ in range(orders):
+        client_id = rng.randint(1, clients)
+        order_service.create_order(_order_payload(rng, client_id), _order_items(rng), [rng.randint(1, 5)])
+
+
+def _order_payload(rng: random.Random, client_id: int) -> Dict[str, Any]:
+    return {
+        "client_id": client_id,
+        "vehicle_id": client_id,
+        "summary": f"Revisao {rng.randint(1, 9999)}",
+        "labor_cost": round(rng.uniform(50, 400), 2),
+        "status": rng.choice(("open", "in_progress", "waiting_parts", "completed")),
+        "expected_delivery": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+    }
+
+
+def _order_items(rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {"service_id": rng.randint(1, 20), "quantity": rng.randint(1, 3), "unit_price": round(rng.uniform(20, 300), 2)}
+        for _ in range(rng.randint(1, 4))
+    ]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"create_order", "update_order", "get_full_order", "search", "get_counts"}
+    if unknown:
+        raise SystemExit(f"Operacoes desconhecidas no mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def worker(
+    worker_id: int,
+    db_path: str,
+    journal_mode: str,
+    mix: Dict[str, float],
+    rate: float,
+    start_at: float,
+    duration: float,
+    clients: int,
+    results: "multiprocessing.Queue[Dict[str, Any]]",
+) -> None:
+    _bootstrap(db_path, journal_mode)
+    from mecsis.database.connection import is_lock_error
+    from mecsis.services.dashboard import dashboard_service
+    from mecsis.services.orders import order_service
+    from mecsis.utils.metrics import metrics
+
+    rng = random.Random(worker_id)
+    with sqlite3.connect(db_path) as conn:
+        max_order_id = conn.execute("SELECT MAX(id) FROM orders").fetchone()[0] or 1
+
+    def create_order() -> None:
+        nonlocal max_order_id
+        client_id = rng.randint(1, clients)
+        max_order_id = max(max_order_id, order_service.create_order(
+            _order_payload(rng, client_id), _order_items(rng), [rng.randint(1, 5)]
+        ))
+
+    def update_order() -> None:
+        order = order_service.get_full_order(rng.randint(1, max_order_id))
+        if not order:
+            return
+        payload = {"summary": f"Revisao {rng.randint(1, 9999)}", "labor_cost": round(rng.uniform(50, 400), 2)}
+        collaborators = [entry["collaborator_id"] for entry in order.get("collaborators", [])]
+        order_service.update_order(order["id"], payload, _order_items(rng), collaborators)
+
+    operations = {
+        "create_order": create_order,
+        "update_order": update_order,
+        "get_full_order": lambda: order_service.get_full_order(rng.randint(1, max_order_id)),
+        "search": lambda: order_service.search(rng.choice(SEARCH_TERMS), limit=50),
+        "get_counts": dashboard_service.get_counts,
+    }
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    busy_errors = 0
+    other_errors = 0
+
+    interval = 1.0 / rate if rate > 0 else 0.0
+    scheduled = start_at
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = start_at + duration
+    while True:
+        now = time.time()
+        if now >= deadline:
+            break
+        if interval and scheduled > now:
+            time.sleep(scheduled - now)
+        name = rng.choices(names, weights)[0]
+        issued_at = scheduled if interval else time.time()
+        try:
+            operations[name]()
+        except sqlite3.OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+            busy_errors += 1
+        except Exception:  # noqa: BLE001 - counted and reported, the run goes on
+            other_errors += 1
+        latencies[name].append((time.time() - issued_at) * 1000)
+        scheduled += interval
+
+    snapshot = metrics.snapshot()
+    results.put(
+        {
+            "latencies": latencies,
+            "busy_errors": busy_errors,
+            "other_errors": other_errors,
+            "write_retries": snapshot["counters"].get("db.write_retries", 0),
+            "lock_wait": snapshot["timings"].get("db.lock_wait", {}),
+        }
+    )
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_scenario(args: argparse.Namespace, journal_mode: str, workers: int, mix: Dict[str, float]) -> Dict[str, Any]:
+    scenario_dir = tempfile.mkdtemp(prefix="mecsis-load-")
+    try:
+        return _run_scenario(args, journal_mode, workers, mix, str(Path(scenario_dir) / "mecsis.db"))
+    finally:
+        shutil.rmtree(scenario_dir, ignore_errors=True)
+
+
+def _run_scenario(
+    args: argparse.Namespace,
+    journal_mode: str,
+    workers: int,
+    mix: Dict[str, float],
+    db_path: str,
+) -> Dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    seeder = context.Process(target=seed, args=(db_path, journal_mode, args.clients, args.orders))
+    seeder.start()
+    seeder.join()
+    if seeder.exitcode != 0:
+        raise SystemExit("Falha ao preparar o banco de teste.")
+
+    wal_path = Path(db_path + "-wal")
+    wal_start = wal_path.stat().st_size if wal_path.exists() else 0
+    results = context.Queue()
+    # Leave time for every process to import the application before the clock starts.
+    start_at = time.time() + 2.0
+    processes = [
+        context.Process(
+            target=worker,
+            args=(index, db_path, journal_mode, mix, args.rate, start_at, args.duration, args.clients, results),
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    wal_peak = wal_start
+    reports = []
+    while len(reports) < workers:
+        wal_peak = max(wal_peak, wal_path.stat().st_size if wal_path.exists() else 0)
+        try:
+            reports.append(results.get(timeout=0.2))
+        except Exception:  # noqa: BLE001 - queue.Empty, keep sampling the WAL
+            if not any(process.is_alive() for process in processes) and results.empty():
+                break
+    for process in processes:
+        process.join()
+    wal_end = wal_path.stat().st_size if wal_path.exists() else 0
+
+    per_operation: Dict[str, List[float]] = {name: [] for name in mix}
+    for report in reports:
+        for name, values in report["latencies"].items():
+            per_operation[name].extend(values)
+    every_call = [value for values in per_operation.values() for value in values]
+    return {
+        "journal_mode": journal_mode,
+        "workers": workers,
+        "workers_reported": len(reports),
+        "calls": len(every_call),
+        "throughput": len(every_call) / args.duration,
+        "p50_ms": percentile(every_call, 0.50),
+        "p95_ms": percentile(every_call, 0.95),
+        "p99_ms": percentile(every_call, 0.99),
+        "max_ms": max(every_call, default=0.0),
+        "busy_errors": sum(report["busy_errors"] for report in reports),
+        "other_errors": sum(report["other_errors"] for report in reports),
+        "write_retries": sum(report["write_retries"] for report in reports),
+        "wal_start_bytes": wal_start,
+        "wal_peak_bytes": wal_peak,
+        "wal_end_bytes": wal_end,
+        "operations": {
+            name: {
+                "calls": len(values),
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "p99_ms": percentile(values, 0.99),
+            }
+            for name, values in per_operation.items()
+        },
+    }
+
+
+def print_report(rows: Sequence[Dict[str, Any]]) -> None:
+    header = (
+        f"{'modo':<9}{'N':>4}{'chamadas':>10}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'ocupado':>9}{'outros':>8}{'retries':>9}{'WAL pico':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['journal_mode']:<9}{row['workers']:>4}{row['calls']:>10}{row['throughput']:>9.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            f"{row['busy_errors']:>9}{row['other_errors']:>8}{row['write_retries']:>9}{row['wal_peak_bytes'] / 1024 / 1024:>9.1f}MB"
+        )
+        for name, stats in row["operations"].items():
+            print(
+                f"{'':<13}{name:<16}{stats['calls']:>6} chamadas  "
+                f"p50 {stats['p50_ms']:7.1f}  p95 {stats['p95_ms']:7.1f}  p99 {stats['p99_ms']:7.1f} ms"
+            )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga com varias estacoes no mesmo banco.")
+    parser.add_argument("--workers", default="1,2,4,8", help="Quantidades de processos, separadas por virgula.")
+    parser.add_argument("--journal-modes", default="delete,wal", help="Modos de journal a comparar.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de carga por cenario.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Chamadas por segundo por processo (0 = sem limite).")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Pesos das operacoes, ex.: search=25,create_order=8.")
+    parser.add_argument("--clients", type=int, default=500, help="Clientes e veiculos no banco inicial.")
+    parser.add_argument("--orders", type=int, default=2000, help="Ordens de servico no banco inicial.")
+    parser.add_argument("--json", dest="json_path", help="Grava os resultados completos neste arquivo.")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    journal_modes = [mode.strip().lower() for mode in args.journal_modes.split(",") if mode.strip()]
+    unknown = set(journal_modes) - set(JOURNAL_MODES)
+    if unknown:
+        raise SystemExit(f"Modos de journal nao suportados: {', '.join(sorted(unknown))}")
+    rows = []
+    for journal_mode in journal_modes:
+        for workers in [int(value) for value in args.workers.split(",") if value.strip()]:
+            print(f"cenario: journal_mode={journal_mode} processos={workers} ...", flush=True)
+            rows.append(run_scenario(args, journal_mode, workers, mix))
+    print()
+    print_report(rows)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+        print(f"\nResultados gravados em {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
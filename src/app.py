@@ -8,9 +8,11 @@ from PySide6.QtGui import QIcon, QPalette, QColor
 from PySide6.QtWidgets import QApplication, QMessageBox
 
 from mecsis.database.connection import database_manager
+from mecsis.services.backup import BackupScheduler
+from mecsis.services.remote import RemoteService, RemoteServiceError
 from mecsis.ui.login_window import LoginWindow
 from mecsis.ui.styles import PALETTE, load_stylesheet
-from mecsis.utils.config import resource_path
+from mecsis.utils.config import get_server_token, get_server_url, resource_path
 
 
 def configure_palette(app: QApplication) -> None:
@@ -40,23 +42,49 @@ def main() -> int:
     if icon_path.exists():
         app.setWindowIcon(QIcon(str(icon_path)))
 
-    try:
-        database_manager.initialize()
-    except sqlite3.Error as exc:
-        QMessageBox.critical(
-            None,
-            "Erro ao preparar dados",
-            (
-                "Nao foi possivel inicializar o banco local do MEC-SIS.\n"
-                "Verifique se voce possui permissao de escrita na pasta do aplicativo.\n\n"
-                f"Detalhes tecnicos: {exc}"
-            ),
-        )
-        return 1
+    server_url = get_server_url()
+    backup_scheduler = None
+    if not server_url:
+        try:
+            database_manager.initialize()
+        except sqlite3.Error as exc:
+            QMessageBox.critical(
+                None,
+                "Erro ao preparar dados",
+                (
+                    "Nao foi possivel inicializar o banco local do MEC-SIS.\n"
+                    "Verifique se voce possui permissao de escrita na pasta do aplicativo.\n\n"
+                    f"Detalhes tecnicos: {exc}"
+                ),
+            )
+            return 1
+
+        # In client mode the server owns the database file and its backups.
+        backup_scheduler = BackupScheduler.from_config()
+        if backup_scheduler:
+            backup_scheduler.start()
+    else:
+        try:
+            RemoteService(server_url, get_server_token()).ping()
+        except (RemoteServiceError, PermissionError) as exc:
+            QMessageBox.critical(
+                None,
+                "Servidor indisponivel",
+                (
+                    f"Nao foi possivel conectar ao servidor do MEC-SIS em {server_url}.\n"
+                    "Verifique se o servidor esta em execucao e se o token de acesso esta correto.\n\n"
+                    f"Detalhes tecnicos: {exc}"
+                ),
+            )
+            return 1
 
     login = LoginWindow()
     login.show()
-    return app.exec()
+    try:
+        return app.exec()
+    finally:
+        if backup_scheduler:
+            backup_scheduler.stop(timeout=5)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .database.connection import database_manager
+from .utils.config import get_server_token
+
+
+def _cmd_import(args: argparse.Namespace) -> int:
+    from .services.imports import ImportService
+
+    service = ImportService(chunk_size=args.chunk_size)
+    importers = {
+        "clientes": service.import_clients,
+        "veiculos": service.import_vehicles,
+        "marcas": service.import_brands,
+        "modelos": service.import_models,
+    }
+    report = importers[args.entity](Path(args.file), Path(args.rejects) if args.rejects else None)
+    print(report.summary())
+    return 0 if report.inserted or not report.read else 1
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    from .services.exports import export_service
+
+    report = export_service.export_orders(
+        Path(args.file),
+        fmt=args.format,
+        start_date=args.start,
+        end_date=args.end,
+        statuses=args.status or None,
+        compress=True if args.gzip else None,
+    )
+    print(report.summary())
+    return 0
+
+
+def _cmd_backup(args: argparse.Namespace) -> int:
+    from .services.backup import BackupService
+
+    service = BackupService(
+        backup_dir=Path(args.dir) if args.dir else None,
+        pages_per_step=args.pages_per_step,
+        keep=args.keep,
+    )
+    print(service.run_backup().summary())
+    return 0
+
+
+def _cmd_archive(args: argparse.Namespace) -> int:
+    from .services.archive import archive_service
+
+    if args.full_vacuum:
+        archive_service.compact(full_conversion=True)
+    report = archive_service.archive_orders(args.before, statuses=args.status or ("completed", "cancelled"))
+    print(report.summary())
+    return 0
+
+
+def _cmd_revenue(args: argparse.Namespace) -> int:
+    from .services.reports import report_service
+
+    if args.rebuild:
+        print(report_service.rebuild(include_archives=not args.skip_archives).summary())
+    rows = report_service.revenue(args.start, args.end, period=args.period)
+    print(f"{'Periodo':<12} {'Ordens':>7} {'Faturamento':>13} {'Mao de obra':>13} {'Pecas':>13} {'Ticket medio':>13}")
+    for row in rows:
+        print(
+            f"{row['period']:<12} {row['orders']:>7} {row['revenue']:>13.2f} {row['labor']:>13.2f} "
+            f"{row['parts']:>13.2f} {row['average_ticket']:>13.2f}"
+        )
+    totals = report_service.summary(args.start, args.end)
+    print(
+        f"Total: {totals['orders']} ordens, {totals['revenue']:.2f} faturados, ticket medio {totals['average_ticket']:.2f}, "
+        f"mao de obra {totals['labor_share']:.0%} / pecas {totals['parts_share']:.0%}"
+    )
+    for row in report_service.revenue_by_payment_method(args.start, args.end):
+        print(f"  {row['payment_method']:<10} {row['orders']:>7} {row['revenue']:>13.2f}")
+    return 0
+
+
+def _cmd_commissions(args: argparse.Namespace) -> int:
+    from .services.collaborators import collaborator_service
+
+    rows = collaborator_service.period_commissions(args.period, refresh=args.refresh)
+    print(f"{'Colaborador':<30} {'Ordens':>7} {'Horas':>8} {'Mao de obra':>13} {'Valor hora':>12} {'Comissao':>11}")
+    for row in rows:
+        print(
+            f"{row['full_name'][:30]:<30} {row['orders']:>7} {row['hours']:>8.2f} {row['billed_labor']:>13.2f} "
+            f"{row['labor_pay']:>12.2f} {row['commission']:>11.2f}"
+        )
+    print(f"Total de comissoes em {args.period}: {sum(row['commission'] for row in rows):.2f}")
+    return 0
+
+
+def _cmd_duplicates(args: argparse.Namespace) -> int:
+    from .services.dedupe import dedupe_service
+
+    if args.merge:
+        keep_id, duplicate_id = args.merge
+        merge = dedupe_service.merge_clients if args.entity == "clientes" else dedupe_service.merge_vehicles
+        moved = merge(keep_id, duplicate_id)
+        details = ", ".join(f"{count} em {table}" for table, count in moved.items())
+        print(f"Registro {duplicate_id} mesclado em {keep_id} ({details}).")
+        return 0
+    finder = (
+        dedupe_service.find_client_duplicates if args.entity == "clientes" else dedupe_service.find_vehicle_duplicates
+    )
+    pairs = finder(min_score=args.min_score)
+    for pair in pairs[: args.limit]:
+        print(
+            f"{pair['score']:.2f}  #{pair['keep_id']} {pair['keep_label']}  <->  "
+            f"#{pair['duplicate_id']} {pair['duplicate_label']}  ({', '.join(pair['reasons']) or 'nome parecido'})"
+        )
+    print(f"{len(pairs)} pares candidatos.")
+    return 0
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    from .server import run_server
+
+    try:
+        run_server(args.host, args.port, args.pool, args.token or get_server_token())
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mecsis", description="Ferramentas de linha de comando do MEC-SIS.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("importar", help="Importa clientes, veiculos, marcas ou modelos de CSV/JSONL.")
+    import_parser.add_argument("entity", choices=["clientes", "veiculos", "marcas", "modelos"])
+    import_parser.add_argument("file", help="Arquivo .csv, .jsonl (ou .gz) de origem.")
+    import_parser.add_argument("--rejects", help="Arquivo para as linhas rejeitadas.")
+    import_parser.add_argument("--chunk-size", type=int, default=500, help="Linhas gravadas por transacao.")
+    import_parser.set_defaults(handler=_cmd_import)
+
+    export_parser = commands.add_parser("exportar", help="Exporta ordens de servico com itens e equipe.")
+    export_parser.add_argument("file", help="Arquivo de destino (.csv, .jsonl, com .gz opcional).")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"], help="Formato; padrao pela extensao.")
+    export_parser.add_argument("--inicio", dest="start", help="Data inicial (AAAA-MM-DD) de abertura.")
+    export_parser.add_argument("--fim", dest="end", help="Data final (AAAA-MM-DD) de abertura.")
+    export_parser.add_argument(
+        "--status",
+        action="append",
+        choices=["open", "in_progress", "waiting_parts", "completed", "cancelled"],
+        help="Filtra por status (pode repetir).",
+    )
+    export_parser.add_argument("--gzip", action="store_true", help="Compacta a saida com gzip.")
+    export_parser.set_defaults(handler=_cmd_export)
+
+    backup_parser = commands.add_parser("backup", help="Gera um backup compactado e verificado do banco.")
+    backup_parser.add_argument("--dir", help="Pasta de destino; padrao data/backups ou MECSIS_BACKUP_DIR.")
+    backup_parser.add_argument("--pages-per-step", type=int, help="Paginas copiadas por etapa.")
+    backup_parser.add_argument("--keep", type=int, help="Quantidade de backups mantidos na rotacao.")
+    backup_parser.set_defaults(handler=_cmd_backup)
+
+    archive_parser = commands.add_parser("arquivar", help="Move ordens antigas para bancos de arquivo anuais.")
+    archive_parser.add_argument("--antes-de", dest="before", required=True, help="Data de corte (AAAA-MM-DD).")
+    archive_parser.add_argument(
+        "--status",
+        action="append",
+        choices=["completed", "cancelled"],
+        help="Status arquivados (padrao: concluidas e canceladas).",
+    )
+    archive_parser.add_argument(
+        "--compactar-completo",
+        dest="full_vacuum",
+        action="store_true",
+        help="Converte o banco para auto_vacuum incremental com um VACUUM completo (execucao unica).",
+    )
+    archive_parser.set_defaults(handler=_cmd_archive)
+
+    revenue_parser = commands.add_parser("faturamento", help="Relatorio de faturamento das ordens concluidas.")
+    revenue_parser.add_argument("--inicio", dest="start", help="Data inicial (AAAA-MM-DD) de entrega.")
+    revenue_parser.add_argument("--fim", dest="end", help="Data final (AAAA-MM-DD) de entrega.")
+    revenue_parser.add_argument(
+        "--por",
+        dest="period",
+        choices=["day", "week", "month"],
+        default="month",
+        help="Agrupamento por dia, semana ou mes.",
+    )
+    revenue_parser.add_argument(
+        "--reconstruir",
+        dest="rebuild",
+        action="store_true",
+        help="Recalcula o resumo diario a partir das ordens e dos arquivos anuais antes do relatorio.",
+    )
+    revenue_parser.add_argument(
+        "--sem-arquivos",
+        dest="skip_archives",
+        action="store_true",
+        help="Ao reconstruir, ignora os bancos de arquivo.",
+    )
+    revenue_parser.set_defaults(handler=_cmd_revenue)
+
+    commission_parser = commands.add_parser(
+        "comissoes", help="Horas, mao de obra faturada e comissao por colaborador no mes."
+    )
+    commission_parser.add_argument("period", help="Mes de referencia (AAAA-MM).")
+    commission_parser.add_argument(
+        "--recalcular",
+        dest="refresh",
+        action="store_true",
+        help="Ignora o resultado guardado de um mes ja encerrado e calcula novamente.",
+    )
+    commission_parser.set_defaults(handler=_cmd_commissions)
+
+    duplicates_parser = commands.add_parser("duplicados", help="Lista e mescla clientes ou veiculos duplicados.")
+    duplicates_parser.add_argument("entity", choices=["clientes", "veiculos"])
+    duplicates_parser.add_argument("--min-score", type=float, default=0.6, help="Pontuacao minima dos pares (0 a 1).")
+    duplicates_parser.add_argument("--limite", dest="limit", type=int, default=100, help="Pares exibidos.")
+    duplicates_parser.add_argument(
+        "--mesclar",
+        dest="merge",
+        nargs=2,
+        type=int,
+        metavar=("MANTER", "DUPLICADO"),
+        help="Move veiculos/ordens do registro DUPLICADO para MANTER e exclui o duplicado.",
+    )
+    duplicates_parser.set_defaults(handler=_cmd_duplicates)
+
+    serve_parser = commands.add_parser("servidor", help="Hospeda os servicos em HTTP/JSON para as estacoes.")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Endereco de escuta (0.0.0.0 para a rede local, exige --token).")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Porta TCP.")
+    serve_parser.add_argument("--pool", type=int, default=4, help="Conexoes com o banco (e requisicoes simultaneas).")
+    serve_parser.add_argument("--token", help="Token exigido das estacoes; padrao MECSIS_SERVER_TOKEN.")
+    serve_parser.set_defaults(handler=_cmd_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    database_manager.initialize()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,95 @@
 from __future__ import annotations
 
+import queue
+import random
+import threading
+import time
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Generator
+from typing import Any, Callable, Dict, Generator, Optional, TypeVar
 
 import sqlite3
 
-from ..utils.config import get_database_path, resource_path
+from ..utils.config import (
+    get_change_log_keep,
+    get_database_path,
+    get_journal_mode,
+    get_pool_size,
+    get_write_settings,
+    resource_path,
+)
+from ..utils.metrics import metrics
+from .migrations import run_migrations, trim_change_log
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    retries: int = 5
+    base_delay_ms: float = 50.0
+    max_delay_ms: float = 2000.0
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        settings = get_write_settings()
+        return cls(settings["retries"], settings["retry_base_ms"], settings["retry_max_ms"])
+
+    def delay_seconds(self, attempt: int) -> float:
+        ceiling = min(self.max_delay_ms, self.base_delay_ms * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling) / 1000
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    message = str(exc).lower()
+    return isinstance(exc, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+
+def _casefold(value: Any) -> Any:
+    # SQLite's LIKE and lower() fold ASCII only; searches call casefold() so "JOÃO" finds "João".
+    return value.casefold() if isinstance(value, str) else value
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:  # type: ignore[override]
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.record_query(sql, (time.perf_counter() - started) * 1000)
+
+    def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:  # type: ignore[override]
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            metrics.record_query(sql, (time.perf_counter() - started) * 1000)
 
 
 class DatabaseManager:
+    PROFILE_PRAGMAS = (
+        "journal_mode",
+        "synchronous",
+        "foreign_keys",
+        "busy_timeout",
+        "cache_size",
+        "page_size",
+        "auto_vacuum",
+        "user_version",
+    )
+
     def __init__(self) -> None:
         self.db_path = get_database_path()
         self._initialized = False
+        self.busy_timeout_ms = get_write_settings()["busy_timeout_ms"]
+        self.retry_policy = RetryPolicy.from_config()
+        self.journal_mode = get_journal_mode()
+        self._pool: Optional["queue.LifoQueue[sqlite3.Connection]"] = None
+        self._pool_size = 0
+        self._pool_opened = 0
+        self._pool_lock = threading.Lock()
+        self.configure_pool(get_pool_size())
 
     def _load_schema(self) -> str:
         schema_path = resource_path("mecsis", "database", "schema.sql")
@@ -24,7 +101,12 @@ class DatabaseManager:
         script = self._load_schema()
         with sqlite3.connect(self.db_path) as conn:
             conn.executescript("PRAGMA foreign_keys = ON;")
+            if self.journal_mode:
+                # Both modes are stored in the file, so switching once here covers every connection.
+                conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
             conn.executescript(script)
+            run_migrations(conn)
+            trim_change_log(conn, get_change_log_keep())
         self._initialized = True
 
     def initialize(self) -> None:
@@ -33,20 +115,148 @@ class DatabaseManager:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._apply_schema()
 
+    def configure_pool(self, size: int) -> None:
+        self.close_pool()
+        with self._pool_lock:
+            self._pool_size = max(0, size)
+            self._pool = queue.LifoQueue() if self._pool_size else None
+            self._pool_opened = 0
+
+    def close_pool(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            self._pool_size = 0
+            self._pool_opened = 0
+        while pool is not None:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def pool_stats(self) -> Dict[str, int]:
+        # Size 0 means no pool: every get_connection opens and closes its own connection.
+        with self._pool_lock:
+            pool, size, opened = self._pool, self._pool_size, self._pool_opened
+        idle = pool.qsize() if pool is not None else 0
+        return {"size": size, "opened": opened, "idle": idle, "in_use": max(0, opened - idle)}
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            factory=InstrumentedConnection,
+            check_same_thread=self._pool is None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.create_function("casefold", 1, _casefold, deterministic=True)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        metrics.incr("db.connections_opened")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        pool = self._pool
+        if pool is None:
+            return self._open_connection()
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            can_open = self._pool_opened < self._pool_size
+            if can_open:
+                self._pool_opened += 1
+        if can_open:
+            return self._open_connection()
+        metrics.incr("db.pool_waits")
+        with metrics.track("db.pool_wait"):
+            try:
+                return pool.get(timeout=self.busy_timeout_ms / 1000 or None)
+            except queue.Empty:
+                # Reported like a busy database so run_write backs off and retries.
+                raise sqlite3.OperationalError("connection pool busy") from None
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        pool = self._pool
+        if pool is None:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        pool.put(conn)
+
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
         self.initialize()
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._acquire()
+        metrics.adjust_gauge("db.connections_active", 1)
         try:
-            conn.execute("PRAGMA foreign_keys = ON;")
             yield conn
             conn.commit()
         except Exception:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            self._release(conn)
+            metrics.adjust_gauge("db.connections_active", -1)
+
+    @contextmanager
+    def _transaction(self, conn: sqlite3.Connection) -> Generator[sqlite3.Connection, None, None]:
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def run_write(
+        self,
+        operation: Callable[[sqlite3.Connection], T],
+        retry_policy: Optional[RetryPolicy] = None,
+        connection: Optional[sqlite3.Connection] = None,
+    ) -> T:
+        # connection lets a caller keep its own connection, e.g. one with an archive ATTACHed.
+        policy = retry_policy or self.retry_policy
+        lock_wait = 0.0
+        attempt = 0
+        while True:
+            try:
+                with self.get_connection() if connection is None else self._transaction(connection) as conn:
+                    started = time.perf_counter()
+                    # IMMEDIATE takes the write lock up front, so contention surfaces here and not mid-transaction.
+                    conn.execute("BEGIN IMMEDIATE")
+                    lock_wait += time.perf_counter() - started
+                    result = operation(conn)
+                metrics.record_timing("db.lock_wait", lock_wait * 1000)
+                return result
+            except sqlite3.OperationalError as exc:
+                if not is_lock_error(exc) or attempt >= policy.retries:
+                    metrics.record_timing("db.lock_wait", lock_wait * 1000, failed=True)
+                    if is_lock_error(exc):
+                        metrics.incr("db.lock_failures")
+                    raise
+                delay = policy.delay_seconds(attempt)
+                metrics.incr("db.write_retries")
+                time.sleep(delay)
+                lock_wait += delay
+                attempt += 1
+
+    def pragma_profile(self) -> Dict[str, Any]:
+        profile: Dict[str, Any] = {}
+        with self.get_connection() as conn:
+            for pragma in self.PROFILE_PRAGMAS:
+                row = conn.execute(f"PRAGMA {pragma}").fetchone()
+                profile[pragma] = row[0] if row else None
+        return profile
+
+    def storage_stats(self) -> Dict[str, int]:
+        stats: Dict[str, int] = {}
+        for label, suffix in (("db_bytes", ""), ("wal_bytes", "-wal"), ("shm_bytes", "-shm")):
+            path = self.db_path.with_name(self.db_path.name + suffix)
+            try:
+                stats[label] = path.stat().st_size if path.exists() else 0
+            except OSError:
+                stats[label] = 0
+        return stats
 
 
 database_manager = DatabaseManager()
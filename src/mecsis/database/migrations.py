@@ -0,0 +1,496 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import sqlite3
+
+from ..utils.config import get_archive_dir
+from ..utils.normalize import normalize_plate
+from .search_index import rebuild_client_words
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    # table_xinfo also lists generated columns, which table_info hides.
+    return [row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")]
+
+
+def add_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> None:
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _row_versions(conn: sqlite3.Connection) -> None:
+    for table in ("clients", "vehicles", "orders"):
+        add_column(conn, table, "version", "INTEGER NOT NULL DEFAULT 1")
+
+
+# Tables whose row changes are recorded in change_log for delta refreshes.
+LOGGED_TABLES = ("clients", "collaborators", "vehicles", "brands", "vehicle_models", "services", "orders")
+
+
+def _change_log_triggers(conn: sqlite3.Connection) -> None:
+    for table in LOGGED_TABLES:
+        for event, operation, row in (("INSERT", "I", "NEW"), ("UPDATE", "U", "NEW"), ("DELETE", "D", "OLD")):
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_log_{event.lower()} AFTER {event} ON {table} "
+                f"BEGIN INSERT INTO change_log (table_name, row_id, operation) "
+                f"VALUES ('{table}', {row}.id, '{operation}'); END"
+            )
+
+
+ORDER_LIST_SELECT = (
+    "SELECT o.id, o.order_number, o.status, o.summary, o.total_amount, o.created_at, o.updated_at, "
+    "o.expected_delivery, o.client_id, o.vehicle_id, c.full_name, v.license_plate, "
+    "COALESCE(b.name, ''), COALESCE(m.name, '') "
+    "FROM orders o "
+    "LEFT JOIN clients c ON c.id = o.client_id "
+    "LEFT JOIN vehicles v ON v.id = o.vehicle_id "
+    "LEFT JOIN brands b ON b.id = v.brand_id "
+    "LEFT JOIN vehicle_models m ON m.id = v.model_id"
+)
+ORDER_LIST_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS trg_order_list_insert AFTER INSERT ON orders BEGIN
+        INSERT OR REPLACE INTO order_list {ORDER_LIST_SELECT} WHERE o.id = NEW.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_order_list_update AFTER UPDATE ON orders BEGIN
+        INSERT OR REPLACE INTO order_list {ORDER_LIST_SELECT} WHERE o.id = NEW.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_order_list_delete AFTER DELETE ON orders BEGIN
+        DELETE FROM order_list WHERE id = OLD.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_order_list_client AFTER UPDATE OF full_name ON clients BEGIN
+        UPDATE order_list SET client_name = NEW.full_name WHERE client_id = NEW.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_order_list_vehicle
+    AFTER UPDATE OF license_plate, brand_id, model_id ON vehicles BEGIN
+        UPDATE order_list SET
+            license_plate = NEW.license_plate,
+            brand_name = COALESCE((SELECT name FROM brands WHERE id = NEW.brand_id), ''),
+            model_name = COALESCE((SELECT name FROM vehicle_models WHERE id = NEW.model_id), '')
+        WHERE vehicle_id = NEW.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_order_list_brand AFTER UPDATE OF name ON brands BEGIN
+        UPDATE order_list SET brand_name = NEW.name
+        WHERE vehicle_id IN (SELECT id FROM vehicles WHERE brand_id = NEW.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_order_list_model AFTER UPDATE OF name ON vehicle_models BEGIN
+        UPDATE order_list SET model_name = NEW.name
+        WHERE vehicle_id IN (SELECT id FROM vehicles WHERE model_id = NEW.id);
+    END""",
+)
+
+
+def _order_list(conn: sqlite3.Connection) -> None:
+    for trigger in ORDER_LIST_TRIGGERS:
+        conn.execute(trigger)
+    conn.execute(f"INSERT OR REPLACE INTO order_list {ORDER_LIST_SELECT}")
+
+
+# Completed orders count on the day they were delivered; older rows without a delivery date use updated_at.
+REVENUE_DAY = "date(COALESCE({row}.actual_delivery, {row}.updated_at))"
+REVENUE_ROLLUP_SELECT = (
+    f"SELECT {REVENUE_DAY.format(row='o')} AS day, COALESCE(o.payment_method, 'cash') AS payment_method, "
+    "COUNT(*), SUM(o.total_amount), SUM(o.labor_cost), SUM(o.parts_cost), SUM(o.discount) "
+    "FROM {source} o WHERE o.status = 'completed' GROUP BY 1, 2"
+)
+
+
+def _revenue_delta(row: str, sign: str) -> str:
+    day = REVENUE_DAY.format(row=row)
+    return f"""INSERT INTO revenue_daily (day, payment_method, orders_count, revenue, labor, parts, discount)
+        SELECT {day}, COALESCE({row}.payment_method, 'cash'), {sign}1, {sign}{row}.total_amount,
+            {sign}{row}.labor_cost, {sign}{row}.parts_cost, {sign}{row}.discount
+        WHERE {row}.status = 'completed'
+        ON CONFLICT (day, payment_method) DO UPDATE SET
+            orders_count = orders_count + excluded.orders_count,
+            revenue = revenue + excluded.revenue,
+            labor = labor + excluded.labor,
+            parts = parts + excluded.parts,
+            discount = discount + excluded.discount;
+        DELETE FROM revenue_daily WHERE day = {day} AND orders_count <= 0;"""
+
+
+REVENUE_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS trg_revenue_insert AFTER INSERT ON orders
+    WHEN NEW.status = 'completed' BEGIN
+        {_revenue_delta("NEW", "")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_revenue_update
+    AFTER UPDATE OF status, payment_method, labor_cost, parts_cost, discount, total_amount, actual_delivery, updated_at
+    ON orders WHEN OLD.status = 'completed' OR NEW.status = 'completed' BEGIN
+        {_revenue_delta("OLD", "-")}
+        {_revenue_delta("NEW", "")}
+    END""",
+    # Orders moved to the yearly archives are listed in revenue_hold first and keep their revenue.
+    f"""CREATE TRIGGER IF NOT EXISTS trg_revenue_delete AFTER DELETE ON orders
+    WHEN OLD.status = 'completed' AND OLD.id NOT IN (SELECT order_id FROM revenue_hold) BEGIN
+        {_revenue_delta("OLD", "-")}
+    END""",
+)
+
+
+def _revenue_rollups(conn: sqlite3.Connection) -> None:
+    for trigger in REVENUE_TRIGGERS:
+        conn.execute(trigger)
+    conn.execute("DELETE FROM revenue_daily")
+    conn.execute(
+        "INSERT INTO revenue_daily (day, payment_method, orders_count, revenue, labor, parts, discount) "
+        + REVENUE_ROLLUP_SELECT.format(source="orders")
+    )
+
+
+MILEAGE_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS trg_vehicle_mileage_insert AFTER INSERT ON vehicles
+    WHEN COALESCE(NEW.mileage, 0) > 0 BEGIN
+        INSERT INTO vehicle_mileage (vehicle_id, mileage) VALUES (NEW.id, NEW.mileage);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_vehicle_mileage_update AFTER UPDATE OF mileage ON vehicles
+    WHEN COALESCE(NEW.mileage, 0) > 0 AND NEW.mileage IS NOT OLD.mileage BEGIN
+        INSERT INTO vehicle_mileage (vehicle_id, mileage) VALUES (NEW.id, NEW.mileage);
+    END""",
+)
+
+
+def _mileage_readings(conn: sqlite3.Connection) -> None:
+    for trigger in MILEAGE_TRIGGERS:
+        conn.execute(trigger)
+    # The current odometer becomes the first reading of vehicles registered before the log existed.
+    conn.execute(
+        "INSERT INTO vehicle_mileage (vehicle_id, mileage, recorded_at) "
+        "SELECT id, mileage, COALESCE(updated_at, created_at) FROM vehicles v WHERE COALESCE(mileage, 0) > 0 "
+        "AND NOT EXISTS (SELECT 1 FROM vehicle_mileage r WHERE r.vehicle_id = v.id)"
+    )
+
+
+_PLATE = "upper(replace(replace(replace(license_plate, '-', ''), ' ', ''), '.', ''))"
+# SQL twin of utils.normalize.plate_key for whole plates. SQLite cannot strip every separator
+# the way normalize_plate does, so VehicleService stores plates already normalized and
+# _normalized_plates cleans the rows written before that.
+PLATE_KEY_SQL = (
+    f"CASE WHEN length({_PLATE}) = 7 AND substr({_PLATE}, 1, 3) GLOB '[A-Z][A-Z][A-Z]' "
+    f"AND substr({_PLATE}, 4, 1) GLOB '[0-9]' AND substr({_PLATE}, 5, 1) GLOB '[A-J]' "
+    f"THEN substr({_PLATE}, 1, 4) || char(unicode(substr({_PLATE}, 5, 1)) - 17) || substr({_PLATE}, 6) "
+    f"ELSE {_PLATE} END"
+)
+
+
+def _plate_keys(conn: sqlite3.Connection) -> None:
+    # A virtual generated column stays correct for every write path without touching the stored plate.
+    add_column(conn, "vehicles", "plate_key", f"TEXT GENERATED ALWAYS AS ({PLATE_KEY_SQL}) VIRTUAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_plate_key ON vehicles(plate_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_plate_digits ON vehicles(substr(plate_key, 4))")
+
+
+def _client_name_index(conn: sqlite3.Connection) -> None:
+    rebuild_client_words(conn)
+
+
+_DIGITS = (
+    "replace(replace(replace(replace(replace(replace(COALESCE({row}.%s, ''), "
+    "'.', ''), '-', ''), '/', ''), ' ', ''), '(', ''), ')', '')"
+)
+# Entity -> (searchable columns, title, detail, keys). Keys hold the compact forms people type:
+# document and phones without punctuation, the plate key, the bare order id.
+SEARCH_ENTITIES = {
+    "clients": (
+        "full_name, document, phone, mobile, email",
+        "{row}.full_name",
+        "''",
+        " || ' ' || ".join(
+            [
+                _DIGITS % "document",
+                "COALESCE({row}.email, '')",
+                # Phones also by their last 8 and 9 digits, so they are found without the area code.
+                *(f"{_DIGITS % column} || ' ' || substr({_DIGITS % column}, -9) || ' ' || substr({_DIGITS % column}, -8)"
+                  for column in ("phone", "mobile")),
+            ]
+        ),
+    ),
+    "vehicles": ("license_plate, vin", "{row}.license_plate", "''", "{row}.plate_key || ' ' || COALESCE({row}.vin, '')"),
+    "orders": ("order_number, summary", "{row}.order_number", "COALESCE({row}.summary, '')", "{row}.id"),
+    "services": ("name, description", "{row}.name", "COALESCE({row}.description, '')", "''"),
+}
+# Each entity owns a rowid range in global_search: (position + 1) * SEARCH_ROWID_SPAN + id.
+SEARCH_ROWID_SPAN = 1 << 40
+
+
+def search_rowid(entity: str, row: str) -> str:
+    return f"{(list(SEARCH_ENTITIES).index(entity) + 1) * SEARCH_ROWID_SPAN} + {row}.id"
+
+
+def _search_values(entity: str, row: str) -> str:
+    _, title, detail, keys = SEARCH_ENTITIES[entity]
+    return f"{search_rowid(entity, row)}, {title.format(row=row)}, {detail.format(row=row)}, {keys.format(row=row)}"
+
+
+def _global_search(conn: sqlite3.Connection) -> None:
+    insert = "INSERT INTO global_search (rowid, title, detail, keys)"
+    conn.execute("DELETE FROM global_search")
+    for entity, (columns, *_) in SEARCH_ENTITIES.items():
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_search_{entity}_insert AFTER INSERT ON {entity} BEGIN "
+            f"{insert} VALUES ({_search_values(entity, 'NEW')}); END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_search_{entity}_update AFTER UPDATE OF {columns} ON {entity} BEGIN "
+            f"DELETE FROM global_search WHERE rowid = {search_rowid(entity, 'OLD')}; "
+            f"{insert} VALUES ({_search_values(entity, 'NEW')}); END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_search_{entity}_delete AFTER DELETE ON {entity} BEGIN "
+            f"DELETE FROM global_search WHERE rowid = {search_rowid(entity, 'OLD')}; END"
+        )
+        conn.execute(f"{insert} SELECT {_search_values(entity, 't')} FROM {entity} t")
+
+
+_SPEND = "CASE WHEN {row}.status = 'completed' THEN {row}.total_amount ELSE 0 END"
+# Archived orders are gone from main.orders, so their newest date is kept in archived_last_visit.
+_LAST_VISIT = (
+    "UPDATE client_stats SET last_visit = NULLIF(max("
+    "COALESCE((SELECT MAX(created_at) FROM orders WHERE client_id = client_stats.client_id), ''), "
+    "COALESCE(archived_last_visit, '')), '') WHERE client_id IN ({clients})"
+)
+
+
+def _add_order(row: str) -> str:
+    return f"""INSERT INTO client_stats (client_id, order_count, last_visit, lifetime_spend)
+        VALUES ({row}.client_id, 1, {row}.created_at, {_SPEND.format(row=row)})
+        ON CONFLICT (client_id) DO UPDATE SET
+            order_count = order_count + 1,
+            last_visit = NULLIF(max(COALESCE(last_visit, ''), COALESCE(excluded.last_visit, '')), ''),
+            lifetime_spend = lifetime_spend + excluded.lifetime_spend;"""
+
+
+def _remove_order(row: str) -> str:
+    return (
+        f"UPDATE client_stats SET order_count = order_count - 1, "
+        f"lifetime_spend = lifetime_spend - {_SPEND.format(row=row)} WHERE client_id = {row}.client_id;"
+    )
+
+
+_ADD_VEHICLE = """INSERT INTO client_stats (client_id, vehicle_count) VALUES (NEW.client_id, 1)
+        ON CONFLICT (client_id) DO UPDATE SET vehicle_count = vehicle_count + 1;"""
+_REMOVE_VEHICLE = "UPDATE client_stats SET vehicle_count = vehicle_count - 1 WHERE client_id = OLD.client_id;"
+# Per-client counters for the clients list. Decrements are plain UPDATEs so a cascade from a deleted
+# client never recreates its row; orders leaving for the yearly archives (revenue_hold) keep counting.
+CLIENT_STATS_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS trg_client_stats_client AFTER INSERT ON clients BEGIN
+        INSERT OR IGNORE INTO client_stats (client_id) VALUES (NEW.id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_client_stats_vehicle_insert AFTER INSERT ON vehicles BEGIN
+        {_ADD_VEHICLE}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_client_stats_vehicle_update AFTER UPDATE OF client_id ON vehicles
+    WHEN NEW.client_id IS NOT OLD.client_id BEGIN
+        {_REMOVE_VEHICLE}
+        {_ADD_VEHICLE}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_client_stats_vehicle_delete AFTER DELETE ON vehicles BEGIN
+        {_REMOVE_VEHICLE}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_client_stats_order_insert AFTER INSERT ON orders BEGIN
+        {_add_order("NEW")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_client_stats_order_update
+    AFTER UPDATE OF client_id, status, total_amount, created_at ON orders BEGIN
+        {_remove_order("OLD")}
+        {_add_order("NEW")}
+        {_LAST_VISIT.format(clients="OLD.client_id, NEW.client_id")};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_client_stats_order_delete AFTER DELETE ON orders
+    WHEN OLD.id NOT IN (SELECT order_id FROM revenue_hold) BEGIN
+        {_remove_order("OLD")}
+        {_LAST_VISIT.format(clients="OLD.client_id")};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_client_stats_order_archive AFTER DELETE ON orders
+    WHEN OLD.id IN (SELECT order_id FROM revenue_hold) BEGIN
+        UPDATE client_stats SET archived_last_visit =
+            NULLIF(max(COALESCE(archived_last_visit, ''), COALESCE(OLD.created_at, '')), '')
+        WHERE client_id = OLD.client_id;
+    END""",
+    # Logged under its own name so an open clients list patches just the row whose counters moved.
+    """CREATE TRIGGER IF NOT EXISTS trg_client_stats_log_update AFTER UPDATE ON client_stats BEGIN
+        INSERT INTO change_log (table_name, row_id, operation) VALUES ('client_stats', NEW.client_id, 'U');
+    END""",
+)
+
+
+def archived_client_orders() -> List[Tuple[int, int, str, float]]:
+    # Same count, last visit and spend per client as rebuild_client_stats, read from the yearly
+    # archive files (services/archive.py). Each file gets its own connection because ATTACH is
+    # not allowed inside the migration transaction.
+    totals: Dict[int, List] = {}
+    archive_dir = get_archive_dir(create=False)
+    if not archive_dir.is_dir():
+        return []
+    for path in sorted(archive_dir.glob("mecsis-arquivo-*.db")):
+        archive = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+        try:
+            if not archive.execute("SELECT 1 FROM sqlite_master WHERE name = 'orders'").fetchone():
+                continue
+            rows = archive.execute(
+                f"SELECT client_id, COUNT(*), MAX(created_at), SUM({_SPEND.format(row='orders')}) "
+                "FROM orders GROUP BY client_id"
+            )
+            for client_id, count, last_visit, spend in rows:
+                total = totals.setdefault(client_id, [client_id, 0, "", 0.0])
+                total[1] += count
+                total[2] = max(total[2], last_visit or "")
+                total[3] += spend or 0.0
+        finally:
+            archive.close()
+    return [(client_id, count, last_visit or None, spend) for client_id, count, last_visit, spend in totals.values()]
+
+
+def rebuild_client_stats(
+    conn: sqlite3.Connection, archived: Sequence[Tuple[int, int, str, float]] = ()
+) -> None:
+    # Two grouped scans over the client_id indexes instead of per-client subqueries.
+    conn.execute("DELETE FROM client_stats")
+    conn.execute("INSERT INTO client_stats (client_id) SELECT id FROM clients")
+    conn.execute(
+        "UPDATE client_stats SET vehicle_count = v.total "
+        "FROM (SELECT client_id, COUNT(*) AS total FROM vehicles GROUP BY client_id) AS v "
+        "WHERE v.client_id = client_stats.client_id"
+    )
+    conn.execute(
+        "UPDATE client_stats SET order_count = o.total, last_visit = o.last_visit, lifetime_spend = o.spend "
+        f"FROM (SELECT client_id, COUNT(*) AS total, MAX(created_at) AS last_visit, SUM({_SPEND.format(row='orders')}) "
+        "AS spend FROM orders GROUP BY client_id) AS o "
+        "WHERE o.client_id = client_stats.client_id"
+    )
+    # Archived orders keep counting, as the triggers do; archives of deleted clients match no row.
+    conn.executemany(
+        "UPDATE client_stats SET order_count = order_count + ?2, "
+        "last_visit = NULLIF(max(COALESCE(last_visit, ''), COALESCE(?3, '')), ''), "
+        "archived_last_visit = ?3, lifetime_spend = lifetime_spend + ?4 WHERE client_id = ?1",
+        archived,
+    )
+
+
+def _superseded(conn: sqlite3.Connection) -> None:
+    pass
+
+
+def _client_stats(conn: sqlite3.Connection) -> None:
+    add_column(conn, "client_stats", "archived_last_visit", "TEXT")
+    # Dropped first so databases that ran the old step 9 get the new bodies and the rebuild is not logged.
+    for trigger in CLIENT_STATS_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger.split()[5]}")
+    rebuild_client_stats(conn, archived_client_orders())
+    for trigger in CLIENT_STATS_TRIGGERS:
+        conn.execute(trigger)
+
+
+def trim_change_log(conn: sqlite3.Connection, keep_rows: int) -> int:
+    # seq is AUTOINCREMENT, so trimming old rows never lets a sequence number be reused.
+    cursor = conn.execute(
+        "DELETE FROM change_log WHERE seq <= (SELECT MAX(seq) FROM change_log) - ?",
+        (keep_rows,),
+    )
+    conn.commit()
+    return cursor.rowcount
+
+
+def _normalized_plates(conn: sqlite3.Connection) -> None:
+    rows = conn.execute("SELECT id, license_plate FROM vehicles WHERE license_plate GLOB '*[^A-Z0-9]*'").fetchall()
+    for vehicle_id, plate in rows:
+        clean = normalize_plate(plate)
+        taken = conn.execute(
+            "SELECT 1 FROM vehicles WHERE license_plate = ? AND id <> ?", (clean, vehicle_id)
+        ).fetchone()
+        # A plate that only differs from another vehicle's by separators is a duplicate; it is
+        # left for the duplicates report instead of failing the migration on the UNIQUE key.
+        if clean and not taken:
+            conn.execute(
+                "UPDATE vehicles SET license_plate = ?, version = version + 1 WHERE id = ?",
+                (clean, vehicle_id),
+            )
+
+
+# collaborator_period_stats caches closed months; any change that moves a completed order's labor or
+# team drops the cached months it touches, and period_commissions recomputes them on the next read.
+COMMISSION_PERIOD = "strftime('%Y-%m', COALESCE({row}.actual_delivery, {row}.updated_at))"
+_DROP_PERIODS = "DELETE FROM collaborator_period_stats WHERE period IN ({periods});"
+
+
+def _order_periods(*rows: str) -> str:
+    order_ids = ", ".join(f"{row}.order_id" for row in rows)
+    return (
+        f"SELECT {COMMISSION_PERIOD.format(row='o')} FROM orders o "
+        f"WHERE o.status = 'completed' AND o.id IN ({order_ids})"
+    )
+
+
+COMMISSION_CACHE_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS trg_commission_order_insert AFTER INSERT ON orders
+    WHEN NEW.status = 'completed' BEGIN
+        {_DROP_PERIODS.format(periods=COMMISSION_PERIOD.format(row="NEW"))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_commission_order_update AFTER UPDATE ON orders
+    WHEN OLD.status = 'completed' OR NEW.status = 'completed' BEGIN
+        {_DROP_PERIODS.format(periods=f"{COMMISSION_PERIOD.format(row='OLD')}, {COMMISSION_PERIOD.format(row='NEW')}")}
+    END""",
+    # Archived orders (revenue_hold) leave main.orders but keep counting in the cached months.
+    f"""CREATE TRIGGER IF NOT EXISTS trg_commission_order_delete AFTER DELETE ON orders
+    WHEN OLD.status = 'completed' AND OLD.id NOT IN (SELECT order_id FROM revenue_hold) BEGIN
+        {_DROP_PERIODS.format(periods=COMMISSION_PERIOD.format(row="OLD"))}
+    END""",
+)
+
+
+def _commission_cache_triggers(conn: sqlite3.Connection) -> None:
+    for trigger in COMMISSION_CACHE_TRIGGERS:
+        conn.execute(trigger)
+    for table in ("order_items", "order_collaborators"):
+        for event, rows in (("INSERT", ("NEW",)), ("UPDATE", ("OLD", "NEW")), ("DELETE", ("OLD",))):
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_commission_{table}_{event.lower()} AFTER {event} ON {table} "
+                f"BEGIN {_DROP_PERIODS.format(periods=_order_periods(*rows))} END"
+            )
+    # Months cached before the triggers existed may already be stale.
+    conn.execute("DELETE FROM collaborator_period_stats")
+
+
+# schema.sql creates new databases with the final layout; each step here brings an
+# older file up to date and must be safe to run on a database that already has it.
+MIGRATIONS: List[Tuple[int, Migration]] = [
+    (1, _row_versions),
+    (2, _change_log_triggers),
+    (3, _order_list),
+    (4, _revenue_rollups),
+    (5, _mileage_readings),
+    (6, _plate_keys),
+    (7, _client_name_index),
+    (8, _global_search),
+    # 9 built client_stats from main.orders only; 11 builds it with the archived orders folded in,
+    # so 9 is left empty instead of building the table twice.
+    (9, _superseded),
+    (10, _normalized_plates),
+    # Databases that already ran 9 lack archived_last_visit and the archive trigger, and their
+    # rebuild ignored archived orders, so 11 rebuilds client_stats with the archives.
+    (11, _client_stats),
+    (12, _commission_cache_triggers),
+]
+
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    latest = MIGRATIONS[-1][0]
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= latest:
+        return latest
+    # Several terminals may start at once; the write lock makes only one of them migrate.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, migration in MIGRATIONS:
+            if version > current:
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                current = version
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return current
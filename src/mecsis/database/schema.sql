@@ -1,3 +1,5 @@
+PRAGMA auto_vacuum = INCREMENTAL;
+
 CREATE TABLE IF NOT EXISTS users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT NOT NULL UNIQUE,
@@ -24,6 +26,7 @@ CREATE TABLE IF NOT EXISTS clients (
     city TEXT,
     state TEXT,
     notes TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
     created_at TEXT DEFAULT (datetime('now')),
     updated_at TEXT DEFAULT (datetime('now'))
 );
@@ -76,6 +79,7 @@ CREATE TABLE IF NOT EXISTS vehicles (
     fuel_type TEXT,
     mileage INTEGER DEFAULT 0,
     notes TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
     created_at TEXT DEFAULT (datetime('now')),
     updated_at TEXT DEFAULT (datetime('now')),
     FOREIGN KEY (client_id) REFERENCES clients(id) ON DELETE CASCADE,
@@ -97,6 +101,7 @@ CREATE TABLE IF NOT EXISTS orders (
     parts_cost REAL NOT NULL DEFAULT 0,
     discount REAL NOT NULL DEFAULT 0,
     total_amount REAL NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 1,
     created_at TEXT DEFAULT (datetime('now')),
     updated_at TEXT DEFAULT (datetime('now')),
     expected_delivery TEXT,
@@ -131,9 +136,126 @@ CREATE TABLE IF NOT EXISTS order_collaborators (
     FOREIGN KEY (collaborator_id) REFERENCES collaborators(id)
 );
 
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    operation TEXT NOT NULL CHECK (operation IN ('I','U','D')),
+    changed_at TEXT DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS order_list (
+    id INTEGER PRIMARY KEY,
+    order_number TEXT NOT NULL,
+    status TEXT NOT NULL,
+    summary TEXT,
+    total_amount REAL NOT NULL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT,
+    expected_delivery TEXT,
+    client_id INTEGER NOT NULL,
+    vehicle_id INTEGER NOT NULL,
+    client_name TEXT,
+    license_plate TEXT,
+    brand_name TEXT,
+    model_name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS revenue_daily (
+    day TEXT NOT NULL,
+    payment_method TEXT NOT NULL,
+    orders_count INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0,
+    labor REAL NOT NULL DEFAULT 0,
+    parts REAL NOT NULL DEFAULT 0,
+    discount REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, payment_method)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS revenue_hold (
+    order_id INTEGER PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS collaborator_period_stats (
+    period TEXT NOT NULL,
+    collaborator_id INTEGER NOT NULL,
+    full_name TEXT,
+    orders_count INTEGER NOT NULL DEFAULT 0,
+    hours REAL NOT NULL DEFAULT 0,
+    billed_labor REAL NOT NULL DEFAULT 0,
+    labor_pay REAL NOT NULL DEFAULT 0,
+    commission_rate REAL NOT NULL DEFAULT 0,
+    commission REAL NOT NULL DEFAULT 0,
+    computed_at TEXT DEFAULT (datetime('now')),
+    PRIMARY KEY (period, collaborator_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS vehicle_mileage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_id INTEGER NOT NULL,
+    mileage INTEGER NOT NULL,
+    recorded_at TEXT DEFAULT (datetime('now')),
+    FOREIGN KEY (vehicle_id) REFERENCES vehicles(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS client_words (
+    word TEXT NOT NULL,
+    client_id INTEGER NOT NULL,
+    PRIMARY KEY (word, client_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS name_words (
+    word TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS name_trigrams (
+    trigram TEXT NOT NULL,
+    word TEXT NOT NULL,
+    PRIMARY KEY (trigram, word)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS search_index_state (
+    name TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS client_stats (
+    client_id INTEGER PRIMARY KEY,
+    vehicle_count INTEGER NOT NULL DEFAULT 0,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    last_visit TEXT,
+    lifetime_spend REAL NOT NULL DEFAULT 0,
+    archived_last_visit TEXT,
+    FOREIGN KEY (client_id) REFERENCES clients(id) ON DELETE CASCADE
+);
+
+-- One full-text index for the toolbar search; the rowid encodes the entity (see migrations.SEARCH_ENTITIES).
+CREATE VIRTUAL TABLE IF NOT EXISTS global_search USING fts5(
+    title,
+    detail,
+    keys,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+CREATE INDEX IF NOT EXISTS idx_orders_client ON orders(client_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_vehicles_client ON vehicles(client_id);
+CREATE INDEX IF NOT EXISTS idx_client_stats_vehicles ON client_stats(vehicle_count);
+CREATE INDEX IF NOT EXISTS idx_client_stats_orders ON client_stats(order_count);
+CREATE INDEX IF NOT EXISTS idx_client_stats_visit ON client_stats(last_visit);
+CREATE INDEX IF NOT EXISTS idx_client_stats_spend ON client_stats(lifetime_spend);
 CREATE INDEX IF NOT EXISTS idx_orders_expected_delivery ON orders(expected_delivery);
+CREATE INDEX IF NOT EXISTS idx_orders_vehicle_created ON orders(vehicle_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id);
+CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(full_name);
+CREATE INDEX IF NOT EXISTS idx_client_words_client ON client_words(client_id);
+CREATE INDEX IF NOT EXISTS idx_vehicle_mileage_vehicle ON vehicle_mileage(vehicle_id, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_orders_delivered ON orders(status, date(COALESCE(actual_delivery, updated_at)));
+CREATE INDEX IF NOT EXISTS idx_order_list_updated ON order_list(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_order_list_client ON order_list(client_id);
+CREATE INDEX IF NOT EXISTS idx_order_list_vehicle ON order_list(vehicle_id);
+CREATE INDEX IF NOT EXISTS idx_order_list_delivery ON order_list(expected_delivery);
 
 INSERT OR IGNORE INTO users (username, password_hash, display_name, role, is_active)
 VALUES ('123', '$2b$12$ia.F7KsSUiNApGDVa0S47eUer3D0FhhiRuohrn6CS3LtjAbGFr8H2', 'Administrador', 'admin', 1);
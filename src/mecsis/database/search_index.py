@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Sequence, Set, Tuple
+
+import sqlite3
+
+from ..utils.normalize import fold_text, trigrams
+
+# Client names are indexed word by word: client_words maps each accent-folded word to its
+# clients and name_trigrams indexes the (much smaller) word vocabulary for typo matching.
+# Folding happens in Python, since SQLite has no accent folding, so the index follows the
+# change log instead of triggers. Callers hold the write transaction.
+CLIENT_NAMES = "client_names"
+
+
+def _client_words(names: Iterable[Tuple[int, str]]) -> List[Tuple[str, int]]:
+    return [(word, client_id) for client_id, name in names for word in set(fold_text(name).split())]
+
+
+def _store(conn: sqlite3.Connection, rows: List[Tuple[str, int]]) -> None:
+    conn.executemany("INSERT OR IGNORE INTO client_words (word, client_id) VALUES (?, ?)", rows)
+    words: Set[str] = {word for word, _ in rows}
+    new_words = [
+        word for word in words if conn.execute("INSERT OR IGNORE INTO name_words (word) VALUES (?)", (word,)).rowcount
+    ]
+    conn.executemany(
+        "INSERT OR IGNORE INTO name_trigrams (trigram, word) VALUES (?, ?)",
+        [(gram, word) for word in new_words for gram in trigrams(word)],
+    )
+
+
+def _set_synced(conn: sqlite3.Connection, seq: int) -> None:
+    conn.execute(
+        "INSERT INTO search_index_state (name, seq) VALUES (?, ?) "
+        "ON CONFLICT (name) DO UPDATE SET seq = excluded.seq",
+        (CLIENT_NAMES, seq),
+    )
+
+
+def _newest_seq(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+
+
+def rebuild_client_words(conn: sqlite3.Connection) -> None:
+    newest = _newest_seq(conn)
+    for table in ("client_words", "name_words", "name_trigrams"):
+        conn.execute(f"DELETE FROM {table}")
+    cursor = conn.execute("SELECT id, full_name FROM clients")
+    while True:
+        batch = cursor.fetchmany(5000)
+        if not batch:
+            break
+        _store(conn, _client_words((row[0], row[1]) for row in batch))
+    _set_synced(conn, newest)
+
+
+def reindex_clients(conn: sqlite3.Connection, client_ids: Sequence[int]) -> None:
+    # Words left without clients stay in the vocabulary; lookups join through client_words anyway.
+    for start in range(0, len(client_ids), 500):
+        chunk = list(client_ids[start:start + 500])
+        placeholders = ", ".join(["?"] * len(chunk))
+        conn.execute(f"DELETE FROM client_words WHERE client_id IN ({placeholders})", chunk)
+        names = conn.execute(f"SELECT id, full_name FROM clients WHERE id IN ({placeholders})", chunk)
+        _store(conn, _client_words((row[0], row[1]) for row in names))
+
+
+def client_words_stale(conn: sqlite3.Connection, clean_until: int = 0) -> Tuple[bool, int]:
+    # Only client rows make the index stale, while orders, vehicles and client_stats fill the log
+    # too. Writing the position back after every check would take the write lock on each search,
+    # so the caller keeps the returned position (the log is clean of client rows up to it) instead.
+    synced, oldest, newest = conn.execute(
+        "SELECT (SELECT seq FROM search_index_state WHERE name = ?), "
+        "(SELECT MIN(seq) FROM change_log), (SELECT COALESCE(MAX(seq), 0) FROM change_log)",
+        (CLIENT_NAMES,),
+    ).fetchone()
+    if synced is None:
+        return True, clean_until
+    start = max(synced, clean_until)
+    if oldest is not None and oldest > start + 1:
+        return True, start
+    changed = conn.execute(
+        "SELECT 1 FROM change_log WHERE seq > ? AND seq <= ? AND table_name = 'clients' LIMIT 1",
+        (start, newest),
+    ).fetchone()
+    return (True, start) if changed else (False, newest)
+
+
+def sync_client_words(conn: sqlite3.Connection, clean_until: int = 0) -> int:
+    synced_row = conn.execute("SELECT seq FROM search_index_state WHERE name = ?", (CLIENT_NAMES,)).fetchone()
+    newest = _newest_seq(conn)
+    oldest = conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+    start = max(synced_row[0], clean_until) if synced_row else 0
+    if synced_row is None or (oldest is not None and oldest > start + 1):
+        # Never built, or the log was trimmed past our position.
+        rebuild_client_words(conn)
+        return -1
+    client_ids = [
+        row[0]
+        for row in conn.execute(
+            "SELECT DISTINCT row_id FROM change_log WHERE table_name = 'clients' AND seq > ? AND seq <= ?",
+            (start, newest),
+        )
+    ]
+    reindex_clients(conn, client_ids)
+    _set_synced(conn, newest)
+    return len(client_ids)
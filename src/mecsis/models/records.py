@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Sequence, Tuple, Type
+
+
+class CompactRecord(tuple):
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def __getitem__(self, key: Any) -> Any:  # type: ignore[override]
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(tuple.__iter__(self))
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self._fields, tuple.__iter__(self))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (_rebuild_record, (self._fields, tuple(tuple.__iter__(self))))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+_RECORD_TYPES: Dict[Tuple[str, ...], Type[CompactRecord]] = {}
+
+
+def record_type(fields: Sequence[str]) -> Type[CompactRecord]:
+    key = tuple(fields)
+    cls = _RECORD_TYPES.get(key)
+    if cls is None:
+        cls = type(
+            "Record",
+            (CompactRecord,),
+            {
+                "__slots__": (),
+                "_fields": key,
+                "_index": {name: position for position, name in enumerate(key)},
+            },
+        )
+        _RECORD_TYPES[key] = cls
+    return cls
+
+
+def _rebuild_record(fields: Tuple[str, ...], values: Tuple[Any, ...]) -> CompactRecord:
+    return record_type(fields)(values)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hmac
+import ipaddress
+import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .database.connection import database_manager
+from .services.remote import KEEPALIVE_SECONDS, TOKEN_HEADER, error_payload, public_methods, to_jsonable
+from .utils.config import get_server_url
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+# Errors raised by the services on bad input; anything else is reported as a server failure.
+CLIENT_ERRORS = (ValueError, LookupError, PermissionError, FileNotFoundError, sqlite3.IntegrityError)
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def load_services() -> Dict[str, Any]:
+    if get_server_url():
+        raise RuntimeError("MECSIS_SERVER_URL deve ficar vazio no servidor; ele hospeda os servicos locais.")
+    from .services.auth import auth_service
+    from .services.brands import brand_service
+    from .services.changes import change_log_service
+    from .services.clients import client_service
+    from .services.collaborators import collaborator_service
+    from .services.dashboard import dashboard_service
+    from .services.dedupe import dedupe_service
+    from .services.diagnostics import diagnostics_service
+    from .services.models import model_service
+    from .services.orders import order_service
+    from .services.reports import report_service
+    from .services.search import global_search_service
+    from .services.services_catalog import service_catalog
+    from .services.vehicles import vehicle_service
+
+    return {
+        "auth_service": auth_service,
+        "brand_service": brand_service,
+        "change_log_service": change_log_service,
+        "client_service": client_service,
+        "collaborator_service": collaborator_service,
+        "dashboard_service": dashboard_service,
+        "dedupe_service": dedupe_service,
+        "diagnostics_service": diagnostics_service,
+        "global_search_service": global_search_service,
+        "model_service": model_service,
+        "order_service": order_service,
+        "report_service": report_service,
+        "service_catalog": service_catalog,
+        "vehicle_service": vehicle_service,
+    }
+
+
+class ServiceServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        pool_size: int = 4,
+        token: Optional[str] = None,
+        services: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if not token and not is_loopback(host):
+            raise RuntimeError(
+                f"Defina --token (ou MECSIS_SERVER_TOKEN) para escutar em {host or 'todas as interfaces'}; "
+                "sem token o servidor so aceita 127.0.0.1."
+            )
+        self.host = host
+        self.port = port
+        self.pool_size = max(1, pool_size)
+        self.token = token
+        self.services = services if services is not None else load_services()
+        self._methods: Dict[Tuple[str, str], Callable[..., Any]] = {
+            (service_name, method_name): method
+            for service_name, service in self.services.items()
+            for method_name, method in public_methods(service).items()
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        database_manager.initialize()
+        # One connection per worker thread; requests beyond that queue in the executor.
+        database_manager.configure_pool(self.pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="mecsis-rpc")
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Servidor MEC-SIS ouvindo em http://%s:%s", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        database_manager.close_pool()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                headers = await self._read_headers(reader)
+                method, _, rest = request_line.decode("latin-1").strip().partition(" ")
+                path = rest.rpartition(" ")[0] or rest
+                length = int(headers.get("content-length", "0") or 0)
+                if length > MAX_BODY_BYTES:
+                    error = {"type": "ValueError", "message": "Requisicao grande demais."}
+                    await self._respond(writer, 413, {"error": error}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(method, path, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _dispatch(
+        self,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> Tuple[int, Dict[str, Any]]:
+        if self.token and not hmac.compare_digest(headers.get(TOKEN_HEADER.lower(), ""), self.token):
+            return 401, {"error": {"type": "PermissionError", "message": "Token de acesso invalido."}}
+        if method == "GET" and path == "/health":
+            return 200, {"result": {"status": "ok", "services": sorted(self.services)}}
+        parts = path.strip("/").split("/")
+        if method != "POST" or len(parts) != 3 or parts[0] != "rpc":
+            return 404, {"error": {"type": "LookupError", "message": f"Rota desconhecida: {method} {path}"}}
+        target = self._methods.get((parts[1], parts[2]))
+        if target is None:
+            return 404, {"error": {"type": "LookupError", "message": f"Operacao desconhecida: {parts[1]}.{parts[2]}"}}
+        try:
+            request = json.loads(body or b"{}")
+            args = request.get("args") or []
+            kwargs = request.get("kwargs") or {}
+        except (ValueError, AttributeError):
+            return 400, {"error": {"type": "ValueError", "message": "Corpo JSON invalido."}}
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._invoke, target, args, kwargs)
+        try:
+            return 200, {"result": await loop.run_in_executor(self._executor, call)}
+        except CLIENT_ERRORS as exc:
+            return 400, {"error": error_payload(exc)}
+        except Exception as exc:  # noqa: BLE001 - reported to the caller with its type
+            logger.exception("Falha em %s.%s", parts[1], parts[2])
+            return 500, {"error": error_payload(exc)}
+
+    @staticmethod
+    def _invoke(target: Callable[..., Any], args: Any, kwargs: Dict[str, Any]) -> Any:
+        # Generators are drained here so the pooled connection goes back before the response is sent.
+        return to_jsonable(target(*args, **kwargs))
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict[str, Any],
+        close: bool = False,
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def run_server(host: str, port: int, pool_size: int, token: Optional[str] = None) -> None:
+    from .services.backup import BackupScheduler
+
+    server = ServiceServer(host, port, pool_size, token)
+    # Terminals in client mode skip their own scheduler, so the server keeps the backups.
+    backup_scheduler = BackupScheduler.from_config()
+    if backup_scheduler:
+        backup_scheduler.start()
+
+    async def main() -> None:
+        await server.start()
+        print(f"Servidor MEC-SIS em http://{server.host}:{server.port} ({server.pool_size} conexoes). Ctrl+C encerra.")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if backup_scheduler:
+            backup_scheduler.stop(timeout=5)
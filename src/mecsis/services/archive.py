@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import re
+import time
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import sqlite3
+
+from ..database.connection import database_manager
+from ..utils.config import get_archive_dir
+from ..utils.metrics import instrument_class
+
+ARCHIVED_TABLES = ("orders", "order_items", "order_collaborators")
+ORDER_SNAPSHOT_COLUMNS = (
+    ("client_name", "TEXT", "c.full_name"),
+    ("client_document", "TEXT", "c.document"),
+    ("license_plate", "TEXT", "v.license_plate"),
+    ("brand_name", "TEXT", "COALESCE(b.name, '')"),
+    ("model_name", "TEXT", "COALESCE(m.name, '')"),
+)
+ARCHIVE_INDEXES = (
+    ("idx_orders_vehicle_created", "orders", "vehicle_id, created_at"),
+    ("idx_orders_client", "orders", "client_id"),
+    ("idx_order_items_order", "order_items", "order_id"),
+    ("idx_order_collaborators_order", "order_collaborators", "order_id"),
+)
+# SQLite refuses more than ten attached databases per connection by default.
+MAX_ATTACHED = 8
+_YEAR_FILE = re.compile(r"mecsis-arquivo-(\d{4})\.db$")
+
+
+@dataclass
+class ArchiveReport:
+    cutoff: str
+    orders_by_year: Dict[str, int] = field(default_factory=dict)
+    bytes_before: int = 0
+    bytes_after: int = 0
+    elapsed_seconds: float = 0.0
+    pages_freed: int = 0
+    compaction_skipped: bool = False
+
+    @property
+    def orders(self) -> int:
+        return sum(self.orders_by_year.values())
+
+    def summary(self) -> str:
+        years = ", ".join(f"{year}: {count}" for year, count in sorted(self.orders_by_year.items())) or "nenhuma"
+        text = (
+            f"{self.orders} ordens anteriores a {self.cutoff} arquivadas ({years}) em {self.elapsed_seconds:.1f}s. "
+            f"Banco principal: {self.bytes_before / 1024 / 1024:.1f} MB -> {self.bytes_after / 1024 / 1024:.1f} MB"
+        )
+        if self.compaction_skipped:
+            text += (
+                ". Compactacao ignorada: o banco nao usa auto_vacuum incremental; "
+                "converta uma vez com mecsis arquivar --compactar-completo"
+            )
+        return text
+
+
+@instrument_class
+class ArchiveService:
+    def __init__(self, archive_dir: Optional[Path] = None) -> None:
+        self._archive_dir = Path(archive_dir) if archive_dir else None
+
+    @property
+    def archive_dir(self) -> Path:
+        if self._archive_dir is None:
+            self._archive_dir = get_archive_dir()
+        self._archive_dir.mkdir(parents=True, exist_ok=True)
+        return self._archive_dir
+
+    def archive_path(self, year: str) -> Path:
+        return self.archive_dir / f"mecsis-arquivo-{year}.db"
+
+    def list_years(self) -> List[str]:
+        years = []
+        for path in self.archive_dir.glob("mecsis-arquivo-*.db"):
+            match = _YEAR_FILE.search(path.name)
+            if match:
+                years.append(match.group(1))
+        return sorted(years)
+
+    def _ensure_schema(self, conn: sqlite3.Connection, alias: str) -> Dict[str, List[str]]:
+        copied_columns: Dict[str, List[str]] = {}
+        for table in ARCHIVED_TABLES:
+            main_columns = conn.execute(f"PRAGMA main.table_info({table})").fetchall()
+            definitions = [
+                f"{column['name']} {column['type']}{' PRIMARY KEY' if column['pk'] else ''}"
+                for column in main_columns
+            ]
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {alias}.{table} ({', '.join(definitions)})")
+            existing = {column["name"] for column in conn.execute(f"PRAGMA {alias}.table_info({table})")}
+            wanted = [(column["name"], column["type"]) for column in main_columns]
+            if table == "orders":
+                wanted += [(name, column_type) for name, column_type, _ in ORDER_SNAPSHOT_COLUMNS]
+            for name, column_type in wanted:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {alias}.{table} ADD COLUMN {name} {column_type}")
+            copied_columns[table] = [column["name"] for column in main_columns]
+        for index_name, table, columns in ARCHIVE_INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {alias}.{index_name} ON {table}({columns})")
+        return copied_columns
+
+    def archive_orders(
+        self,
+        cutoff: str,
+        statuses: Sequence[str] = ("completed", "cancelled"),
+        batch_size: int = 500,
+        compact: bool = True,
+    ) -> ArchiveReport:
+        report = ArchiveReport(cutoff)
+        started = time.perf_counter()
+        report.bytes_before = database_manager.storage_stats()["db_bytes"]
+        status_clause = ", ".join(["?"] * len(statuses))
+        criteria = f"status IN ({status_clause}) AND created_at < ?"
+        criteria_params = (*statuses, cutoff)
+
+        with database_manager.get_connection() as conn:
+            years = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT DISTINCT strftime('%Y', created_at) FROM orders WHERE {criteria} ORDER BY 1",
+                    criteria_params,
+                )
+                if row[0]
+            ]
+            for year in years:
+                report.orders_by_year[year] = self._archive_year(conn, year, criteria, criteria_params, batch_size)
+
+        if compact:
+            freed = self.compact()
+            report.compaction_skipped = freed is None
+            report.pages_freed = freed or 0
+        report.bytes_after = database_manager.storage_stats()["db_bytes"]
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    def _archive_year(
+        self,
+        conn: sqlite3.Connection,
+        year: str,
+        criteria: str,
+        criteria_params: Tuple[Any, ...],
+        batch_size: int,
+    ) -> int:
+        moved = 0
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS arch", (str(self.archive_path(year)),))
+        try:
+            columns = database_manager.run_write(lambda c: self._ensure_schema(c, "arch"), connection=conn)
+            while True:
+                # One transaction per batch: a failure rolls the copy, the hold and the delete back together.
+                batch = database_manager.run_write(
+                    lambda c: self._move_batch(c, columns, year, criteria, criteria_params, batch_size),
+                    connection=conn,
+                )
+                if not batch:
+                    break
+                moved += batch
+        except Exception:
+            # A failing DETACH must not hide the error that stopped the archiving.
+            with suppress(sqlite3.Error):
+                conn.execute("DETACH DATABASE arch")
+            raise
+        conn.execute("DETACH DATABASE arch")
+        return moved
+
+    def _move_batch(
+        self,
+        conn: sqlite3.Connection,
+        columns: Dict[str, List[str]],
+        year: str,
+        criteria: str,
+        criteria_params: Tuple[Any, ...],
+        batch_size: int,
+    ) -> int:
+        ids = [
+            row[0]
+            for row in conn.execute(
+                f"SELECT id FROM main.orders WHERE {criteria} AND strftime('%Y', created_at) = ? "
+                "ORDER BY id LIMIT ?",
+                (*criteria_params, year, batch_size),
+            )
+        ]
+        if not ids:
+            return 0
+        order_columns = ", ".join(columns["orders"])
+        snapshot_names = ", ".join(name for name, _, _ in ORDER_SNAPSHOT_COLUMNS)
+        snapshot_values = ", ".join(expression for _, _, expression in ORDER_SNAPSHOT_COLUMNS)
+        selected_orders = ", ".join(f"o.{name}" for name in columns["orders"])
+        id_list = ", ".join(["?"] * len(ids))
+        conn.execute(
+            f"INSERT OR REPLACE INTO arch.orders ({order_columns}, {snapshot_names}) "
+            f"SELECT {selected_orders}, {snapshot_values} "
+            "FROM main.orders o "
+            "LEFT JOIN main.clients c ON c.id = o.client_id "
+            "LEFT JOIN main.vehicles v ON v.id = o.vehicle_id "
+            "LEFT JOIN main.brands b ON b.id = v.brand_id "
+            "LEFT JOIN main.vehicle_models m ON m.id = v.model_id "
+            f"WHERE o.id IN ({id_list})",
+            ids,
+        )
+        for table in ("order_items", "order_collaborators"):
+            table_columns = ", ".join(columns[table])
+            conn.execute(
+                f"INSERT OR REPLACE INTO arch.{table} ({table_columns}) "
+                f"SELECT {table_columns} FROM main.{table} WHERE order_id IN ({id_list})",
+                ids,
+            )
+        # Items and collaborators follow through ON DELETE CASCADE; the hold keeps the
+        # archived orders in the revenue rollups.
+        conn.executemany("INSERT OR IGNORE INTO main.revenue_hold (order_id) VALUES (?)", [(i,) for i in ids])
+        conn.execute(f"DELETE FROM main.orders WHERE id IN ({id_list})", ids)
+        conn.execute("DELETE FROM main.revenue_hold")
+        return len(ids)
+
+    def compact(self, full_conversion: bool = False) -> Optional[int]:
+        # None means nothing could be freed: databases created before auto_vacuum = INCREMENTAL
+        # need the one-off full_conversion (a VACUUM that rewrites the whole file).
+        with database_manager.get_connection() as conn:
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if auto_vacuum != 2:
+                if not full_conversion:
+                    return None
+                conn.commit()
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                return 0
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript steps the pragma to completion; execute() would release a single page.
+            conn.executescript("PRAGMA incremental_vacuum;")
+            return free_pages
+
+    @contextmanager
+    def _attached(self, conn: sqlite3.Connection, years: Sequence[str]) -> Iterator[List[str]]:
+        aliases: List[str] = []
+        try:
+            for year in years:
+                alias = f"arch_{year}"
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (str(self.archive_path(year)),))
+                aliases.append(alias)
+            yield aliases
+        finally:
+            conn.commit()
+            for alias in aliases:
+                conn.execute(f"DETACH DATABASE {alias}")
+
+    def iter_orders(
+        self,
+        vehicle_id: Optional[int] = None,
+        client_id: Optional[int] = None,
+        years: Optional[Sequence[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        available = [year for year in (years or self.list_years()) if self.archive_path(year).exists()]
+        clauses, params = [], []
+        if vehicle_id is not None:
+            clauses.append("vehicle_id = ?")
+            params.append(vehicle_id)
+        if client_id is not None:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with database_manager.get_connection() as conn:
+            for start in range(0, len(available), MAX_ATTACHED):
+                with self._attached(conn, available[start:start + MAX_ATTACHED]) as aliases:
+                    for alias in aliases:
+                        cursor = conn.execute(
+                            f"SELECT *, 1 AS archived FROM {alias}.orders{where} ORDER BY created_at",
+                            params,
+                        )
+                        # Closed before _attached detaches, even when the caller abandons the generator;
+                        # DETACH fails while a statement on the archive is still open.
+                        try:
+                            for row in cursor:
+                                order = dict(row)
+                                order["items"] = [
+                                    dict(item)
+                                    for item in conn.execute(
+                                        f"SELECT oi.*, COALESCE(s.name, '') AS service_name "
+                                        f"FROM {alias}.order_items oi "
+                                        "LEFT JOIN main.services s ON s.id = oi.service_id "
+                                        "WHERE oi.order_id = ? ORDER BY oi.id",
+                                        (order["id"],),
+                                    )
+                                ]
+                                order["collaborators"] = [
+                                    dict(collaborator)
+                                    for collaborator in conn.execute(
+                                        f"SELECT oc.collaborator_id, COALESCE(cb.full_name, '') AS full_name "
+                                        f"FROM {alias}.order_collaborators oc "
+                                        "LEFT JOIN main.collaborators cb ON cb.id = oc.collaborator_id "
+                                        "WHERE oc.order_id = ? ORDER BY oc.id",
+                                        (order["id"],),
+                                    )
+                                ]
+                                yield order
+                        finally:
+                            cursor.close()
+
+    def vehicle_history(self, vehicle_id: int) -> List[Dict[str, Any]]:
+        return list(self.iter_orders(vehicle_id=vehicle_id))
+
+
+archive_service = ArchiveService()
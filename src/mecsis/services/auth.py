@@ -6,10 +6,20 @@ from sqlite3 import IntegrityError
 import bcrypt
 
 from .base import BaseService
+from .remote import bind_service
+
+
+def _public_user(user: Optional[dict]) -> Optional[dict]:
+    # The hash stays in the database; it would otherwise travel to terminals in server mode.
+    if user is not None:
+        user.pop("password_hash", None)
+    return user
 
 
 class AuthService(BaseService):
     table_name = "users"
+    # No user CRUD over the network: terminals sign in and edit their own profile, with the password.
+    rpc_methods = ("authenticate", "verify_credentials", "update_profile")
 
     def authenticate(self, username: str, password: str) -> Optional[dict]:
         user = self._fetch_one(
@@ -22,7 +32,7 @@ class AuthService(BaseService):
         if not stored_hash:
             return None
         if bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8")):
-            return user
+            return _public_user(user)
         return None
 
     def verify_credentials(self, username: str, password: str) -> bool:
@@ -39,10 +49,14 @@ class AuthService(BaseService):
     def update_profile(
         self,
         user_id: int,
+        current_password: str,
         username: str,
         display_name: str,
         new_password: Optional[str] = None,
     ) -> dict:
+        user = self._fetch_one("SELECT username FROM users WHERE id = ?", (user_id,))
+        if not user or not self.verify_credentials(user["username"], current_password):
+            raise PermissionError("A senha atual informada esta incorreta.")
         username_clean = username.strip()
         display_clean = display_name.strip() or username_clean
         update_fields = {"username": username_clean, "display_name": display_clean}
@@ -59,7 +73,7 @@ class AuthService(BaseService):
             )
         except IntegrityError as exc:
             raise ValueError("Nome de usuario indisponivel. Escolha outro.") from exc
-        return self.get_by_id(user_id) or {}
+        return _public_user(self.get_by_id(user_id)) or {}
 
 
-auth_service = AuthService()
+auth_service = bind_service("auth_service", AuthService)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import gzip
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import sqlite3
+
+from ..database.connection import database_manager
+from ..utils.config import get_backup_dir, get_backup_settings
+from ..utils.metrics import instrument_class, metrics
+
+
+class BackupError(RuntimeError):
+    pass
+
+
+@dataclass
+class BackupResult:
+    path: Path
+    created_at: str
+    duration_seconds: float
+    database_bytes: int
+    compressed_bytes: int
+    pages: int
+    integrity: str
+
+    def summary(self) -> str:
+        return (
+            f"Backup {self.path.name} concluido em {self.duration_seconds:.1f}s: "
+            f"{self.database_bytes / 1024 / 1024:.1f} MB -> {self.compressed_bytes / 1024 / 1024:.1f} MB "
+            f"(integridade: {self.integrity})"
+        )
+
+
+@instrument_class
+class BackupService:
+    FILE_PREFIX = "mecsis-"
+    FILE_SUFFIX = ".db.gz"
+
+    def __init__(
+        self,
+        backup_dir: Optional[Path] = None,
+        pages_per_step: Optional[int] = None,
+        keep: Optional[int] = None,
+    ) -> None:
+        settings = get_backup_settings()
+        self._backup_dir = Path(backup_dir) if backup_dir else None
+        self.pages_per_step = pages_per_step or settings["pages_per_step"]
+        self.keep = keep or settings["keep"]
+        self.last_result: Optional[BackupResult] = None
+        self._lock = threading.Lock()
+
+    @property
+    def backup_dir(self) -> Path:
+        if self._backup_dir is None:
+            self._backup_dir = get_backup_dir()
+        self._backup_dir.mkdir(parents=True, exist_ok=True)
+        return self._backup_dir
+
+    def list_backups(self) -> List[Path]:
+        backups = self.backup_dir.glob(f"{self.FILE_PREFIX}*{self.FILE_SUFFIX}")
+        return sorted(backups, key=lambda path: path.stat().st_mtime_ns, reverse=True)
+
+    def run_backup(self, progress: Optional[Callable[[int, int], None]] = None) -> BackupResult:
+        with self._lock:
+            database_manager.initialize()
+            started = time.perf_counter()
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            target_path = self.backup_dir / f"{self.FILE_PREFIX}{stamp}{self.FILE_SUFFIX}"
+            sequence = 1
+            while target_path.exists():
+                target_path = self.backup_dir / f"{self.FILE_PREFIX}{stamp}-{sequence}{self.FILE_SUFFIX}"
+                sequence += 1
+            snapshot_path = target_path.with_name(target_path.name[: -len(self.FILE_SUFFIX)] + ".db.partial")
+            pages_copied = 0
+
+            def on_progress(status: int, remaining: int, total: int) -> None:
+                nonlocal pages_copied
+                pages_copied = total - remaining
+                if progress:
+                    progress(pages_copied, total)
+
+            try:
+                source = sqlite3.connect(database_manager.db_path)
+                snapshot = sqlite3.connect(snapshot_path)
+                try:
+                    # Copying in small steps releases the read lock between steps so other writers keep going.
+                    source.backup(snapshot, pages=self.pages_per_step, progress=on_progress, sleep=0.05)
+                    integrity = snapshot.execute("PRAGMA integrity_check").fetchone()[0]
+                finally:
+                    snapshot.close()
+                    source.close()
+                if integrity != "ok":
+                    raise BackupError(f"Falha na verificacao de integridade do backup: {integrity}")
+
+                database_bytes = snapshot_path.stat().st_size
+                with open(snapshot_path, "rb") as raw, gzip.open(target_path, "wb", compresslevel=6) as packed:
+                    shutil.copyfileobj(raw, packed, length=1024 * 1024)
+            finally:
+                snapshot_path.unlink(missing_ok=True)
+
+            result = BackupResult(
+                path=target_path,
+                created_at=datetime.now().isoformat(timespec="seconds"),
+                duration_seconds=time.perf_counter() - started,
+                database_bytes=database_bytes,
+                compressed_bytes=target_path.stat().st_size,
+                pages=pages_copied,
+                integrity=integrity,
+            )
+            self._rotate()
+            self.last_result = result
+            metrics.incr("backup.completed")
+            return result
+
+    def _rotate(self) -> None:
+        for stale in self.list_backups()[self.keep:]:
+            stale.unlink(missing_ok=True)
+
+    def restore(self, backup_path: Path, destination: Path) -> Path:
+        destination = Path(destination)
+        with gzip.open(backup_path, "rb") as packed, open(destination, "wb") as raw:
+            shutil.copyfileobj(packed, raw, length=1024 * 1024)
+        return destination
+
+
+class BackupScheduler(threading.Thread):
+    def __init__(
+        self,
+        service: BackupService,
+        interval_seconds: float,
+        on_result: Optional[Callable[[BackupResult], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        super().__init__(name="mecsis-backup", daemon=True)
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.on_result = on_result
+        self.on_error = on_error
+        self.last_error: Optional[Exception] = None
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def from_config(cls, service: Optional[BackupService] = None) -> Optional["BackupScheduler"]:
+        interval_hours = get_backup_settings()["interval_hours"]
+        if interval_hours <= 0:
+            return None
+        return cls(service or backup_service, interval_hours * 3600)
+
+    def _seconds_until_due(self) -> float:
+        backups = self.service.list_backups()
+        if not backups:
+            return 0.0
+        age = time.time() - backups[0].stat().st_mtime
+        return max(0.0, self.interval_seconds - age)
+
+    def run(self) -> None:
+        wait = self._seconds_until_due()
+        while not self._stop_event.wait(wait):
+            try:
+                result = self.service.run_backup()
+                self.last_error = None
+                if self.on_result:
+                    self.on_result(result)
+            except (OSError, sqlite3.Error, BackupError) as exc:
+                self.last_error = exc
+                metrics.incr("backup.failed")
+                if self.on_error:
+                    self.on_error(exc)
+            wait = self.interval_seconds
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+backup_service = BackupService()
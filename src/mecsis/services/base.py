@@ -1,31 +1,93 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 import sqlite3
 
 from ..database.connection import database_manager
+from ..models.records import record_type
+from ..utils.config import get_fetch_batch_size
+from ..utils.metrics import instrument_class, metrics
+
+
+# Generic record methods a service may offer to terminals in server mode (see services/remote.py).
+CRUD_RPC_METHODS: Tuple[str, ...] = (
+    "get_by_id",
+    "list_by_ids",
+    "list_all",
+    "iter_all",
+    "insert",
+    "insert_many",
+    "update",
+    "delete",
+)
+
+
+class ConflictError(ValueError):
+    def __init__(
+        self,
+        message: str,
+        table: Optional[str] = None,
+        record_id: Any = None,
+        expected_version: Optional[int] = None,
+        current_version: Optional[int] = None,
+    ) -> None:
+        super().__init__(message)
+        self.table = table
+        self.record_id = record_id
+        self.expected_version = expected_version
+        self.current_version = current_version
 
 
 class BaseService:
     table_name: str
     primary_key: str = "id"
+    version_column: Optional[str] = None
+    # Methods the server publishes for this service; nothing is served unless listed here.
+    rpc_methods: Tuple[str, ...] = ()
+    fetch_batch_size: int = get_fetch_batch_size()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        instrument_class(cls)
+
     def __init__(self) -> None:
         self._columns_cache: Optional[Set[str]] = None
 
     def _fetch_columns(self) -> Set[str]:
+        metrics.record_cache("table_columns", self._columns_cache is not None)
         if self._columns_cache is None:
             with database_manager.get_connection() as conn:
                 cursor = conn.execute(f"PRAGMA table_info({self.table_name})")
                 self._columns_cache = {row["name"] for row in cursor.fetchall()}
         return self._columns_cache
 
-    def _fetch_all(self, query: str, params: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
+    def _iter_all(
+        self,
+        query: str,
+        params: Optional[Sequence[Any]] = None,
+        batch_size: Optional[int] = None,
+        compact: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        size = batch_size or self.fetch_batch_size
         with database_manager.get_connection() as conn:
             cursor = conn.execute(query, params or ())
-            rows = [dict(row) for row in cursor.fetchall()]
-        return rows
+            build = record_type([column[0] for column in cursor.description]) if compact else dict
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield build(row)
+
+    def _fetch_all(
+        self,
+        query: str,
+        params: Optional[Sequence[Any]] = None,
+        compact: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return list(self._iter_all(query, params, compact=compact))
 
     def _fetch_one(self, query: str, params: Optional[Sequence[Any]] = None) -> Optional[Dict[str, Any]]:
         with database_manager.get_connection() as conn:
@@ -38,13 +100,24 @@ class BaseService:
         query: str,
         params: Optional[Sequence[Any]] = None,
     ) -> int:
-        with database_manager.get_connection() as conn:
-            cursor = conn.execute(query, params or ())
-            return cursor.lastrowid
+        return database_manager.run_write(lambda conn: conn.execute(query, params or ()).lastrowid)
 
-    def list_all(self) -> List[Dict[str, Any]]:
+    def iter_all(self, batch_size: Optional[int] = None, compact: bool = False) -> Iterator[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name} ORDER BY {self.primary_key} DESC"
-        return self._fetch_all(query)
+        yield from self._iter_all(query, batch_size=batch_size, compact=compact)
+
+    def list_all(self, compact: bool = False) -> List[Dict[str, Any]]:
+        return list(self.iter_all(compact=compact))
+
+    @staticmethod
+    def _id_filter(column: str, ids: Sequence[Any]) -> str:
+        return f"{column} IN ({', '.join(['?'] * len(ids))})"
+
+    def list_by_ids(self, ids: Sequence[Any], compact: bool = False) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        query = f"SELECT * FROM {self.table_name} WHERE {self._id_filter(self.primary_key, ids)}"
+        return self._fetch_all(query, list(ids), compact=compact)
 
     def get_by_id(self, record_id: Any) -> Optional[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name} WHERE {self.primary_key} = ?"
@@ -66,19 +139,156 @@ class BaseService:
 
     def update(self, record_id: Any, payload: Dict[str, Any]) -> None:
         columns = self._fetch_columns()
+        expected_version = payload.get(self.version_column) if self.version_column else None
         filtered_payload = {
             key: (int(value) if isinstance(value, bool) else value)
             for key, value in payload.items()
-            if key in columns
+            if key in columns and key != self.version_column
         }
         if "updated_at" in columns and "updated_at" not in filtered_payload:
             filtered_payload["updated_at"] = datetime.utcnow().isoformat(timespec="seconds")
         if not filtered_payload:
             return
         assignments = ", ".join(f"{key} = ?" for key in filtered_payload.keys())
+        if self.version_column:
+            assignments += f", {self.version_column} = {self.version_column} + 1"
         query = f"UPDATE {self.table_name} SET {assignments} WHERE {self.primary_key} = ?"
         params = tuple(filtered_payload.values()) + (record_id,)
-        self._execute(query, params)
+        if expected_version is None:
+            self._execute(query, params)
+            return
+        query += f" AND {self.version_column} = ?"
+        params += (int(expected_version),)
+
+        def update(conn: sqlite3.Connection) -> None:
+            if conn.execute(query, params).rowcount == 0:
+                self._raise_conflict(conn, record_id, int(expected_version))
+
+        database_manager.run_write(update)
+
+    def _raise_conflict(self, conn: sqlite3.Connection, record_id: Any, expected_version: int) -> None:
+        row = conn.execute(
+            f"SELECT {self.version_column} FROM {self.table_name} WHERE {self.primary_key} = ?",
+            (record_id,),
+        ).fetchone()
+        if row is None:
+            raise ConflictError(
+                "O registro foi excluido por outro usuario.",
+                self.table_name,
+                record_id,
+                expected_version,
+            )
+        raise ConflictError(
+            "O registro foi alterado por outro usuario depois de aberto. Recarregue os dados antes de salvar.",
+            self.table_name,
+            record_id,
+            expected_version,
+            row[0],
+        )
+
+    def _bulk_columns(self, payloads: Sequence[Dict[str, Any]], exclude: Sequence[str] = ()) -> List[str]:
+        # One statement serves the whole batch, so every payload must carry the same columns;
+        # padding the gaps with NULL would overwrite values and column defaults.
+        columns = self._fetch_columns()
+        keys = [key for key in payloads[0].keys() if key in columns and key not in exclude]
+        expected = set(keys)
+        for payload in payloads[1:]:
+            if {key for key in payload.keys() if key in columns and key not in exclude} != expected:
+                raise ValueError("Todos os registros do lote devem informar as mesmas colunas.")
+        return keys
+
+    @staticmethod
+    def _bulk_row(payload: Dict[str, Any], keys: Sequence[str]) -> tuple:
+        return tuple(
+            int(value) if isinstance(value, bool) else value
+            for value in (payload[key] for key in keys)
+        )
+
+    def insert_many(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        conflict_columns: Optional[Sequence[str]] = None,
+    ) -> List[int]:
+        rows = list(payloads)
+        if not rows:
+            return []
+        keys = self._bulk_columns(rows)
+        if not keys:
+            return []
+        if self.primary_key in keys and not conflict_columns:
+            raise ValueError(f"Insercao em lote nao aceita {self.primary_key} informado; use insert para cada registro.")
+        columns = self._fetch_columns()
+        if conflict_columns:
+            unknown = set(conflict_columns) - columns
+            if unknown:
+                raise ValueError(f"Colunas de conflito invalidas: {', '.join(sorted(unknown))}")
+        stamp_updated_at = bool(conflict_columns) and "updated_at" in columns and "updated_at" not in keys
+        insert_keys = keys + ["updated_at"] if stamp_updated_at else keys
+        columns_clause = ", ".join(insert_keys)
+        placeholders = ", ".join(["?"] * len(insert_keys))
+        query = f"INSERT INTO {self.table_name} ({columns_clause}) VALUES ({placeholders})"
+        updated_at = datetime.utcnow().isoformat(timespec="seconds")
+        params = [
+            self._bulk_row(row, keys) + ((updated_at,) if stamp_updated_at else ())
+            for row in rows
+        ]
+
+        if conflict_columns:
+            assignments = ", ".join(
+                f"{key} = excluded.{key}"
+                for key in insert_keys
+                if key not in conflict_columns and key not in (self.primary_key, self.version_column)
+            )
+            if assignments and self.version_column:
+                assignments += f", {self.version_column} = {self.version_column} + 1"
+            action = f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING"
+            upsert_query = (
+                f"{query} ON CONFLICT ({', '.join(conflict_columns)}) {action} "
+                f"RETURNING {self.primary_key}"
+            )
+
+            def upsert(conn: sqlite3.Connection) -> List[int]:
+                ids = []
+                for values in params:
+                    row = conn.execute(upsert_query, values).fetchone()
+                    ids.append(row[0] if row else 0)
+                return ids
+
+            return database_manager.run_write(upsert)
+
+        def insert(conn: sqlite3.Connection) -> List[int]:
+            conn.executemany(query, params)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            # AUTOINCREMENT keys are assigned consecutively while the transaction holds the write lock.
+            return list(range(last_id - len(params) + 1, last_id + 1))
+
+        return database_manager.run_write(insert)
+
+    def update_many(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        rows = list(payloads)
+        if not rows:
+            return 0
+        keys = self._bulk_columns(rows, exclude=(self.primary_key, self.version_column or ""))
+        columns = self._fetch_columns()
+        stamp_updated_at = "updated_at" in columns and "updated_at" not in keys
+        if not keys and not stamp_updated_at:
+            return 0
+        assignments = [f"{key} = ?" for key in keys]
+        if stamp_updated_at:
+            assignments.append("updated_at = ?")
+        if self.version_column:
+            assignments.append(f"{self.version_column} = {self.version_column} + 1")
+        query = f"UPDATE {self.table_name} SET {', '.join(assignments)} WHERE {self.primary_key} = ?"
+        updated_at = datetime.utcnow().isoformat(timespec="seconds")
+        params = []
+        for row in rows:
+            if row.get(self.primary_key) is None:
+                raise ValueError(f"Registro sem {self.primary_key} informado para atualizacao em lote.")
+            values = self._bulk_row(row, keys)
+            if stamp_updated_at:
+                values += (updated_at,)
+            params.append(values + (row[self.primary_key],))
+        return database_manager.run_write(lambda conn: conn.executemany(query, params).rowcount)
 
     def delete(self, record_id: Any) -> None:
         query = f"DELETE FROM {self.table_name} WHERE {self.primary_key} = ?"
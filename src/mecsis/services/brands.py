@@ -2,15 +2,17 @@ from __future__ import annotations
 
 from typing import Dict, List
 
-from .base import BaseService
+from .base import CRUD_RPC_METHODS, BaseService
+from .remote import bind_service
 
 
 class BrandService(BaseService):
     table_name = "brands"
+    rpc_methods = CRUD_RPC_METHODS
 
-    def list_all(self) -> List[Dict]:
+    def list_all(self, compact: bool = False) -> List[Dict]:
         query = "SELECT * FROM brands ORDER BY name"
-        return self._fetch_all(query)
+        return self._fetch_all(query, compact=compact)
 
 
-brand_service = BrandService()
+brand_service = bind_service("brand_service", BrandService)
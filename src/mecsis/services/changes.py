@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .base import BaseService
+from .remote import bind_service
+
+
+class ChangeLogService(BaseService):
+    table_name = "change_log"
+    rpc_methods = ("current_seq", "changes_since")
+    primary_key = "seq"
+
+    def current_seq(self) -> int:
+        row = self._fetch_one("SELECT COALESCE(MAX(seq), 0) AS seq FROM change_log")
+        return int(row["seq"]) if row else 0
+
+    def changes_since(
+        self,
+        seq: int,
+        tables: Optional[Sequence[str]] = None,
+        limit: int = 5000,
+    ) -> Dict[str, Any]:
+        bounds = self._fetch_one("SELECT MIN(seq) AS oldest, COALESCE(MAX(seq), 0) AS newest FROM change_log")
+        oldest = bounds["oldest"] if bounds else None
+        newest = int(bounds["newest"]) if bounds else 0
+        # A gap means the log was trimmed past the caller's position; only a full reload is safe.
+        if oldest is not None and oldest > seq + 1:
+            return {"seq": newest, "truncated": True, "changes": []}
+        query = "SELECT seq, table_name, row_id, operation FROM change_log WHERE seq > ? AND seq <= ?"
+        params: List[Any] = [seq, newest]
+        if tables:
+            query += f" AND table_name IN ({', '.join(['?'] * len(tables))})"
+            params.extend(tables)
+        query += " ORDER BY seq LIMIT ?"
+        params.append(limit + 1)
+        rows = self._fetch_all(query, params)
+        if len(rows) > limit:
+            return {"seq": newest, "truncated": True, "changes": []}
+
+        latest: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for row in rows:
+            key = (row["table_name"], row["row_id"])
+            previous = latest.pop(key, None)
+            operation = row["operation"]
+            if previous and previous["op"] == "I" and operation == "U":
+                operation = "I"
+            latest[key] = {"table": row["table_name"], "id": row["row_id"], "op": operation}
+        return {"seq": newest, "truncated": False, "changes": list(latest.values())}
+
+
+change_log_service = bind_service("change_log_service", ChangeLogService)
@@ -1,30 +1,163 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from .base import BaseService
+from ..database.connection import database_manager
+from ..database.search_index import client_words_stale, sync_client_words
+from ..utils.normalize import fold_text, prefix_distance, trigrams
+from .base import CRUD_RPC_METHODS, BaseService
+from .remote import bind_service
+
+STATS_COLUMNS = "s.vehicle_count, s.order_count, s.last_visit, s.lifetime_spend"
+STATS_JOIN = "LEFT JOIN client_stats s ON s.client_id = c.id"
+# Sortable columns of list_with_stats; the client_stats ones have their own indexes, which the
+# list walks in order (every client gets its client_stats row from a trigger).
+STATS_SORT_COLUMNS = {
+    "id": "s.client_id",
+    "full_name": "c.full_name",
+    "vehicle_count": "s.vehicle_count",
+    "order_count": "s.order_count",
+    "last_visit": "s.last_visit",
+    "lifetime_spend": "s.lifetime_spend",
+}
 
 
 class ClientService(BaseService):
     table_name = "clients"
+    version_column = "version"
+    rpc_methods = CRUD_RPC_METHODS + ("search", "fuzzy_search", "get_summary", "list_page", "list_with_stats")
+
+    def __init__(self) -> None:
+        super().__init__()
+        # Change-log position up to which no client changed, checked by fuzzy_search.
+        self._words_clean_until = 0
 
     def search(self, keyword: str) -> List[Dict]:
+        # Name matches tolerant to accents and typos come first, then plain substring matches.
+        results = self.fuzzy_search(keyword, limit=200)
+        seen = {client["id"] for client in results}
         pattern = f"%{keyword}%"
         query = (
-            "SELECT * FROM clients "
-            "WHERE full_name LIKE ? OR document LIKE ? OR phone LIKE ? OR mobile LIKE ? "
-            "ORDER BY full_name"
+            f"SELECT c.*, {STATS_COLUMNS} FROM clients c {STATS_JOIN} "
+            "WHERE c.full_name LIKE ? OR c.document LIKE ? OR c.phone LIKE ? OR c.mobile LIKE ? "
+            "ORDER BY c.full_name"
+        )
+        results.extend(
+            client for client in self._fetch_all(query, (pattern, pattern, pattern, pattern)) if client["id"] not in seen
         )
-        return self._fetch_all(query, (pattern, pattern, pattern, pattern))
+        return results
+
+    def _matching_words(self, conn, token: str, budget: int, limit: int = 200) -> Dict[str, int]:
+        # Words starting with the token match outright (the user may still be typing); typos are
+        # found through the vocabulary trigrams, each edit breaking at most three of them.
+        upper_bound = token[:-1] + chr(ord(token[-1]) + 1)
+        words = {
+            row[0]: 0
+            for row in conn.execute(
+                "SELECT word FROM name_words WHERE word >= ? AND word < ? LIMIT ?", (token, upper_bound, limit)
+            )
+        }
+        if budget:
+            grams = sorted(trigrams(token, pad_end=False))
+            needed = max(1, len(grams) - 3 * budget)
+            cursor = conn.execute(
+                f"SELECT word FROM name_trigrams WHERE trigram IN ({', '.join(['?'] * len(grams))}) "
+                "GROUP BY word HAVING COUNT(*) >= ? ORDER BY COUNT(*) DESC LIMIT ?",
+                (*grams, needed, limit),
+            )
+            for (word,) in cursor:
+                if word not in words:
+                    distance = prefix_distance(token, word, budget)
+                    if distance <= budget:
+                        words[word] = distance
+        return words
+
+    def fuzzy_search(self, text: str, limit: int = 20, max_distance: Optional[int] = None) -> List[Dict[str, Any]]:
+        tokens = fold_text(text).split()
+        if len("".join(tokens)) < 2:
+            return []
+        with database_manager.get_connection() as conn:
+            stale, clean_until = client_words_stale(conn, self._words_clean_until)
+        self._words_clean_until = clean_until
+        if stale:
+            database_manager.run_write(lambda conn: sync_client_words(conn, clean_until))
+
+        with database_manager.get_connection() as conn:
+            matches = []
+            for index, token in enumerate(tokens):
+                budget = max_distance
+                if budget is None:
+                    budget = 0 if len(token) <= 3 else 1 if len(token) <= 5 else 2
+                words = self._matching_words(conn, token, budget)
+                if not words:
+                    return []
+                matches.extend((index, word, distance) for word, distance in words.items())
+            # Every query word must match some word of the name; the rank is the summed distance.
+            query = (
+                f"WITH q (token, word, distance) AS (VALUES {', '.join(['(?, ?, ?)'] * len(matches))}) "
+                f"SELECT c.*, {STATS_COLUMNS}, m.distance FROM ("
+                "  SELECT client_id, SUM(distance) AS distance FROM ("
+                "    SELECT cw.client_id, q.token, MIN(q.distance) AS distance "
+                "    FROM q JOIN client_words cw ON cw.word = q.word GROUP BY cw.client_id, q.token"
+                "  ) GROUP BY client_id HAVING COUNT(*) = ?"
+                f") AS m JOIN clients c ON c.id = m.client_id {STATS_JOIN} "
+                "ORDER BY m.distance, c.full_name LIMIT ?"
+            )
+            params = [value for match in matches for value in match] + [len(tokens), limit]
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def list_with_stats(
+        self,
+        order_by: str = "id",
+        descending: bool = True,
+        ids: Optional[Sequence[Any]] = None,
+        limit: Optional[int] = None,
+        compact: bool = False,
+    ) -> List[Dict[str, Any]]:
+        # Counts, last visit and spend come from client_stats, kept by triggers, so the list
+        # costs one join per client whatever the number of vehicles and orders.
+        if order_by not in STATS_SORT_COLUMNS:
+            raise ValueError(f"Ordenacao invalida: {order_by}.")
+        direction = "DESC" if descending else "ASC"
+        query = f"SELECT c.*, {STATS_COLUMNS} FROM client_stats s JOIN clients c ON c.id = s.client_id"
+        params: List[Any] = []
+        if ids is not None:
+            if not ids:
+                return []
+            query += f" WHERE {self._id_filter('s.client_id', ids)}"
+            params.extend(ids)
+        query += f" ORDER BY {STATS_SORT_COLUMNS[order_by]} {direction}, s.client_id {direction}"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._fetch_all(query, params, compact=compact)
+
+    def list_page(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        after_name: Optional[str] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        # Keyset pagination by name for pickers: pass the full_name/id of the last row to get the next page.
+        query = "SELECT id, full_name, document FROM clients"
+        clauses, params = [], []
+        if search:
+            pattern = f"%{search.strip()}%"
+            clauses.append("(full_name LIKE ? OR document LIKE ?)")
+            params.extend([pattern, pattern])
+        if after_name is not None and after_id is not None:
+            clauses.append("(full_name, id) > (?, ?)")
+            params.extend([after_name, after_id])
+        if clauses:
+            query += f" WHERE {' AND '.join(clauses)}"
+        query += " ORDER BY full_name, id LIMIT ?"
+        params.append(limit)
+        return self._fetch_all(query, params)
 
     def get_summary(self, client_id: int) -> Optional[Dict]:
-        query = (
-            "SELECT c.*, "
-            "(SELECT COUNT(*) FROM vehicles v WHERE v.client_id = c.id) AS vehicle_count, "
-            "(SELECT COUNT(*) FROM orders o WHERE o.client_id = c.id) AS order_count "
-            "FROM clients c WHERE c.id = ?"
-        )
+        query = f"SELECT c.*, {STATS_COLUMNS} FROM clients c {STATS_JOIN} WHERE c.id = ?"
         return self._fetch_one(query, (client_id,))
 
 
-client_service = ClientService()
+client_service = bind_service("client_service", ClientService)
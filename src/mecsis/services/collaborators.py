@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from calendar import monthrange
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 
-from .base import BaseService
+from ..database.connection import database_manager
+from ..utils.config import get_commission_rate
+from .base import CRUD_RPC_METHODS, BaseService
+from .remote import bind_service
 
 
 class CollaboratorService(BaseService):
     table_name = "collaborators"
+    rpc_methods = CRUD_RPC_METHODS + ("search", "list_active", "productivity", "period_commissions")
 
     def list_active(self) -> List[Dict]:
         query = "SELECT * FROM collaborators WHERE is_active = 1 ORDER BY full_name"
@@ -21,5 +27,85 @@ class CollaboratorService(BaseService):
         )
         return self._fetch_all(query, (pattern, pattern, pattern))
 
+    def productivity(
+        self,
+        start: str,
+        end: str,
+        commission_rate: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        rate = get_commission_rate() if commission_rate is None else commission_rate
+        # Each order's labor is split by worked hours (evenly when nobody logged hours). The delivery
+        # day expression matches idx_orders_delivered, so only the period's orders are read.
+        query = (
+            "WITH scoped AS ("
+            "  SELECT id, labor_cost FROM orders "
+            "  WHERE status = 'completed' AND date(COALESCE(actual_delivery, updated_at)) BETWEEN ? AND ?"
+            "), team AS ("
+            "  SELECT oc.order_id, SUM(COALESCE(oc.worked_hours, 0)) AS hours, COUNT(*) AS members "
+            "  FROM order_collaborators oc JOIN scoped s ON s.id = oc.order_id GROUP BY oc.order_id"
+            ") "
+            "SELECT c.id AS collaborator_id, c.full_name, COUNT(*) AS orders, "
+            "ROUND(SUM(COALESCE(oc.worked_hours, 0)), 2) AS hours, "
+            "ROUND(SUM(CASE WHEN t.hours > 0 THEN s.labor_cost * COALESCE(oc.worked_hours, 0) / t.hours "
+            "ELSE s.labor_cost / t.members END), 2) AS billed_labor, "
+            "ROUND(SUM(COALESCE(oc.worked_hours, 0)) * COALESCE(c.labor_rate, 0), 2) AS labor_pay "
+            "FROM order_collaborators oc "
+            "JOIN scoped s ON s.id = oc.order_id "
+            "JOIN team t ON t.order_id = oc.order_id "
+            "JOIN collaborators c ON c.id = oc.collaborator_id "
+            "GROUP BY c.id ORDER BY c.full_name"
+        )
+        rows = self._fetch_all(query, (start, end))
+        for row in rows:
+            row["commission_rate"] = rate
+            row["commission"] = round((row["billed_labor"] or 0) * rate, 2)
+        return rows
+
+    def period_commissions(self, period: str, refresh: bool = False) -> List[Dict[str, Any]]:
+        try:
+            month = datetime.strptime(period, "%Y-%m").date()
+        except ValueError as exc:
+            raise ValueError(f"Periodo invalido: {period}. Use AAAA-MM.") from exc
+        # Months that already ended are computed once and then served from collaborator_period_stats.
+        closed = period < date.today().strftime("%Y-%m")
+        if closed and not refresh:
+            cached = self._fetch_all(
+                "SELECT collaborator_id, full_name, orders_count AS orders, hours, billed_labor, labor_pay, "
+                "commission_rate, commission FROM collaborator_period_stats WHERE period = ? ORDER BY full_name",
+                (period,),
+            )
+            if cached:
+                return cached
+
+        start = month.isoformat()
+        end = month.replace(day=monthrange(month.year, month.month)[1]).isoformat()
+        rows = self.productivity(start, end)
+        if closed:
+
+            def store(conn) -> None:
+                conn.execute("DELETE FROM collaborator_period_stats WHERE period = ?", (period,))
+                conn.executemany(
+                    "INSERT INTO collaborator_period_stats "
+                    "(period, collaborator_id, full_name, orders_count, hours, billed_labor, labor_pay, "
+                    "commission_rate, commission) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            period,
+                            row["collaborator_id"],
+                            row["full_name"],
+                            row["orders"],
+                            row["hours"],
+                            row["billed_labor"],
+                            row["labor_pay"],
+                            row["commission_rate"],
+                            row["commission"],
+                        )
+                        for row in rows
+                    ],
+                )
+
+            database_manager.run_write(store)
+        return rows
+
 
-collaborator_service = CollaboratorService()
+collaborator_service = bind_service("collaborator_service", CollaboratorService)
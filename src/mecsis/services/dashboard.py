@@ -3,9 +3,14 @@ from __future__ import annotations
 from typing import Dict
 
 from ..database.connection import database_manager
+from ..utils.metrics import instrument_class
+from .remote import bind_service
 
 
+@instrument_class
 class DashboardService:
+    rpc_methods = ("get_counts",)
+
     def get_counts(self) -> Dict[str, int]:
         with database_manager.get_connection() as conn:
             clients = conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
@@ -24,4 +29,4 @@ class DashboardService:
         }
 
 
-dashboard_service = DashboardService()
+dashboard_service = bind_service("dashboard_service", DashboardService)
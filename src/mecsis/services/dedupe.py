@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import sqlite3
+
+from ..database.connection import database_manager
+from ..utils.metrics import instrument_class
+from ..utils.normalize import digits_only, fold_text, normalize_document, normalize_plate
+from .remote import bind_service
+
+# Blocks larger than this (a very common name, a shared company phone) say little about
+# identity and would bring back the quadratic comparison, so they are skipped.
+MAX_BLOCK_SIZE = 50
+CLIENT_FILL_COLUMNS = (
+    "email", "phone", "mobile", "zip_code", "address_line", "number",
+    "complement", "district", "city", "state", "notes",
+)
+VEHICLE_FILL_COLUMNS = ("brand_id", "model_id", "vin", "manufacture_year", "model_year", "color", "fuel_type", "notes")
+
+
+def _phone_key(value: Any) -> Optional[str]:
+    digits = digits_only(value)
+    # The last eight digits survive area-code, country-code and ninth-digit differences.
+    return digits[-8:] if len(digits) >= 8 else None
+
+
+def _name_similarity(left: str, right: str) -> float:
+    return SequenceMatcher(None, fold_text(left), fold_text(right)).ratio()
+
+
+def _candidate_pairs(rows: Dict[int, Dict[str, Any]], keys: Callable[[Dict[str, Any]], Iterable[str]]) -> Set[Tuple[int, int]]:
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for record_id, row in rows.items():
+        for key in set(keys(row)):
+            blocks[key].append(record_id)
+    pairs: Set[Tuple[int, int]] = set()
+    for members in blocks.values():
+        if 1 < len(members) <= MAX_BLOCK_SIZE:
+            pairs.update(combinations(sorted(members), 2))
+    return pairs
+
+
+@instrument_class
+class DedupeService:
+    rpc_methods = ("find_client_duplicates", "find_vehicle_duplicates", "merge_clients", "merge_vehicles")
+
+    def _client_keys(self, row: Dict[str, Any]) -> Iterable[str]:
+        document = normalize_document(row["document"])
+        if len(document) >= 6:
+            yield f"doc:{document}"
+        for column in ("phone", "mobile"):
+            phone = _phone_key(row.get(column))
+            if phone:
+                yield f"tel:{phone}"
+        words = fold_text(row["full_name"]).split()
+        if len(words) >= 2:
+            yield f"name:{words[0]} {words[-1]}"
+        if row.get("email"):
+            yield f"mail:{row['email'].strip().lower()}"
+
+    def _score_clients(self, left: Dict[str, Any], right: Dict[str, Any]) -> Tuple[float, List[str]]:
+        score, reasons = 0.0, []
+        if normalize_document(left["document"]) == normalize_document(right["document"]):
+            score += 0.6
+            reasons.append("documento")
+        left_phones = {_phone_key(left.get(column)) for column in ("phone", "mobile")} - {None}
+        right_phones = {_phone_key(right.get(column)) for column in ("phone", "mobile")} - {None}
+        if left_phones & right_phones:
+            score += 0.25
+            reasons.append("telefone")
+        if left.get("email") and (left["email"] or "").strip().lower() == (right.get("email") or "").strip().lower():
+            score += 0.15
+            reasons.append("e-mail")
+        similarity = _name_similarity(left["full_name"], right["full_name"])
+        score += 0.35 * similarity
+        if similarity >= 0.85:
+            reasons.append("nome")
+        return min(score, 1.0), reasons
+
+    def find_client_duplicates(self, min_score: float = 0.6) -> List[Dict[str, Any]]:
+        with database_manager.get_connection() as conn:
+            rows = {
+                row["id"]: dict(row)
+                for row in conn.execute("SELECT id, full_name, document, email, phone, mobile FROM clients")
+            }
+        return self._scored(rows, self._client_keys, self._score_clients, min_score, "full_name")
+
+    def _vehicle_keys(self, row: Dict[str, Any]) -> Iterable[str]:
+        if row.get("plate_key"):
+            yield f"plate:{row['plate_key']}"
+        vin = normalize_plate(row.get("vin"))
+        if len(vin) >= 11:
+            yield f"vin:{vin}"
+
+    def _score_vehicles(self, left: Dict[str, Any], right: Dict[str, Any]) -> Tuple[float, List[str]]:
+        score, reasons = 0.0, []
+        if left.get("plate_key") and left["plate_key"] == right.get("plate_key"):
+            score += 0.7
+            reasons.append("placa")
+        if left.get("vin") and normalize_plate(left["vin"]) == normalize_plate(right.get("vin")):
+            score += 0.6
+            reasons.append("chassi")
+        if left["client_id"] == right["client_id"]:
+            score += 0.2
+            reasons.append("cliente")
+        if left.get("model_id") and left["model_id"] == right.get("model_id"):
+            score += 0.1
+            reasons.append("modelo")
+        return min(score, 1.0), reasons
+
+    def find_vehicle_duplicates(self, min_score: float = 0.6) -> List[Dict[str, Any]]:
+        with database_manager.get_connection() as conn:
+            rows = {
+                row["id"]: dict(row)
+                for row in conn.execute("SELECT id, client_id, model_id, license_plate, plate_key, vin FROM vehicles")
+            }
+        return self._scored(rows, self._vehicle_keys, self._score_vehicles, min_score, "license_plate")
+
+    def _scored(
+        self,
+        rows: Dict[int, Dict[str, Any]],
+        keys: Callable[[Dict[str, Any]], Iterable[str]],
+        score: Callable[[Dict[str, Any], Dict[str, Any]], Tuple[float, List[str]]],
+        min_score: float,
+        label: str,
+    ) -> List[Dict[str, Any]]:
+        results = []
+        for left_id, right_id in _candidate_pairs(rows, keys):
+            value, reasons = score(rows[left_id], rows[right_id])
+            if value >= min_score:
+                results.append(
+                    {
+                        "keep_id": left_id,
+                        "duplicate_id": right_id,
+                        "keep_label": rows[left_id][label],
+                        "duplicate_label": rows[right_id][label],
+                        "score": round(value, 3),
+                        "reasons": reasons,
+                    }
+                )
+        results.sort(key=lambda pair: (-pair["score"], pair["keep_id"], pair["duplicate_id"]))
+        return results
+
+    @staticmethod
+    def _merge(
+        conn: sqlite3.Connection,
+        table: str,
+        keep_id: int,
+        duplicate_id: int,
+        fill_columns: Sequence[str],
+        repoint: Sequence[Tuple[str, str]],
+    ) -> Dict[str, int]:
+        if keep_id == duplicate_id:
+            raise ValueError("Escolha dois registros diferentes para mesclar.")
+        found = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE id IN (?, ?)", (keep_id, duplicate_id)).fetchone()[0]
+        if found != 2:
+            raise LookupError("Um dos registros nao existe mais; atualize a lista de duplicados.")
+        moved = {}
+        for child_table, column in repoint:
+            cursor = conn.execute(f"UPDATE {child_table} SET {column} = ? WHERE {column} = ?", (keep_id, duplicate_id))
+            moved[child_table] = cursor.rowcount
+        # Blank fields of the kept record take the duplicate's value; nothing filled in is overwritten.
+        assignments = ", ".join(
+            f"{column} = COALESCE(NULLIF({column}, ''), (SELECT {column} FROM {table} WHERE id = ?))"
+            for column in fill_columns
+        )
+        conn.execute(
+            f"UPDATE {table} SET {assignments}, version = version + 1, updated_at = datetime('now') WHERE id = ?",
+            (*([duplicate_id] * len(fill_columns)), keep_id),
+        )
+        conn.execute(f"DELETE FROM {table} WHERE id = ?", (duplicate_id,))
+        return moved
+
+    def merge_clients(self, keep_id: int, duplicate_id: int) -> Dict[str, int]:
+        return database_manager.run_write(
+            lambda conn: self._merge(
+                conn,
+                "clients",
+                keep_id,
+                duplicate_id,
+                CLIENT_FILL_COLUMNS,
+                (("vehicles", "client_id"), ("orders", "client_id")),
+            )
+        )
+
+    def merge_vehicles(self, keep_id: int, duplicate_id: int) -> Dict[str, int]:
+        def merge(conn: sqlite3.Connection) -> Dict[str, int]:
+            moved = self._merge(
+                conn,
+                "vehicles",
+                keep_id,
+                duplicate_id,
+                VEHICLE_FILL_COLUMNS,
+                (("orders", "vehicle_id"), ("vehicle_mileage", "vehicle_id")),
+            )
+            conn.execute(
+                "UPDATE vehicles SET mileage = (SELECT MAX(mileage) FROM vehicle_mileage WHERE vehicle_id = ?) "
+                "WHERE id = ? AND EXISTS (SELECT 1 FROM vehicle_mileage WHERE vehicle_id = ?)",
+                (keep_id, keep_id, keep_id),
+            )
+            return moved
+
+        return database_manager.run_write(merge)
+
+
+dedupe_service = bind_service("dedupe_service", DedupeService)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import platform
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from .. import __version__
+from ..database.connection import database_manager
+from ..utils.metrics import metrics
+from .backup import backup_service
+from .remote import bind_service
+
+
+class DiagnosticsService:
+    # export_json writes a file and reset clears the metrics; both act on the terminal itself.
+    rpc_methods = ("snapshot",)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = metrics.snapshot()
+        gauges = data["gauges"]
+        counters = data["counters"]
+        last_backup = backup_service.last_result
+        pool = database_manager.pool_stats()
+        pool_wait = data["timings"].get("db.pool_wait", {})
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "app_version": __version__,
+            "python_version": platform.python_version(),
+            "sqlite_version": sqlite3.sqlite_version,
+            "database_path": str(database_manager.db_path),
+            "storage": database_manager.storage_stats(),
+            "pragmas": self._pragmas(),
+            "connections": {
+                "opened": counters.get("db.connections_opened", 0),
+                "active": int(gauges.get("db.connections_active", 0)),
+                "peak": int(gauges.get("db.connections_active.peak", 0)),
+                # Waits happen only when every pooled connection is in use; timeouts end as "connection pool busy".
+                "pool": {
+                    **pool,
+                    "waits": counters.get("db.pool_waits", 0),
+                    "timeouts": pool_wait.get("errors", 0),
+                    "wait_avg_ms": pool_wait.get("avg_ms", 0.0),
+                    "wait_p95_ms": pool_wait.get("p95_ms", 0.0),
+                    "wait_max_ms": pool_wait.get("max_ms", 0.0),
+                },
+            },
+            "queries": counters.get("db.queries", 0),
+            "methods": data["timings"],
+            "cache": data["cache"],
+            "counters": counters,
+            "slow_query_threshold_ms": data["slow_query_threshold_ms"],
+            "slow_queries": data["slow_queries"],
+            "last_backup": (
+                {
+                    "path": str(last_backup.path),
+                    "created_at": last_backup.created_at,
+                    "duration_seconds": round(last_backup.duration_seconds, 3),
+                    "database_bytes": last_backup.database_bytes,
+                    "compressed_bytes": last_backup.compressed_bytes,
+                    "integrity": last_backup.integrity,
+                }
+                if last_backup
+                else None
+            ),
+        }
+
+    def _pragmas(self) -> Dict[str, Any]:
+        # Reading them takes a connection; a saturated pool must not keep the snapshot from showing it.
+        try:
+            return database_manager.pragma_profile()
+        except sqlite3.OperationalError as exc:
+            return {"erro": str(exc)}
+
+    def export_json(self, destination: Path) -> Path:
+        destination = Path(destination)
+        destination.write_text(
+            json.dumps(self.snapshot(), indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        return destination
+
+    def reset(self) -> None:
+        metrics.reset()
+
+
+diagnostics_service = bind_service("diagnostics_service", DiagnosticsService, local_methods=("export_json", "reset"))
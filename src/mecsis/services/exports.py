@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import sqlite3
+
+from ..database.connection import database_manager
+from ..utils.config import get_fetch_batch_size
+
+ORDER_COLUMNS = [
+    "order_number",
+    "status",
+    "created_at",
+    "updated_at",
+    "expected_delivery",
+    "actual_delivery",
+    "client_name",
+    "client_document",
+    "license_plate",
+    "brand_name",
+    "model_name",
+    "responsible_name",
+    "summary",
+    "payment_method",
+    "labor_cost",
+    "parts_cost",
+    "discount",
+    "total_amount",
+]
+
+ITEM_COLUMNS = [
+    "service_name",
+    "description",
+    "quantity",
+    "unit_price",
+    "discount",
+    "total_price",
+    "notes",
+]
+
+
+@dataclass
+class ExportReport:
+    path: Path
+    orders: int = 0
+    items: int = 0
+    bytes_written: int = 0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.orders} ordens e {self.items} itens exportados para {self.path} "
+            f"({self.bytes_written / 1024:.1f} KB em {self.elapsed_seconds:.2f}s)"
+        )
+
+
+def _iter_rows(cursor: sqlite3.Cursor, batch_size: int) -> Iterator[sqlite3.Row]:
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _iter_groups(cursor: sqlite3.Cursor, batch_size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    current_id: Optional[int] = None
+    group: List[Dict[str, Any]] = []
+    for row in _iter_rows(cursor, batch_size):
+        record = dict(row)
+        order_id = record.pop("order_id")
+        if order_id != current_id:
+            if current_id is not None:
+                yield current_id, group
+            current_id, group = order_id, []
+        group.append(record)
+    if current_id is not None:
+        yield current_id, group
+
+
+class _GroupCursor:
+    def __init__(self, groups: Iterator[Tuple[int, List[Dict[str, Any]]]]) -> None:
+        self._groups = groups
+        self._pending = next(groups, None)
+
+    def take(self, order_id: int) -> List[Dict[str, Any]]:
+        while self._pending is not None and self._pending[0] < order_id:
+            self._pending = next(self._groups, None)
+        if self._pending is not None and self._pending[0] == order_id:
+            rows = self._pending[1]
+            self._pending = next(self._groups, None)
+            return rows
+        return []
+
+
+class ExportService:
+    def _filters(
+        self,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        statuses: Optional[Sequence[str]],
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if start_date:
+            clauses.append("o.created_at >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("o.created_at < date(?, '+1 day')")
+            params.append(end_date)
+        if statuses:
+            clauses.append(f"o.status IN ({', '.join(['?'] * len(statuses))})")
+            params.extend(statuses)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def iter_orders(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        statuses: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        size = batch_size or get_fetch_batch_size()
+        where, params = self._filters(start_date, end_date, statuses)
+        orders_query = (
+            "SELECT o.id, o.order_number, o.status, o.created_at, o.updated_at, o.expected_delivery, "
+            "o.actual_delivery, c.full_name AS client_name, c.document AS client_document, "
+            "v.license_plate, COALESCE(b.name, '') AS brand_name, COALESCE(m.name, '') AS model_name, "
+            "COALESCE(r.full_name, '') AS responsible_name, o.summary, o.payment_method, "
+            "o.labor_cost, o.parts_cost, o.discount, o.total_amount "
+            "FROM orders o "
+            "JOIN clients c ON c.id = o.client_id "
+            "JOIN vehicles v ON v.id = o.vehicle_id "
+            "LEFT JOIN brands b ON b.id = v.brand_id "
+            "LEFT JOIN vehicle_models m ON m.id = v.model_id "
+            "LEFT JOIN collaborators r ON r.id = o.responsible_id"
+            f"{where} ORDER BY o.id"
+        )
+        items_query = (
+            "SELECT oi.order_id, s.name AS service_name, oi.description, oi.quantity, oi.unit_price, "
+            "oi.discount, oi.total_price, oi.notes "
+            "FROM order_items oi "
+            "JOIN orders o ON o.id = oi.order_id "
+            "JOIN services s ON s.id = oi.service_id"
+            f"{where} ORDER BY oi.order_id, oi.id"
+        )
+        collaborators_query = (
+            "SELECT oc.order_id, cb.full_name, oc.worked_hours "
+            "FROM order_collaborators oc "
+            "JOIN orders o ON o.id = oc.order_id "
+            "JOIN collaborators cb ON cb.id = oc.collaborator_id"
+            f"{where} ORDER BY oc.order_id, oc.id"
+        )
+        with database_manager.get_connection() as conn:
+            items = _GroupCursor(_iter_groups(conn.execute(items_query, params), size))
+            collaborators = _GroupCursor(_iter_groups(conn.execute(collaborators_query, params), size))
+            for row in _iter_rows(conn.execute(orders_query, params), size):
+                order = dict(row)
+                order["items"] = items.take(order["id"])
+                order["collaborators"] = collaborators.take(order["id"])
+                yield order
+
+    def export_orders(
+        self,
+        destination: Path,
+        fmt: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        statuses: Optional[Sequence[str]] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        destination = Path(destination)
+        if compress is None:
+            compress = destination.suffix == ".gz"
+        if fmt is None:
+            suffixes = [suffix for suffix in destination.suffixes if suffix != ".gz"]
+            fmt = "jsonl" if suffixes and suffixes[-1] in (".jsonl", ".ndjson", ".json") else "csv"
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError("Formato de exportacao invalido. Use csv ou jsonl.")
+
+        report = ExportReport(destination)
+        started = time.perf_counter()
+        temp_path = destination.with_name(destination.name + ".tmp")
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        handle: TextIO
+        if compress:
+            handle = gzip.open(temp_path, "wt", encoding="utf-8", newline="")  # type: ignore[assignment]
+        else:
+            handle = open(temp_path, "w", encoding="utf-8", newline="")
+        try:
+            with handle:
+                orders = self.iter_orders(start_date, end_date, statuses)
+                if fmt == "csv":
+                    self._write_csv(handle, orders, report)
+                else:
+                    self._write_jsonl(handle, orders, report)
+            os.replace(temp_path, destination)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        report.bytes_written = destination.stat().st_size
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    def _write_csv(self, handle: TextIO, orders: Iterator[Dict[str, Any]], report: ExportReport) -> None:
+        item_headers = [f"item_{column}" for column in ITEM_COLUMNS]
+        writer = csv.writer(handle)
+        writer.writerow(ORDER_COLUMNS + ["collaborators"] + item_headers)
+        for order in orders:
+            report.orders += 1
+            base = [order.get(column) for column in ORDER_COLUMNS]
+            base.append("; ".join(collab["full_name"] for collab in order["collaborators"]))
+            if not order["items"]:
+                writer.writerow(base + [None] * len(ITEM_COLUMNS))
+                continue
+            for item in order["items"]:
+                report.items += 1
+                writer.writerow(base + [item.get(column) for column in ITEM_COLUMNS])
+
+    def _write_jsonl(self, handle: TextIO, orders: Iterator[Dict[str, Any]], report: ExportReport) -> None:
+        for order in orders:
+            report.orders += 1
+            report.items += len(order["items"])
+            order.pop("id", None)
+            handle.write(json.dumps(order, ensure_ascii=False) + "\n")
+
+
+export_service = ExportService()
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from sqlite3 import IntegrityError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from ..utils.normalize import normalize_document, normalize_name, normalize_plate, plate_key
+from .brands import brand_service
+from .clients import client_service
+from .models import model_service
+from .vehicles import vehicle_service
+
+FIELD_ALIASES = {
+    "nome": "full_name",
+    "nome_completo": "full_name",
+    "cliente": "full_name",
+    "documento": "document",
+    "cpf": "document",
+    "cnpj": "document",
+    "cpf_cnpj": "document",
+    "telefone": "phone",
+    "celular": "mobile",
+    "cep": "zip_code",
+    "endereco": "address_line",
+    "numero": "number",
+    "complemento": "complement",
+    "bairro": "district",
+    "cidade": "city",
+    "uf": "state",
+    "estado": "state",
+    "observacoes": "notes",
+    "placa": "license_plate",
+    "chassi": "vin",
+    "marca": "brand_name",
+    "brand": "brand_name",
+    "modelo": "model_name",
+    "model": "model_name",
+    "ano_fabricacao": "manufacture_year",
+    "ano_modelo": "model_year",
+    "cor": "color",
+    "combustivel": "fuel_type",
+    "quilometragem": "mileage",
+    "km": "mileage",
+    "documento_cliente": "client_document",
+    "cliente_documento": "client_document",
+}
+
+
+@dataclass
+class ImportReport:
+    entity: str
+    read: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    elapsed_seconds: float = 0.0
+    reject_path: Optional[Path] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def summary(self) -> str:
+        text = (
+            f"{self.entity}: {self.read} lidos, {self.inserted} importados, {self.rejected} rejeitados "
+            f"em {self.elapsed_seconds:.2f}s ({self.rows_per_second:.0f} linhas/s)"
+        )
+        if self.rejected and self.reject_path:
+            text += f". Rejeitados em {self.reject_path}"
+        return text
+
+
+def _open_text(path: Path, mode: str) -> TextIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8-sig" if mode == "r" else "utf-8", newline="")
+
+
+def _source_format(path: Path) -> str:
+    suffixes = [suffix.lower() for suffix in path.suffixes if suffix.lower() != ".gz"]
+    if suffixes and suffixes[-1] in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    return "csv"
+
+
+def _canonical(row: Dict[str, Any]) -> Dict[str, Any]:
+    prepared: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        name = str(key).strip().lower().replace(" ", "_")
+        if isinstance(value, str):
+            value = value.strip()
+        # An empty CSV cell is left out like a missing JSONL key, so the column default applies.
+        if value != "":
+            prepared[FIELD_ALIASES.get(name, name)] = value
+    return prepared
+
+
+def _by_columns(
+    payloads: List[Dict[str, Any]],
+    originals: List[Dict[str, Any]],
+) -> List[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    # insert_many needs one column set per batch; grouping (instead of padding with None)
+    # keeps the column defaults for fields a row leaves out.
+    groups: Dict[Tuple[str, ...], Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = {}
+    for payload, raw in zip(payloads, originals):
+        group = groups.setdefault(tuple(sorted(payload)), ([], []))
+        group[0].append(payload)
+        group[1].append(raw)
+    return list(groups.values())
+
+
+@dataclass
+class MalformedLine:
+    text: str
+    reason: str
+
+
+class RejectWriter:
+    def __init__(self, path: Path, source_format: str) -> None:
+        self.path = path
+        self.source_format = source_format
+        self._handle: Optional[TextIO] = None
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, row: Dict[str, Any], reason: str) -> None:
+        record = {**row, "motivo": reason}
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = _open_text(self.path, "w")
+            if self.source_format == "csv":
+                self._writer = csv.DictWriter(self._handle, fieldnames=list(record.keys()), extrasaction="ignore")
+                self._writer.writeheader()
+        if self._writer is not None:
+            self._writer.writerow(record)
+        else:
+            self._handle.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+
+
+class ImportService:
+    def __init__(self, chunk_size: int = 500) -> None:
+        self.chunk_size = chunk_size
+        self._brand_ids: Dict[str, int] = {}
+        self._model_ids: Dict[Tuple[int, str], int] = {}
+
+    def iter_source_rows(self, path: Path) -> Iterator[Any]:
+        path = Path(path)
+        with _open_text(path, "r") as handle:
+            if _source_format(path) == "jsonl":
+                for line in handle:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    # A broken line goes to the reject file instead of aborting the import.
+                    try:
+                        value = json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        yield MalformedLine(line, f"JSON invalido: {exc}")
+                        continue
+                    if isinstance(value, dict):
+                        yield value
+                    else:
+                        yield MalformedLine(line, "Linha nao e um objeto JSON")
+                return
+            sample = handle.read(4096)
+            handle.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.DictReader(handle, dialect=dialect)
+
+    def _run(
+        self,
+        entity: str,
+        path: Path,
+        reject_path: Optional[Path],
+        prepare: Callable[[Dict[str, Any]], Tuple[Optional[Dict[str, Any]], str]],
+        insert_chunk: Callable[[List[Dict[str, Any]]], int],
+    ) -> ImportReport:
+        path = Path(path)
+        report = ImportReport(entity)
+        report.reject_path = Path(reject_path) if reject_path else path.with_name(f"{path.stem}.rejeitados{path.suffix}")
+        rejects = RejectWriter(report.reject_path, _source_format(path))
+        started = time.perf_counter()
+        rows = self.iter_source_rows(path)
+        try:
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                accepted: List[Dict[str, Any]] = []
+                originals: List[Dict[str, Any]] = []
+                for raw in chunk:
+                    report.read += 1
+                    if isinstance(raw, MalformedLine):
+                        report.rejected += 1
+                        rejects.write({"linha": raw.text}, raw.reason)
+                        continue
+                    payload, reason = prepare(_canonical(raw))
+                    if payload is None:
+                        report.rejected += 1
+                        rejects.write(raw, reason)
+                        continue
+                    accepted.append(payload)
+                    originals.append(raw)
+                if not accepted:
+                    continue
+                for payloads, raws in _by_columns(accepted, originals):
+                    try:
+                        report.inserted += insert_chunk(payloads)
+                    except IntegrityError:
+                        for payload, raw in zip(payloads, raws):
+                            try:
+                                report.inserted += insert_chunk([payload])
+                            except IntegrityError as exc:
+                                report.rejected += 1
+                                rejects.write(raw, f"Conflito com registro existente: {exc}")
+        finally:
+            rows.close()
+            rejects.close()
+            report.elapsed_seconds = time.perf_counter() - started
+        if not report.rejected:
+            report.reject_path = None
+        return report
+
+    def _load_brands(self) -> None:
+        self._brand_ids = {row["name"].casefold(): row["id"] for row in brand_service.iter_all()}
+        self._model_ids = {
+            (row["brand_id"], row["name"].casefold()): row["id"] for row in model_service.iter_all()
+        }
+
+    def _resolve_brand(self, name: Optional[str]) -> Optional[int]:
+        clean = normalize_name(name)
+        if not clean:
+            return None
+        key = clean.casefold()
+        if key not in self._brand_ids:
+            self._brand_ids[key] = brand_service.insert_many([{"name": clean}], conflict_columns=["name"])[0]
+        return self._brand_ids[key]
+
+    def _resolve_model(self, brand_id: Optional[int], name: Optional[str]) -> Optional[int]:
+        clean = normalize_name(name)
+        if not brand_id or not clean:
+            return None
+        key = (brand_id, clean.casefold())
+        if key not in self._model_ids:
+            self._model_ids[key] = model_service.insert_many(
+                [{"brand_id": brand_id, "name": clean}],
+                conflict_columns=["brand_id", "name"],
+            )[0]
+        return self._model_ids[key]
+
+    def import_brands(self, path: Path, reject_path: Optional[Path] = None) -> ImportReport:
+        self._load_brands()
+        seen: Set[str] = set()
+
+        def prepare(row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+            name = normalize_name(row.get("name") or row.get("brand_name"))
+            if not name:
+                return None, "Nome da marca ausente"
+            key = name.casefold()
+            if key in self._brand_ids or key in seen:
+                return None, "Marca ja cadastrada"
+            seen.add(key)
+            return {"name": name}, ""
+
+        def insert_chunk(payloads: List[Dict[str, Any]]) -> int:
+            ids = brand_service.insert_many(payloads)
+            for payload, brand_id in zip(payloads, ids):
+                self._brand_ids[payload["name"].casefold()] = brand_id
+            return len(ids)
+
+        return self._run("marcas", path, reject_path, prepare, insert_chunk)
+
+    def import_models(self, path: Path, reject_path: Optional[Path] = None) -> ImportReport:
+        self._load_brands()
+        seen: Set[Tuple[int, str]] = set()
+
+        def prepare(row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+            name = normalize_name(row.get("model_name") or row.get("name"))
+            if not name:
+                return None, "Nome do modelo ausente"
+            brand_id = self._resolve_brand(row.get("brand_name"))
+            if not brand_id:
+                return None, "Marca do modelo ausente"
+            key = (brand_id, name.casefold())
+            if key in self._model_ids or key in seen:
+                return None, "Modelo ja cadastrado para esta marca"
+            seen.add(key)
+            return {"brand_id": brand_id, "name": name}, ""
+
+        def insert_chunk(payloads: List[Dict[str, Any]]) -> int:
+            ids = model_service.insert_many(payloads)
+            for payload, model_id in zip(payloads, ids):
+                self._model_ids[(payload["brand_id"], payload["name"].casefold())] = model_id
+            return len(ids)
+
+        return self._run("modelos", path, reject_path, prepare, insert_chunk)
+
+    def import_clients(self, path: Path, reject_path: Optional[Path] = None) -> ImportReport:
+        known_documents = {normalize_document(row["document"]) for row in client_service.iter_all()}
+
+        def prepare(row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+            full_name = normalize_name(row.get("full_name"))
+            document = normalize_document(row.get("document"))
+            if not full_name:
+                return None, "Nome do cliente ausente"
+            if not document:
+                return None, "Documento do cliente ausente"
+            if document in known_documents:
+                return None, "Documento ja cadastrado"
+            known_documents.add(document)
+            payload = {**row, "full_name": full_name, "document": document}
+            payload.pop("id", None)
+            return payload, ""
+
+        def insert_chunk(payloads: List[Dict[str, Any]]) -> int:
+            return len(client_service.insert_many(payloads))
+
+        return self._run("clientes", path, reject_path, prepare, insert_chunk)
+
+    def import_vehicles(self, path: Path, reject_path: Optional[Path] = None) -> ImportReport:
+        self._load_brands()
+        client_ids = {normalize_document(row["document"]): row["id"] for row in client_service.iter_all()}
+        known_plates = {plate_key(row["license_plate"]) for row in vehicle_service.iter_all()}
+
+        def prepare(row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+            plate = normalize_plate(row.get("license_plate"))
+            if not plate:
+                return None, "Placa ausente"
+            if plate_key(plate) in known_plates:
+                return None, "Placa ja cadastrada"
+            client_id = row.get("client_id") or client_ids.get(normalize_document(row.get("client_document")))
+            if not client_id:
+                return None, "Cliente nao encontrado pelo documento informado"
+            brand_id = row.get("brand_id") or self._resolve_brand(row.get("brand_name"))
+            model_id = row.get("model_id") or self._resolve_model(brand_id, row.get("model_name"))
+            known_plates.add(plate_key(plate))
+            payload = {
+                key: value
+                for key, value in row.items()
+                if key not in ("id", "client_document", "brand_name", "model_name")
+            }
+            payload.update(
+                {
+                    "client_id": client_id,
+                    "brand_id": brand_id,
+                    "model_id": model_id,
+                    "license_plate": plate,
+                }
+            )
+            return payload, ""
+
+        def insert_chunk(payloads: List[Dict[str, Any]]) -> int:
+            return len(vehicle_service.insert_many(payloads))
+
+        return self._run("veiculos", path, reject_path, prepare, insert_chunk)
+
+
+import_service = ImportService()
@@ -1,25 +1,29 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 
-from .base import BaseService
+from .base import CRUD_RPC_METHODS, BaseService
+from .remote import bind_service
 
 
 class VehicleModelService(BaseService):
     table_name = "vehicle_models"
+    rpc_methods = CRUD_RPC_METHODS + ("list_by_brand", "list_with_brand")
 
-    def list_with_brand(self) -> List[Dict]:
+    def list_with_brand(self, compact: bool = False, ids: Optional[Sequence[int]] = None) -> List[Dict]:
+        where = f"WHERE {self._id_filter('m.id', ids)} " if ids else ""
         query = (
             "SELECT m.id, m.name AS model_name, b.name AS brand_name, m.brand_id "
             "FROM vehicle_models m "
             "JOIN brands b ON b.id = m.brand_id "
+            f"{where}"
             "ORDER BY b.name, m.name"
         )
-        return self._fetch_all(query)
+        return self._fetch_all(query, list(ids or ()), compact=compact)
 
     def list_by_brand(self, brand_id: int) -> List[Dict]:
         query = "SELECT * FROM vehicle_models WHERE brand_id = ? ORDER BY name"
         return self._fetch_all(query, (brand_id,))
 
 
-model_service = VehicleModelService()
+model_service = bind_service("model_service", VehicleModelService)
@@ -1,34 +1,106 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 from ..database.connection import database_manager
 from .base import BaseService
+from .remote import bind_service
+
+
+# Stamps the delivery date the first time an order is completed; revenue reports group by it.
+DELIVERY_STAMP = (
+    "actual_delivery = CASE WHEN ? = 'completed' "
+    "THEN COALESCE(actual_delivery, date('now', 'localtime')) ELSE actual_delivery END"
+)
 
 
 class OrderService(BaseService):
     table_name = "orders"
+    version_column = "version"
+    # Orders are written through create_order/update_order, which number them and keep the items in step.
+    rpc_methods = (
+        "get_by_id",
+        "list_by_ids",
+        "delete",
+        "create_order",
+        "update_order",
+        "set_status",
+        "get_full_order",
+        "generate_order_number",
+        "list_summary",
+        "iter_summary",
+        "list_page",
+        "list_due_on",
+        "search",
+    )
+
+    # order_list is kept in sync by triggers (see database/migrations.py), so the grid reads one table.
+    SUMMARY_QUERY = (
+        "SELECT id, order_number, status, summary, total_amount, created_at, updated_at, "
+        "expected_delivery, client_name, license_plate, brand_name, model_name "
+        "FROM order_list "
+    )
+    SUMMARY_ORDER = "ORDER BY updated_at DESC, id DESC"
+
+    def iter_summary(
+        self,
+        batch_size: Optional[int] = None,
+        compact: bool = False,
+        ids: Optional[Sequence[int]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        where = f"WHERE {self._id_filter('id', ids)} " if ids else ""
+        query = f"{self.SUMMARY_QUERY}{where}{self.SUMMARY_ORDER}"
+        yield from self._iter_all(query, list(ids or ()), batch_size=batch_size, compact=compact)
+
+    def list_summary(self, compact: bool = False, ids: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_summary(compact=compact, ids=ids))
 
-    def list_summary(self) -> List[Dict[str, Any]]:
+    def list_page(
+        self,
+        limit: int = 200,
+        after_updated_at: Optional[str] = None,
+        after_id: Optional[int] = None,
+        compact: bool = False,
+    ) -> List[Dict[str, Any]]:
+        # Keyset pagination: pass the updated_at/id of the last row to get the next page.
+        query = self.SUMMARY_QUERY
+        params: List[Any] = []
+        if after_updated_at is not None and after_id is not None:
+            query += "WHERE (updated_at, id) < (?, ?) "
+            params.extend([after_updated_at, after_id])
+        query += f"{self.SUMMARY_ORDER} LIMIT ?"
+        params.append(limit)
+        return self._fetch_all(query, params, compact=compact)
+
+    def list_due_on(self, day: str, compact: bool = False) -> List[Dict[str, Any]]:
+        query = f"{self.SUMMARY_QUERY}WHERE expected_delivery = ? ORDER BY id"
+        return self._fetch_all(query, (day,), compact=compact)
+
+    def search(self, keyword: str, limit: Optional[int] = None, compact: bool = False) -> List[Dict[str, Any]]:
+        # Plain substring match folded for any alphabet, as the grid's former Python filter did.
+        needle = keyword.strip().casefold()
         query = (
-            "SELECT o.id, o.order_number, o.status, o.summary, o.total_amount, "
-            "o.created_at, o.updated_at, o.expected_delivery, "
-            "c.full_name AS client_name, v.license_plate, "
-            "COALESCE(b.name, '') AS brand_name, COALESCE(m.name, '') AS model_name "
-            "FROM orders o "
-            "JOIN clients c ON c.id = o.client_id "
-            "JOIN vehicles v ON v.id = o.vehicle_id "
-            "LEFT JOIN brands b ON b.id = v.brand_id "
-            "LEFT JOIN vehicle_models m ON m.id = v.model_id "
-            "ORDER BY o.updated_at DESC"
+            f"{self.SUMMARY_QUERY}"
+            "WHERE instr(casefold(order_number), ?) OR instr(casefold(client_name), ?) "
+            "OR instr(casefold(license_plate), ?) "
+            f"{self.SUMMARY_ORDER}"
         )
-        return self._fetch_all(query)
+        params: List[Any] = [needle, needle, needle]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._fetch_all(query, params, compact=compact)
 
     def generate_order_number(self) -> str:
         with database_manager.get_connection() as conn:
-            cursor = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 AS next_id FROM orders")
-            next_id = cursor.fetchone()[0]
+            return self._next_order_number(conn)
+
+    def _next_order_number(self, conn) -> str:
+        # sqlite_sequence never goes back, unlike MAX(id) once the newest orders are archived,
+        # so a number already given to an archived order is not handed out again.
+        cursor = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 AS next_id FROM sqlite_sequence WHERE name = 'orders'")
+        next_id = cursor.fetchone()[0]
         return f"OS-{datetime.now():%Y}-{int(next_id):05d}"
 
     def _prepare_order_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -48,21 +120,27 @@ class OrderService(BaseService):
         collaborator_ids: Sequence[int],
     ) -> int:
         order_payload = self._prepare_order_payload(payload)
-        if not order_payload.get("order_number"):
-            order_payload["order_number"] = self.generate_order_number()
 
-        with database_manager.get_connection() as conn:
-            columns = ", ".join(order_payload.keys())
-            placeholders = ", ".join(["?"] * len(order_payload))
+        def create(conn) -> int:
+            prepared = dict(order_payload)
+            if prepared["status"] == "completed" and not prepared.get("actual_delivery"):
+                prepared["actual_delivery"] = date.today().isoformat()
+            if not prepared.get("order_number"):
+                # Numbered inside the write transaction so concurrent terminals cannot pick the same number.
+                prepared["order_number"] = self._next_order_number(conn)
+            columns = ", ".join(prepared.keys())
+            placeholders = ", ".join(["?"] * len(prepared))
             cursor = conn.execute(
                 f"INSERT INTO orders ({columns}) VALUES ({placeholders})",
-                tuple(order_payload.values()),
+                tuple(prepared.values()),
             )
             order_id = cursor.lastrowid
             self._replace_items(conn, order_id, items)
             self._replace_collaborators(conn, order_id, collaborator_ids)
             self._recompute_totals(conn, order_id)
-        return order_id
+            return order_id
+
+        return database_manager.run_write(create)
 
     def update_order(
         self,
@@ -72,19 +150,32 @@ class OrderService(BaseService):
         collaborator_ids: Sequence[int],
     ) -> None:
         order_payload = self._prepare_order_payload(payload)
-        if "order_number" in order_payload and not order_payload["order_number"]:
-            order_payload["order_number"] = self.generate_order_number()
-
+        expected_version = order_payload.pop("version", None)
         order_payload["updated_at"] = datetime.utcnow().isoformat(timespec="seconds")
-        assignments = ", ".join(f"{key} = ?" for key in order_payload.keys())
-        params = tuple(order_payload.values()) + (order_id,)
 
-        with database_manager.get_connection() as conn:
-            conn.execute(f"UPDATE orders SET {assignments} WHERE id = ?", params)
+        def update(conn) -> None:
+            prepared = dict(order_payload)
+            if "order_number" in prepared and not prepared["order_number"]:
+                prepared["order_number"] = self._next_order_number(conn)
+            assignments = ", ".join(f"{key} = ?" for key in prepared.keys())
+            params = tuple(prepared.values())
+            if "actual_delivery" not in prepared:
+                assignments += f", {DELIVERY_STAMP}"
+                params += (prepared["status"],)
+            query = f"UPDATE orders SET {assignments}, version = version + 1 WHERE id = ?"
+            params += (order_id,)
+            if expected_version is not None:
+                query += " AND version = ?"
+                params += (int(expected_version),)
+            # Items are only replaced once the header update proved nobody saved in between.
+            if conn.execute(query, params).rowcount == 0 and expected_version is not None:
+                self._raise_conflict(conn, order_id, int(expected_version))
             self._replace_items(conn, order_id, items)
             self._replace_collaborators(conn, order_id, collaborator_ids)
             self._recompute_totals(conn, order_id)
 
+        database_manager.run_write(update)
+
     def _replace_items(
         self,
         conn,
@@ -163,7 +254,10 @@ class OrderService(BaseService):
         return order
 
     def set_status(self, order_id: int, status: str) -> None:
-        self._execute("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+        self._execute(
+            f"UPDATE orders SET status = ?, {DELIVERY_STAMP}, version = version + 1 WHERE id = ?",
+            (status, status, order_id),
+        )
 
     def _recompute_totals(self, conn, order_id: int) -> None:
         cursor = conn.execute(
@@ -192,4 +286,4 @@ class OrderService(BaseService):
         )
 
 
-order_service = OrderService()
+order_service = bind_service("order_service", OrderService)
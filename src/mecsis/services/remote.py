@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import functools
+import http.client
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type, TypeVar
+from urllib.parse import urlsplit
+
+from ..models.records import CompactRecord
+from ..utils.config import get_server_token, get_server_url
+from ..utils.metrics import metrics
+from .base import ConflictError
+
+T = TypeVar("T")
+
+TOKEN_HEADER = "X-Mecsis-Token"
+# The server drops idle keep-alive sockets after this long; clients reconnect a bit earlier.
+KEEPALIVE_SECONDS = 60.0
+
+# Exceptions that cross the wire keep their type so callers can keep catching them.
+REMOTE_EXCEPTIONS: Dict[str, Type[Exception]] = {
+    "ConflictError": ConflictError,
+    "ValueError": ValueError,
+    "KeyError": KeyError,
+    "LookupError": LookupError,
+    "PermissionError": PermissionError,
+    "FileNotFoundError": FileNotFoundError,
+    "IntegrityError": sqlite3.IntegrityError,
+    "OperationalError": sqlite3.OperationalError,
+}
+
+
+class RemoteServiceError(RuntimeError):
+    pass
+
+
+def to_jsonable(value: Any) -> Any:
+    if isinstance(value, CompactRecord):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (dict, sqlite3.Row)):
+        return {key: to_jsonable(value[key]) for key in value.keys()}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)) or inspect.isgenerator(value) or hasattr(value, "__next__"):
+        return [to_jsonable(item) for item in value]
+    return str(value)
+
+
+def error_payload(exc: BaseException) -> Dict[str, str]:
+    return {"type": type(exc).__name__, "message": str(exc)}
+
+
+def raise_remote_error(error: Dict[str, Any]) -> None:
+    exc_type = REMOTE_EXCEPTIONS.get(error.get("type", ""), RemoteServiceError)
+    raise exc_type(error.get("message", "Erro no servidor MEC-SIS."))
+
+
+class RemoteService:
+    service_name: str = ""
+
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: float = 30.0) -> None:
+        parts = urlsplit(base_url if "://" in base_url else f"http://{base_url}")
+        if parts.scheme != "http":
+            raise ValueError(f"Endereco do servidor nao suportado: {base_url}")
+        self.base_url = base_url
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port or 80
+        self._prefix = parts.path.rstrip("/")
+        self._token = token
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        last_used = getattr(self._local, "last_used", 0.0)
+        if conn is not None and time.monotonic() - last_used > KEEPALIVE_SECONDS / 2:
+            conn.close()
+            conn = None
+        if conn is None:
+            conn = http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def _send(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if self._token:
+            headers[TOKEN_HEADER] = self._token
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+            except (ConnectionError, http.client.HTTPException, OSError) as exc:
+                # Nothing reached the server yet, so one retry on a fresh socket is safe.
+                self._drop_connection()
+                if attempt:
+                    raise RemoteServiceError(f"Servidor MEC-SIS indisponivel em {self.base_url}: {exc}") from exc
+                continue
+            try:
+                response = conn.getresponse()
+                payload = response.read()
+            except (ConnectionError, http.client.HTTPException, OSError) as exc:
+                self._drop_connection()
+                raise RemoteServiceError(f"Falha na comunicacao com {self.base_url}: {exc}") from exc
+            self._local.last_used = time.monotonic()
+            if response.will_close:
+                self._drop_connection()
+            return response.status, payload
+        raise RemoteServiceError(f"Servidor MEC-SIS indisponivel em {self.base_url}.")
+
+    def ping(self) -> Dict[str, Any]:
+        conn = http.client.HTTPConnection(self._host, self._port, timeout=min(self._timeout, 5.0))
+        headers = {TOKEN_HEADER: self._token} if self._token else {}
+        try:
+            conn.request("GET", f"{self._prefix}/health", headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"{}")
+        except (ConnectionError, http.client.HTTPException, OSError, ValueError) as exc:
+            raise RemoteServiceError(f"Servidor MEC-SIS indisponivel em {self.base_url}: {exc}") from exc
+        finally:
+            conn.close()
+        if "error" in data:
+            raise_remote_error(data["error"])
+        return data.get("result") or {}
+
+    def _call(self, method: str, args: Sequence[Any], kwargs: Dict[str, Any]) -> Any:
+        body = json.dumps({"args": to_jsonable(args), "kwargs": to_jsonable(kwargs)}).encode("utf-8")
+        with metrics.track(f"remote.{self.service_name}.{method}"):
+            status, payload = self._send(f"{self._prefix}/rpc/{self.service_name}/{method}", body)
+        try:
+            data = json.loads(payload or b"{}")
+        except ValueError as exc:
+            raise RemoteServiceError(f"Resposta invalida do servidor (HTTP {status}).") from exc
+        if "error" in data:
+            raise_remote_error(data["error"])
+        return data.get("result")
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.service_name} @ {self.base_url}>"
+
+
+def _remote_method(name: str, original: Callable[..., Any]) -> Callable[..., Any]:
+    returns_iterator = inspect.isgeneratorfunction(inspect.unwrap(original))
+
+    @functools.wraps(original)
+    def method(self: RemoteService, *args: Any, **kwargs: Any) -> Any:
+        result = self._call(name, args, kwargs)
+        return iter(result or ()) if returns_iterator else result
+
+    method.__dict__.pop("__metric_name__", None)
+    return method
+
+
+def remote_class(cls: type, service_name: str, local_methods: Sequence[str] = ()) -> Type[RemoteService]:
+    namespace: Dict[str, Any] = {"service_name": service_name, "__module__": cls.__module__}
+    rpc_methods = getattr(cls, "rpc_methods", ())
+    for name in dir(cls):
+        if name.startswith("_"):
+            continue
+        attribute = getattr(cls, name)
+        if isinstance(attribute, (str, int, float, tuple)) or attribute is None:
+            # Plain class settings such as table_name stay readable on the proxy.
+            namespace[name] = attribute
+        elif name in local_methods:
+            namespace[name] = attribute
+        elif name in rpc_methods:
+            namespace[name] = _remote_method(name, attribute)
+    return type(f"Remote{cls.__name__}", (RemoteService,), namespace)
+
+
+def public_methods(service: Any) -> Dict[str, Callable[..., Any]]:
+    # An explicit allowlist: inherited CRUD on derived tables, auth records and anything taking
+    # a server-side path must never become reachable just by being public.
+    return {name: getattr(service, name) for name in getattr(type(service), "rpc_methods", ())}
+
+
+def bind_service(service_name: str, cls: Callable[[], T], local_methods: Sequence[str] = ()) -> T:
+    server_url = get_server_url()
+    if not server_url:
+        return cls()
+    proxy_type = remote_class(cls, service_name, local_methods)  # type: ignore[arg-type]
+    return proxy_type(server_url, get_server_token())  # type: ignore[return-value]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..database.connection import database_manager
+from ..database.migrations import REVENUE_ROLLUP_SELECT
+from .base import BaseService
+from .remote import bind_service
+
+# Weeks start on Monday and are labelled by that date; months by AAAA-MM.
+PERIOD_KEYS = {
+    "day": "day",
+    "week": "date(day, '-6 days', 'weekday 1')",
+    "month": "substr(day, 1, 7)",
+}
+ROLLUP_COLUMNS = "day, payment_method, orders_count, revenue, labor, parts, discount"
+TOTALS = (
+    "SUM(orders_count) AS orders, ROUND(SUM(revenue), 2) AS revenue, ROUND(SUM(labor), 2) AS labor, "
+    "ROUND(SUM(parts), 2) AS parts, ROUND(SUM(discount), 2) AS discount, "
+    "ROUND(SUM(revenue) / SUM(orders_count), 2) AS average_ticket"
+)
+
+
+@dataclass
+class RollupReport:
+    days: int = 0
+    orders: int = 0
+    archived_orders: int = 0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Resumo de faturamento reconstruido: {self.orders} ordens concluidas "
+            f"({self.archived_orders} arquivadas) em {self.days} dias, {self.elapsed_seconds:.2f}s."
+        )
+
+
+class ReportService(BaseService):
+    table_name = "revenue_daily"
+    rpc_methods = ("revenue", "revenue_by_payment_method", "summary", "rebuild")
+    primary_key = "day"
+
+    @staticmethod
+    def _range(start: Optional[str], end: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if start:
+            clauses.append("day >= ?")
+            params.append(start)
+        if end:
+            clauses.append("day <= ?")
+            params.append(end)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def revenue(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        period: str = "day",
+    ) -> List[Dict[str, Any]]:
+        if period not in PERIOD_KEYS:
+            raise ValueError(f"Periodo invalido: {period}. Use day, week ou month.")
+        where, params = self._range(start, end)
+        query = f"SELECT {PERIOD_KEYS[period]} AS period, {TOTALS} FROM revenue_daily{where} GROUP BY 1 ORDER BY 1"
+        return self._fetch_all(query, params)
+
+    def revenue_by_payment_method(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        where, params = self._range(start, end)
+        query = f"SELECT payment_method, {TOTALS} FROM revenue_daily{where} GROUP BY 1 ORDER BY revenue DESC"
+        return self._fetch_all(query, params)
+
+    def summary(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        where, params = self._range(start, end)
+        totals = self._fetch_one(f"SELECT {TOTALS} FROM revenue_daily{where}", params) or {}
+        totals["orders"] = totals.get("orders") or 0
+        for key in ("revenue", "labor", "parts", "discount", "average_ticket"):
+            totals[key] = totals.get(key) or 0.0
+        billed = totals["labor"] + totals["parts"]
+        totals["labor_share"] = round(totals["labor"] / billed, 4) if billed else 0.0
+        totals["parts_share"] = round(totals["parts"] / billed, 4) if billed else 0.0
+        return totals
+
+    def rebuild(self, include_archives: bool = True) -> RollupReport:
+        report = RollupReport()
+        started = time.perf_counter()
+        archived: List[Tuple[Any, ...]] = []
+        if include_archives:
+            from .archive import archive_service
+
+            with database_manager.get_connection() as conn:
+                for year in archive_service.list_years():
+                    conn.execute("ATTACH DATABASE ? AS arch", (str(archive_service.archive_path(year)),))
+                    try:
+                        if conn.execute("SELECT 1 FROM arch.sqlite_master WHERE name = 'orders'").fetchone():
+                            archived.extend(
+                                tuple(row) for row in conn.execute(REVENUE_ROLLUP_SELECT.format(source="arch.orders"))
+                            )
+                    finally:
+                        conn.commit()
+                        conn.execute("DETACH DATABASE arch")
+
+        def rebuild(conn) -> None:
+            conn.execute("DELETE FROM revenue_daily")
+            conn.execute(f"INSERT INTO revenue_daily ({ROLLUP_COLUMNS}) {REVENUE_ROLLUP_SELECT.format(source='orders')}")
+            conn.executemany(
+                f"INSERT INTO revenue_daily ({ROLLUP_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (day, payment_method) DO UPDATE SET "
+                "orders_count = orders_count + excluded.orders_count, revenue = revenue + excluded.revenue, "
+                "labor = labor + excluded.labor, parts = parts + excluded.parts, "
+                "discount = discount + excluded.discount",
+                archived,
+            )
+
+        database_manager.run_write(rebuild)
+        totals = self._fetch_one("SELECT COUNT(DISTINCT day) AS days, SUM(orders_count) AS orders FROM revenue_daily")
+        report.days = totals["days"] if totals else 0
+        report.orders = (totals["orders"] if totals else 0) or 0
+        report.archived_orders = sum(row[2] for row in archived)
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+
+report_service = bind_service("report_service", ReportService)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from ..database.connection import database_manager
+from ..database.migrations import SEARCH_ENTITIES, SEARCH_ROWID_SPAN
+from ..utils.config import get_search_budget_ms
+from ..utils.normalize import normalize_plate, plate_key
+from .base import BaseService
+from .remote import bind_service
+
+_TOKENS = re.compile(r"\w+")
+ENTITY_LABELS = {
+    "clients": "Clientes",
+    "vehicles": "Veiculos",
+    "orders": "Ordens de servico",
+    "services": "Servicos",
+}
+# Display columns are read after the match, only for the few rows shown.
+DISPLAY_QUERIES = {
+    "clients": (
+        "SELECT id, full_name AS title, "
+        "document || COALESCE(' - ' || COALESCE(NULLIF(mobile, ''), NULLIF(phone, '')), '') AS detail "
+        "FROM clients WHERE id IN ({ids})"
+    ),
+    "vehicles": (
+        "SELECT v.id, v.license_plate AS title, "
+        "c.full_name || COALESCE(' - ' || NULLIF(trim(COALESCE(b.name, '') || ' ' || COALESCE(m.name, '')), ''), '') "
+        "AS detail "
+        "FROM vehicles v "
+        "JOIN clients c ON c.id = v.client_id "
+        "LEFT JOIN brands b ON b.id = v.brand_id "
+        "LEFT JOIN vehicle_models m ON m.id = v.model_id "
+        "WHERE v.id IN ({ids})"
+    ),
+    "orders": (
+        "SELECT id, order_number AS title, "
+        "client_name || ' - ' || license_plate || COALESCE(' - ' || NULLIF(summary, ''), '') AS detail "
+        "FROM order_list WHERE id IN ({ids})"
+    ),
+    "services": (
+        "SELECT id, name AS title, printf('R$ %.2f', default_price) || "
+        "CASE WHEN is_active THEN '' ELSE ' - inativo' END AS detail "
+        "FROM services WHERE id IN ({ids})"
+    ),
+}
+
+
+def match_expression(text: str) -> Optional[str]:
+    tokens = [token.lower() for token in _TOKENS.findall(text)]
+    if not tokens or len("".join(tokens)) < 2:
+        return None
+    alternatives = [" ".join(f'"{token}"*' for token in tokens)]
+    # "ABC-1C34" or "123.456.789-00" as typed also match the compact keys column.
+    compact = normalize_plate(text).lower()
+    for key in {compact, plate_key(compact).lower()}:
+        if len(key) >= 4 and key not in tokens and any(char.isdigit() for char in key):
+            alternatives.append(f'keys : "{key}"*')
+    return " OR ".join(f"({alternative})" for alternative in alternatives)
+
+
+class GlobalSearchService(BaseService):
+    table_name = "global_search"
+    rpc_methods = ("search",)
+    primary_key = "rowid"
+
+    def search(self, text: str, limit: int = 5, budget_ms: Optional[float] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        deadline = started + (budget_ms or get_search_budget_ms()) / 1000
+        expression = match_expression(text)
+        groups: List[Dict[str, Any]] = []
+        complete = True
+        if expression:
+            with database_manager.get_connection() as conn:
+                # Past the budget SQLite interrupts the running statement; what was found is kept.
+                conn.set_progress_handler(lambda: time.perf_counter() > deadline, 1000)
+                try:
+                    for position, entity in enumerate(SEARCH_ENTITIES, start=1):
+                        try:
+                            results = self._search_entity(conn, entity, position, expression, limit)
+                        except sqlite3.OperationalError as exc:
+                            if "interrupted" not in str(exc):
+                                raise
+                            complete = False
+                            break
+                        if results:
+                            groups.append({"entity": entity, "label": ENTITY_LABELS[entity], "results": results})
+                finally:
+                    conn.set_progress_handler(None, 0)
+        return {
+            "query": text,
+            "groups": groups,
+            "complete": complete,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    def _search_entity(
+        conn: sqlite3.Connection,
+        entity: str,
+        position: int,
+        expression: str,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        # The rowid range selects the entity inside the shared index; titles weigh the most.
+        low = position * SEARCH_ROWID_SPAN
+        ids = [
+            row[0] - low
+            for row in conn.execute(
+                "SELECT rowid FROM global_search WHERE global_search MATCH ? AND rowid >= ? AND rowid < ? "
+                "ORDER BY bm25(global_search, 10.0, 1.0, 5.0) LIMIT ?",
+                (expression, low, low + SEARCH_ROWID_SPAN, limit),
+            )
+        ]
+        if not ids:
+            return []
+        rows = {
+            row["id"]: dict(row)
+            for row in conn.execute(DISPLAY_QUERIES[entity].format(ids=", ".join(["?"] * len(ids))), ids)
+        }
+        return [rows[record_id] for record_id in ids if record_id in rows]
+
+
+global_search_service = bind_service("global_search_service", GlobalSearchService)
@@ -1,16 +1,32 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 
-from .base import BaseService
+from ..database.connection import database_manager
+from .base import CRUD_RPC_METHODS, BaseService
+from .remote import bind_service
 
 
 class ServiceCatalog(BaseService):
     table_name = "services"
+    rpc_methods = CRUD_RPC_METHODS + ("list_active", "adjust_prices")
 
     def list_active(self) -> List[Dict]:
         query = "SELECT * FROM services WHERE is_active = 1 ORDER BY name"
         return self._fetch_all(query)
 
+    def adjust_prices(self, percent: float, service_ids: Optional[Sequence[int]] = None) -> int:
+        factor = 1 + (float(percent) / 100)
+        if factor < 0:
+            raise ValueError("O reajuste nao pode deixar precos negativos.")
+        query = "UPDATE services SET default_price = ROUND(default_price * ?, 2)"
+        params: List = [factor]
+        if service_ids is not None:
+            if not service_ids:
+                return 0
+            query += f" WHERE id IN ({', '.join(['?'] * len(service_ids))})"
+            params.extend(service_ids)
+        return database_manager.run_write(lambda conn: conn.execute(query, params).rowcount)
 
-service_catalog = ServiceCatalog()
+
+service_catalog = bind_service("service_catalog", ServiceCatalog)
@@ -1,23 +1,70 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
-from .base import BaseService
+from ..utils.normalize import normalize_plate, plate_key
+from .base import CRUD_RPC_METHODS, BaseService
+from .remote import bind_service
 
 
 class VehicleService(BaseService):
     table_name = "vehicles"
+    version_column = "version"
+    rpc_methods = CRUD_RPC_METHODS + (
+        "list_with_relations",
+        "iter_with_relations",
+        "list_by_client",
+        "list_by_clients",
+        "find_by_plate",
+        "search_plates",
+        "history",
+        "history_by_plate",
+    )
 
-    def list_with_relations(self) -> List[Dict]:
+    @staticmethod
+    def _with_plate(payload: Dict[str, Any]) -> Dict[str, Any]:
+        # The indexed plate_key is computed in SQL, which only strips "-", " " and "."; storing the
+        # plate as normalize_plate leaves makes it agree with utils.normalize.plate_key.
+        if payload.get("license_plate"):
+            return {**payload, "license_plate": normalize_plate(payload["license_plate"])}
+        return payload
+
+    def insert(self, payload: Dict[str, Any]) -> int:
+        return super().insert(self._with_plate(payload))
+
+    def update(self, record_id: Any, payload: Dict[str, Any]) -> None:
+        super().update(record_id, self._with_plate(payload))
+
+    def insert_many(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        conflict_columns: Optional[Sequence[str]] = None,
+    ) -> List[int]:
+        return super().insert_many([self._with_plate(payload) for payload in payloads], conflict_columns)
+
+    def update_many(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        return super().update_many(self._with_plate(payload) for payload in payloads)
+
+    def iter_with_relations(
+        self,
+        batch_size: Optional[int] = None,
+        compact: bool = False,
+        ids: Optional[Sequence[int]] = None,
+    ) -> Iterator[Dict]:
+        where = f"WHERE {self._id_filter('v.id', ids)} " if ids else ""
         query = (
             "SELECT v.*, c.full_name AS client_name, b.name AS brand_name, m.name AS model_name "
             "FROM vehicles v "
             "JOIN clients c ON c.id = v.client_id "
             "LEFT JOIN brands b ON b.id = v.brand_id "
             "LEFT JOIN vehicle_models m ON m.id = v.model_id "
+            f"{where}"
             "ORDER BY c.full_name, v.license_plate"
         )
-        return self._fetch_all(query)
+        yield from self._iter_all(query, list(ids or ()), batch_size=batch_size, compact=compact)
+
+    def list_with_relations(self, compact: bool = False, ids: Optional[Sequence[int]] = None) -> List[Dict]:
+        return list(self.iter_with_relations(compact=compact, ids=ids))
 
     def list_by_client(self, client_id: int) -> List[Dict]:
         query = (
@@ -29,9 +76,89 @@ class VehicleService(BaseService):
         )
         return self._fetch_all(query, (client_id,))
 
+    def list_by_clients(self, client_ids: Sequence[int]) -> List[Dict]:
+        # Bulk form of list_by_client for pickers: one query per 500 clients instead of one per client.
+        vehicles: List[Dict] = []
+        ids = list(dict.fromkeys(client_ids))
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            query = (
+                "SELECT v.*, b.name AS brand_name, m.name AS model_name "
+                "FROM vehicles v "
+                "LEFT JOIN brands b ON b.id = v.brand_id "
+                "LEFT JOIN vehicle_models m ON m.id = v.model_id "
+                f"WHERE {self._id_filter('v.client_id', chunk)} ORDER BY v.client_id, v.license_plate"
+            )
+            vehicles.extend(self._fetch_all(query, chunk))
+        return vehicles
+
     def find_by_plate(self, license_plate: str) -> Optional[Dict]:
-        query = "SELECT * FROM vehicles WHERE license_plate = ?"
-        return self._fetch_one(query, (license_plate.upper(),))
+        # plate_key ignores separators and case and matches old and Mercosul layouts.
+        query = "SELECT * FROM vehicles WHERE plate_key = ? ORDER BY id LIMIT 1"
+        return self._fetch_one(query, (plate_key(license_plate),))
+
+    def search_plates(self, partial: str, limit: int = 20) -> List[Dict]:
+        key = plate_key(partial)
+        if not key:
+            return []
+        select = (
+            "SELECT v.id, v.license_plate, v.client_id, c.full_name AS client_name, "
+            "COALESCE(b.name, '') AS brand_name, COALESCE(m.name, '') AS model_name, v.model_year "
+            "FROM vehicles v "
+            "JOIN clients c ON c.id = v.client_id "
+            "LEFT JOIN brands b ON b.id = v.brand_id "
+            "LEFT JOIN vehicle_models m ON m.id = v.model_id "
+        )
+        # Input starting with a digit is the numeric part (the key always has it from the fourth
+        # character on); either way the lookup is a half-open range on an index, since LIKE
+        # would skip the index on a case-sensitive column.
+        column = "v.plate_key"
+        if key[0].isdigit():
+            column = "substr(v.plate_key, 4)"
+            key = plate_key(f"AAA{key}")[3:]
+        upper_bound = key[:-1] + chr(ord(key[-1]) + 1)
+        return self._fetch_all(
+            f"{select}WHERE {column} >= ? AND {column} < ? ORDER BY {column} LIMIT ?",
+            (key, upper_bound, limit),
+        )
+
+    def history(self, vehicle_id: int, include_archived: bool = True) -> Optional[Dict[str, Any]]:
+        vehicles = self.list_with_relations(ids=[vehicle_id])
+        if not vehicles:
+            return None
+        # Both queries are range scans on idx_orders_vehicle_created; items follow idx_order_items_order.
+        orders = self._fetch_all(
+            "SELECT o.*, 0 AS archived FROM orders o WHERE o.vehicle_id = ? ORDER BY o.created_at, o.id",
+            (vehicle_id,),
+        )
+        items: Dict[int, List[Dict[str, Any]]] = {order["id"]: [] for order in orders}
+        for item in self._fetch_all(
+            "SELECT oi.*, COALESCE(s.name, '') AS service_name "
+            "FROM orders o "
+            "JOIN order_items oi ON oi.order_id = o.id "
+            "LEFT JOIN services s ON s.id = oi.service_id "
+            "WHERE o.vehicle_id = ? ORDER BY o.created_at, oi.id",
+            (vehicle_id,),
+        ):
+            items[item["order_id"]].append(item)
+        for order in orders:
+            order["items"] = items[order["id"]]
+        if include_archived:
+            from .archive import archive_service
+
+            orders = sorted(
+                list(archive_service.iter_orders(vehicle_id=vehicle_id)) + orders,
+                key=lambda order: (order.get("created_at") or "", order["id"]),
+            )
+        mileage = self._fetch_all(
+            "SELECT mileage, recorded_at FROM vehicle_mileage WHERE vehicle_id = ? ORDER BY recorded_at, id",
+            (vehicle_id,),
+        )
+        return {"vehicle": vehicles[0], "orders": orders, "mileage": mileage}
+
+    def history_by_plate(self, license_plate: str, include_archived: bool = True) -> Optional[Dict[str, Any]]:
+        vehicle = self.find_by_plate(license_plate)
+        return self.history(vehicle["id"], include_archived) if vehicle else None
 
 
-vehicle_service = VehicleService()
+vehicle_service = bind_service("vehicle_service", VehicleService)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Iterable, List
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+class SearchSignals(QObject):
+    # Every signal carries the request number so the page can drop answers to superseded searches.
+    chunk = Signal(int, object)
+    finished = Signal(int, int)
+    failed = Signal(int, str)
+
+
+class SearchTask(QRunnable):
+    def __init__(
+        self,
+        request: int,
+        search: Callable[[str], Iterable[Any]],
+        keyword: str,
+        signals: SearchSignals,
+        chunk_size: int = 200,
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.request = request
+        self.search = search
+        self.keyword = keyword
+        self.signals = signals
+        self.chunk_size = chunk_size
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self) -> None:
+        try:
+            records = self.search(self.keyword)
+            if self.cancelled:
+                return
+            # Results reach the table in chunks, so the first rows show up while the rest is still
+            # being read (when the search yields) and the GUI thread never fills thousands of rows at once.
+            batch: List[Any] = []
+            total = 0
+            for record in records:
+                if self.cancelled:
+                    return
+                batch.append(record)
+                if len(batch) >= self.chunk_size:
+                    total += len(batch)
+                    self.signals.chunk.emit(self.request, batch)
+                    batch = []
+            if self.cancelled:
+                return
+            if batch:
+                total += len(batch)
+                self.signals.chunk.emit(self.request, batch)
+            self.signals.finished.emit(self.request, total)
+        except Exception as exc:  # noqa: BLE001 - reported on the page instead of killing the pool thread
+            if not self.cancelled:
+                self.signals.failed.emit(self.request, str(exc))
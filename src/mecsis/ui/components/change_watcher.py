@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Callable, Optional, Set
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from ...database.connection import database_manager
+from ...database.migrations import LOGGED_TABLES
+from ...services.changes import change_log_service
+from ...utils.config import get_server_url, get_watch_interval_ms
+
+
+class PollSignals(QObject):
+    checked = Signal(object)
+
+
+class PollTask(QRunnable):
+    def __init__(self, check: Callable[[], Set[str]], signals: PollSignals) -> None:
+        super().__init__()
+        self.check = check
+        self.signals = signals
+
+    def run(self) -> None:
+        try:
+            tables = self.check()
+        except Exception:  # noqa: BLE001 - a busy database or a network hiccup waits for the next tick
+            tables = set()
+        self.signals.checked.emit(tables)
+
+
+class ChangeWatcher(QObject):
+    tables_changed = Signal(list)
+
+    def __init__(self, parent: Optional[QObject] = None, interval_ms: Optional[int] = None) -> None:
+        super().__init__(parent)
+        self.interval_ms = get_watch_interval_ms() if interval_ms is None else interval_ms
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._seq: Optional[int] = None
+        self._polling = False
+        self._signals = PollSignals(self)
+        self._signals.checked.connect(self.on_checked)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.poll)
+
+    def start(self) -> None:
+        if self.interval_ms <= 0:
+            return
+        if not get_server_url():
+            # data_version only moves when another connection commits, so one long-lived connection is needed.
+            self._conn = sqlite3.connect(database_manager.db_path, check_same_thread=False)
+            self._data_version = self._read_data_version()
+        # The starting position is read by the first poll, off the GUI thread like the others.
+        self._seq = None
+        self._timer.start(self.interval_ms)
+        self.poll()
+
+    def stop(self) -> None:
+        self._timer.stop()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _read_data_version(self) -> int:
+        assert self._conn is not None
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self) -> None:
+        # In client mode every check is an HTTP request; it runs on the thread pool so a slow or
+        # hung server never freezes the window, and ticks are skipped while one is still out.
+        if self._polling:
+            return
+        self._polling = True
+        QThreadPool.globalInstance().start(PollTask(self._check, self._signals))
+
+    def _check(self) -> Set[str]:
+        if self._seq is None:
+            self._seq = change_log_service.current_seq()
+            return set()
+        if self._conn is not None:
+            version = self._read_data_version()
+            if version == self._data_version:
+                return set()
+            self._data_version = version
+        elif change_log_service.current_seq() == self._seq:
+            # Client mode has no local file to watch; one cheap request tells the same story.
+            return set()
+        return self._changed_tables()
+
+    def on_checked(self, tables: Set[str]) -> None:
+        self._polling = False
+        if tables and self._timer.isActive():
+            self.tables_changed.emit(sorted(tables))
+
+    def _changed_tables(self) -> Set[str]:
+        delta = change_log_service.changes_since(self._seq)
+        self._seq = delta["seq"]
+        if delta["truncated"]:
+            return set(LOGGED_TABLES)
+        return {change["table"] for change in delta["changes"]}
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, Signal
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLineEdit, QWidget
+
+from ...services.clients import client_service
+
+
+def client_label(client: Dict[str, Any]) -> str:
+    return f"{client['full_name']} ({client['document']})"
+
+
+class ClientPageModel(QAbstractListModel):
+    """Clients ordered by name, read one page at a time as the list scrolls (Qt's fetchMore)."""
+
+    page_loaded = Signal(list)
+
+    def __init__(self, page_size: int = 50, parent=None) -> None:
+        super().__init__(parent)
+        self.page_size = page_size
+        self.search: Optional[str] = None
+        self._rows: List[Dict[str, Any]] = []
+        self._pinned: Optional[Dict[str, Any]] = None
+        self._exhausted = False
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        client = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return client_label(client)
+        if role == Qt.UserRole:
+            return client["id"]
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if parent.isValid() or self._exhausted:
+            return
+        last = next((client for client in reversed(self._rows) if client is not self._pinned), None)
+        page = client_service.list_page(
+            self.search,
+            self.page_size,
+            after_name=last["full_name"] if last else None,
+            after_id=last["id"] if last else None,
+        )
+        self._exhausted = len(page) < self.page_size
+        known = {client["id"] for client in self._rows}
+        page = [client for client in page if client["id"] not in known]
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+        self.page_loaded.emit(page)
+
+    def reload(self, search: Optional[str] = None) -> None:
+        self.beginResetModel()
+        self.search = search or None
+        self._rows = []
+        self._pinned = None
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def pin(self, client: Dict[str, Any]) -> int:
+        # A client chosen elsewhere (an opened order) may not be in the pages read so far.
+        for row, known in enumerate(self._rows):
+            if known["id"] == client["id"]:
+                return row
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, client)
+        self._pinned = client
+        self.endInsertRows()
+        return 0
+
+
+class ClientPicker(QComboBox):
+    """Client combo box that loads clients page by page and filters through a search box."""
+
+    def __init__(self, parent=None, page_size: int = 50, delay_ms: int = 300) -> None:
+        super().__init__(parent)
+        self.page_model = ClientPageModel(page_size, self)
+        self.setModel(self.page_model)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Buscar cliente por nome ou documento")
+        self.search_input.setClearButtonEnabled(True)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.apply_search)
+        self.search_input.textEdited.connect(lambda _: self._timer.start())
+        self.search_input.returnPressed.connect(self.apply_search)
+
+    def container(self) -> QWidget:
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+        layout.addWidget(self.search_input, stretch=1)
+        layout.addWidget(self, stretch=2)
+        return widget
+
+    def reload(self) -> None:
+        blocked = self.blockSignals(True)
+        try:
+            self.page_model.reload(self.search_input.text().strip())
+            self.setCurrentIndex(0 if self.count() else -1)
+        finally:
+            self.blockSignals(blocked)
+        self.currentIndexChanged.emit(self.currentIndex())
+
+    def apply_search(self) -> None:
+        self._timer.stop()
+        self.reload()
+        if self.count() > 1 and self.search_input.hasFocus():
+            self.showPopup()
+
+    def set_client(self, client_id: Optional[int]) -> bool:
+        if client_id is None:
+            return False
+        for idx in range(self.count()):
+            if self.itemData(idx) == client_id:
+                self.setCurrentIndex(idx)
+                return True
+        client = client_service.get_by_id(client_id)
+        if not client:
+            return False
+        self.setCurrentIndex(self.page_model.pin(client))
+        return True
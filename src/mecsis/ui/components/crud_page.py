@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QThreadPool, QTimer, Qt
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QAbstractItemView,
@@ -25,10 +25,22 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from ...services.base import ConflictError
+from ...services.changes import change_log_service
+from .background_search import SearchSignals, SearchTask
 from .base_page import BasePage
 
 
 class AbstractCrudPage(BasePage):
+    # Other tables shown in the list (joined names); a change there forces a full reload.
+    related_tables: Tuple[str, ...] = ()
+    # Logged tables keyed by this page's record ids (e.g. per-record counters); changes patch those rows.
+    row_tables: Tuple[str, ...] = ()
+    move_updated_to_top = False
+    # Search as you type: waits for a pause in typing and ignores shorter terms (Enter searches any length).
+    search_delay_ms = 300
+    min_search_length = 2
+
     def __init__(
         self,
         title: str,
@@ -38,7 +50,21 @@ class AbstractCrudPage(BasePage):
         super().__init__(title, on_help_requested)
         self.table_columns = list(table_columns)
         self._current_id: Optional[int] = None
+        self._current_version: Optional[int] = None
+        self._synced_seq: Optional[int] = None
+        self._row_ids: List[Any] = []
         self.form_fields: Dict[str, QWidget] = {}
+        self._search_request = 0
+        self._search_task: Optional[SearchTask] = None
+        self._search_rows = 0
+        self._search_signals = SearchSignals()
+        self._search_signals.chunk.connect(self.on_search_chunk)
+        self._search_signals.finished.connect(self.on_search_finished)
+        self._search_signals.failed.connect(self.on_search_failed)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.search_delay_ms)
+        self._search_timer.timeout.connect(self.on_search_typed)
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -48,8 +74,9 @@ class AbstractCrudPage(BasePage):
         search_layout.setSpacing(8)
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Digite para filtrar os registros...")
-        self.search_input.setToolTip("Pesquise por qualquer informacao relevante e pressione Enter.")
+        self.search_input.setToolTip("Pesquise por qualquer informacao relevante; a lista filtra enquanto voce digita.")
         self.search_input.returnPressed.connect(self.on_search)
+        self.search_input.textEdited.connect(lambda _: self._search_timer.start())
 
         self.search_button = QPushButton("Buscar")
         self.search_button.setCursor(Qt.PointingHandCursor)
@@ -157,50 +184,222 @@ class AbstractCrudPage(BasePage):
         raise NotImplementedError("get_service needs to be implemented by subclasses.")
 
     def on_search(self) -> None:
+        self._search_timer.stop()
         keyword = self.search_input.text().strip()
         if keyword:
-            results = self.perform_search(keyword)
+            self.start_search(keyword)
+        else:
+            self.cancel_search()
+            self.reload_table()
+
+    def on_search_typed(self) -> None:
+        keyword = self.search_input.text().strip()
+        if not keyword:
+            self.cancel_search()
+            self.reload_table()
+        elif len(keyword) < self.min_search_length:
+            self.status_hint.setText(f"Digite ao menos {self.min_search_length} caracteres para filtrar.")
         else:
-            results = self.load_records()
-        self.populate_table(results)
+            self.start_search(keyword)
+
+    def start_search(self, keyword: str) -> None:
+        # Filtered results cannot be patched from the change log; the next refresh reloads.
+        self._synced_seq = None
+        self.cancel_search()
+        self._search_request += 1
+        self._search_rows = 0
+        self._search_task = SearchTask(self._search_request, self.perform_search, keyword, self._search_signals)
+        self.status_hint.setText("Buscando...")
+        QThreadPool.globalInstance().start(self._search_task)
+
+    def cancel_search(self) -> None:
+        task, self._search_task = self._search_task, None
+        if task is not None:
+            task.cancel()
+            # Not started yet: drop it from the queue; running: its answer is ignored.
+            QThreadPool.globalInstance().tryTake(task)
+            self._search_request += 1
+
+    def on_search_chunk(self, request: int, records: List[Dict[str, Any]]) -> None:
+        if request != self._search_request:
+            return
+        blocked = self.table.blockSignals(True)
+        self.table.setUpdatesEnabled(False)
+        try:
+            if self._search_rows == 0:
+                self.table.setRowCount(0)
+                self._row_ids = []
+            start = self._search_rows
+            self.table.setRowCount(start + len(records))
+            for offset, record in enumerate(records):
+                self._row_ids.append(record.get("id"))
+                self.set_table_row(start + offset, record)
+            self._search_rows += len(records)
+        finally:
+            self.table.setUpdatesEnabled(True)
+            self.table.blockSignals(blocked)
+
+    def on_search_finished(self, request: int, total: int) -> None:
+        if request != self._search_request:
+            return
+        self._search_task = None
+        if total == 0:
+            self.table.setRowCount(0)
+            self._row_ids = []
+        self.table.resizeColumnsToContents()
+        self.status_hint.setText(f"{total} registro(s) encontrado(s).")
+
+    def on_search_failed(self, request: int, message: str) -> None:
+        if request != self._search_request:
+            return
+        self._search_task = None
+        self.status_hint.setText(f"Falha na busca: {message}")
 
     def perform_search(self, keyword: str) -> List[Dict[str, Any]]:
         return self.load_records(keyword)
 
     def on_reset_search(self) -> None:
+        self._search_timer.stop()
+        self.cancel_search()
         self.search_input.clear()
         self.refresh_table()
 
     def refresh_table(self) -> None:
-        records = self.load_records()
-        self.populate_table(records)
+        self.refresh_rows()
         self.reset_form()
 
+    def refresh_rows(self) -> None:
+        keyword = self.search_input.text().strip()
+        if keyword:
+            # Patched rows would skip the filter, so a filtered list runs its search again.
+            self.start_search(keyword)
+        elif not self.apply_changes():
+            self.reload_table()
+
+    def reload_table(self) -> None:
+        self.cancel_search()
+        # Read the log position first so anything saved during the load is patched next time.
+        self._synced_seq = change_log_service.current_seq()
+        self.populate_table(self.load_records())
+
+    def change_table(self) -> str:
+        return self.get_service().table_name
+
+    def apply_changes(self) -> bool:
+        if self._synced_seq is None:
+            return False
+        patched = (self.change_table(), *self.row_tables)
+        delta = change_log_service.changes_since(self._synced_seq, (*patched, *self.related_tables))
+        if delta["truncated"]:
+            return False
+        changes = delta["changes"]
+        if any(change["table"] not in patched for change in changes):
+            return False
+        if changes:
+            self.patch_rows(changes)
+        self._synced_seq = delta["seq"]
+        return True
+
+    def on_tables_changed(self, tables: Sequence[str]) -> None:
+        if not {self.change_table(), *self.row_tables, *self.related_tables}.intersection(tables):
+            return
+        # Passive refresh: keep the selection signal quiet so an open form is not overwritten.
+        blocked = self.table.blockSignals(True)
+        try:
+            self.refresh_rows()
+        finally:
+            self.table.blockSignals(blocked)
+
+    def patch_rows(self, changes: Sequence[Dict[str, Any]]) -> None:
+        removed = {change["id"] for change in changes if change["op"] == "D"}
+        upserted = list(dict.fromkeys(change["id"] for change in changes if change["op"] != "D"))
+        records = {record["id"]: record for record in self.load_records_by_ids(upserted)} if upserted else {}
+        # Rows that no longer match the page query (e.g. lost a join) disappear as well.
+        removed.update(record_id for record_id in upserted if record_id not in records)
+        for record_id in removed:
+            self._remove_row(record_id)
+        for record_id in upserted:
+            record = records.get(record_id)
+            if record is None:
+                continue
+            if record_id in self._row_ids and not self.move_updated_to_top:
+                self.set_table_row(self._row_ids.index(record_id), record)
+                continue
+            self._remove_row(record_id)
+            self.table.insertRow(0)
+            self._row_ids.insert(0, record_id)
+            self.set_table_row(0, record)
+
+    def _remove_row(self, record_id: Any) -> None:
+        if record_id in self._row_ids:
+            row_idx = self._row_ids.index(record_id)
+            self.table.removeRow(row_idx)
+            del self._row_ids[row_idx]
+
+    def load_records_by_ids(self, ids: Sequence[Any]) -> List[Dict[str, Any]]:
+        service = self.get_service()
+        if hasattr(service, "list_with_relations"):
+            return service.list_with_relations(compact=True, ids=ids)
+        return service.list_by_ids(ids, compact=True)
+
     def load_records(self, keyword: Optional[str] = None) -> List[Dict[str, Any]]:
         service = self.get_service()
         if keyword and hasattr(service, "search"):
             return service.search(keyword)
         if hasattr(service, "list_with_relations"):
-            return service.list_with_relations()
-        return service.list_all()
+            return service.list_with_relations(compact=True)
+        return service.list_all(compact=True)
+
+    def format_row(self, record: Dict[str, Any]) -> List[Any]:
+        values = []
+        for _, field in self.table_columns:
+            value = record.get(field, "")
+            values.append("" if value is None else value)
+        return values
 
     def populate_table(self, records: Sequence[Dict[str, Any]]) -> None:
         self.table.setRowCount(len(records))
+        self._row_ids = [record.get("id") for record in records]
         for row_idx, record in enumerate(records):
-            for col_idx, (_, field) in enumerate(self.table_columns):
-                value = record.get(field, "")
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                item.setData(Qt.UserRole, record)
-                self.table.setItem(row_idx, col_idx, item)
+            self.set_table_row(row_idx, record)
         self.table.resizeColumnsToContents()
 
+    def set_table_row(self, row_idx: int, record: Dict[str, Any]) -> None:
+        for col_idx, value in enumerate(self.format_row(record)):
+            item = QTableWidgetItem(str(value))
+            if col_idx == 0:
+                # Only the first cell keeps the record; Qt copies dicts into every cell it is set on.
+                item.setData(Qt.UserRole, record)
+            self.table.setItem(row_idx, col_idx, item)
+
+    def show_record(self, record_id: Any) -> bool:
+        # Opens a record picked elsewhere (the toolbar search) even when the list does not show it.
+        if record_id not in self._row_ids:
+            records = self.load_records_by_ids([record_id])
+            if not records:
+                self.status_hint.setText("O registro nao existe mais.")
+                return False
+            self.table.insertRow(0)
+            self._row_ids.insert(0, record_id)
+            self.set_table_row(0, records[0])
+        row_idx = self._row_ids.index(record_id)
+        self.table.clearSelection()
+        self.table.selectRow(row_idx)
+        self.table.scrollToItem(self.table.item(row_idx, 0))
+        return True
+
+    def record_at(self, row_idx: int) -> Optional[Dict[str, Any]]:
+        item = self.table.item(row_idx, 0)
+        return item.data(Qt.UserRole) if item else None
+
     def on_table_selection(self) -> None:
         selected_items = self.table.selectedItems()
         if not selected_items:
             return
-        record = selected_items[0].data(Qt.UserRole)
+        record = self.record_at(selected_items[0].row())
         if record:
             self._current_id = record.get("id")
+            self._current_version = record.get("version")
             self.populate_form(record)
             self.status_hint.setText("Registro carregado. Ajuste os dados e clique em Salvar.")
 
@@ -211,6 +410,7 @@ class AbstractCrudPage(BasePage):
 
     def reset_form(self) -> None:
         self._current_id = None
+        self._current_version = None
         for widget in self.form_fields.values():
             self.set_widget_value(widget, None)
         self.status_hint.setText("Pronto para criar um novo registro.")
@@ -225,13 +425,28 @@ class AbstractCrudPage(BasePage):
             return
         service = self.get_service()
         if self._current_id:
-            service.update(self._current_id, payload)
+            if self._current_version is not None:
+                payload["version"] = self._current_version
+            try:
+                service.update(self._current_id, payload)
+            except ConflictError as exc:
+                self.show_conflict(exc)
+                return
             self.status_hint.setText("Atualizacao concluida com sucesso.")
         else:
             self._current_id = service.insert(payload)
             self.status_hint.setText("Cadastro realizado com sucesso.")
         self.refresh_table()
 
+    def show_conflict(self, error: ConflictError) -> None:
+        QMessageBox.warning(
+            self,
+            "Registro alterado",
+            f"{error}\n\nA lista sera recarregada; suas alteracoes nao foram gravadas.",
+        )
+        self.status_hint.setText("Alteracao nao gravada: o registro mudou em outra estacao.")
+        self.refresh_table()
+
     def on_delete(self) -> None:
         if not self._current_id:
             QMessageBox.information(self, "Selecao necessaria", "Selecione um registro para excluir.")
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QModelIndex, Qt, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QFont, QStandardItem, QStandardItemModel
+from PySide6.QtWidgets import QCompleter, QLineEdit, QWidget
+
+from ...services.search import global_search_service
+from .background_search import SearchSignals, SearchTask
+
+ENTITY_ROLE = Qt.UserRole + 1
+RECORD_ROLE = Qt.UserRole + 2
+# The completer writes this role back into the box; keeping the typed text there leaves it untouched.
+QUERY_ROLE = Qt.UserRole + 3
+
+
+class GlobalSearchBox(QLineEdit):
+    result_chosen = Signal(str, int)
+
+    def __init__(self, parent: Optional[QWidget] = None, delay_ms: int = 200) -> None:
+        super().__init__(parent)
+        self.setPlaceholderText("Buscar clientes, placas, ordens, servicos... (Ctrl+K)")
+        self.setToolTip("Busca em todo o cadastro. Escolha um resultado para abrir o registro na tela dele.")
+        self.setClearButtonEnabled(True)
+        self.model = QStandardItemModel(self)
+        self.completer_popup = QCompleter(self.model, self)
+        self.completer_popup.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer_popup.setCompletionRole(QUERY_ROLE)
+        self.completer_popup.setMaxVisibleItems(16)
+        self.completer_popup.activated[QModelIndex].connect(self.on_activated)
+        self.setCompleter(self.completer_popup)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.run_search)
+        self.textEdited.connect(lambda _: self._timer.start())
+        self.returnPressed.connect(self.run_search)
+        # Same worker path as the list pages: in client mode each search is an HTTP round-trip.
+        self._search_request = 0
+        self._search_task: Optional[SearchTask] = None
+        self._search_text = ""
+        self._search_signals = SearchSignals()
+        self._search_signals.chunk.connect(self.on_search_chunk)
+        self._search_signals.finished.connect(self.on_search_finished)
+        self._search_signals.failed.connect(self.on_search_failed)
+
+    def run_search(self) -> None:
+        self._timer.stop()
+        self.cancel_search()
+        self._search_request += 1
+        self._search_text = self.text().strip()
+        self._search_task = SearchTask(
+            self._search_request,
+            lambda text: [global_search_service.search(text)],
+            self._search_text,
+            self._search_signals,
+        )
+        QThreadPool.globalInstance().start(self._search_task)
+
+    def cancel_search(self) -> None:
+        task, self._search_task = self._search_task, None
+        if task is not None:
+            task.cancel()
+            QThreadPool.globalInstance().tryTake(task)
+            self._search_request += 1
+
+    def on_search_chunk(self, request: int, responses: List[Dict[str, Any]]) -> None:
+        if request == self._search_request:
+            self.show_results(self._search_text, responses[0])
+
+    def on_search_finished(self, request: int, total: int) -> None:
+        if request == self._search_request:
+            self._search_task = None
+
+    def on_search_failed(self, request: int, message: str) -> None:
+        if request != self._search_request:
+            return
+        self._search_task = None
+        self.model.clear()
+        failure = QStandardItem(f"Falha na busca: {message}")
+        failure.setFlags(Qt.NoItemFlags)
+        failure.setData(self._search_text, QUERY_ROLE)
+        self.model.appendRow(failure)
+        if self.hasFocus():
+            self.completer_popup.complete()
+
+    def show_results(self, text: str, response: Dict[str, Any]) -> None:
+        self.model.clear()
+        header_font = QFont()
+        header_font.setBold(True)
+        for group in response["groups"]:
+            header = QStandardItem(f"{group['label']} ({len(group['results'])})")
+            header.setFont(header_font)
+            header.setFlags(Qt.NoItemFlags)
+            header.setData(text, QUERY_ROLE)
+            self.model.appendRow(header)
+            for result in group["results"]:
+                item = QStandardItem(f"   {result['title']}  -  {result['detail'] or ''}".rstrip(" -"))
+                item.setData(group["entity"], ENTITY_ROLE)
+                item.setData(result["id"], RECORD_ROLE)
+                item.setData(text, QUERY_ROLE)
+                self.model.appendRow(item)
+        if not response["complete"]:
+            more = QStandardItem("Busca interrompida pelo tempo limite; refine o termo.")
+            more.setFlags(Qt.NoItemFlags)
+            more.setData(text, QUERY_ROLE)
+            self.model.appendRow(more)
+        if self.model.rowCount() and self.hasFocus():
+            self.completer_popup.complete()
+        else:
+            self.completer_popup.popup().hide()
+
+    def on_activated(self, index: QModelIndex) -> None:
+        entity = index.data(ENTITY_ROLE)
+        if entity:
+            self.result_chosen.emit(entity, int(index.data(RECORD_ROLE)))
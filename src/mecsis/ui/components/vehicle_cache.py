@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from ...services.changes import change_log_service
+from ...services.vehicles import vehicle_service
+from ...utils.metrics import metrics
+
+
+class VehicleCache:
+    """Vehicles per client for the order pickers, loaded in bulk and kept in step with the change log."""
+
+    # Brand or model renames change every label; vehicle writes only the owners involved.
+    label_tables = ("brands", "vehicle_models")
+
+    def __init__(self) -> None:
+        self._vehicles: Dict[int, List[Dict]] = {}
+        self._seq: Optional[int] = None
+
+    def prefetch(self, client_ids: Iterable[int]) -> None:
+        missing = [client_id for client_id in dict.fromkeys(client_ids) if client_id and client_id not in self._vehicles]
+        if not missing:
+            return
+        if self._seq is None:
+            # Read the log position first so writes made during the load are invalidated next time.
+            self._seq = change_log_service.current_seq()
+        for client_id in missing:
+            self._vehicles[client_id] = []
+        for vehicle in vehicle_service.list_by_clients(missing):
+            self._vehicles[vehicle["client_id"]].append(vehicle)
+
+    def get(self, client_id: int) -> List[Dict]:
+        metrics.record_cache("order_vehicles", client_id in self._vehicles)
+        self.prefetch([client_id])
+        return self._vehicles.get(client_id, [])
+
+    def clear(self) -> None:
+        self._vehicles.clear()
+        self._seq = None
+
+    def sync(self) -> None:
+        if self._seq is None:
+            return
+        delta = change_log_service.changes_since(self._seq, ("vehicles", *self.label_tables))
+        changes = delta["changes"]
+        if delta["truncated"] or any(change["table"] != "vehicles" for change in changes):
+            self.clear()
+            return
+        self._seq = delta["seq"]
+        changed = {change["id"] for change in changes}
+        if not changed:
+            return
+        # Owners before the change come from the cached lists, owners after it from the table.
+        owners = {
+            client_id
+            for client_id, vehicles in self._vehicles.items()
+            if any(vehicle["id"] in changed for vehicle in vehicles)
+        }
+        owners.update(vehicle["client_id"] for vehicle in vehicle_service.list_by_ids(list(changed)))
+        for client_id in owners:
+            self._vehicles.pop(client_id, None)
@@ -1,15 +1,29 @@
 from __future__ import annotations
 
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QDialog,
     QDialogButtonBox,
     QFormLayout,
+    QHeaderView,
+    QLabel,
     QLineEdit,
     QMessageBox,
+    QTableWidget,
+    QTableWidgetItem,
     QVBoxLayout,
 )
 
 from ..services.auth import auth_service
+from ..services.vehicles import vehicle_service
+
+STATUS_LABELS = {
+    "open": "Aberta",
+    "in_progress": "Em andamento",
+    "waiting_parts": "Aguardando pecas",
+    "completed": "Concluida",
+    "cancelled": "Cancelada",
+}
 
 
 class AccountSettingsDialog(QDialog):
@@ -91,20 +105,87 @@ class AccountSettingsDialog(QDialog):
         else:
             new_password = None
 
-        if not auth_service.verify_credentials(self.user["username"], current_password):
-            QMessageBox.critical(self, "Senha incorreta", "A senha atual informada esta incorreta.")
-            return
-
         try:
             self.updated_user = auth_service.update_profile(
                 self.user["id"],
+                current_password,
                 username,
                 display_name or username,
                 new_password=new_password,
             )
+        except PermissionError as exc:
+            QMessageBox.critical(self, "Senha incorreta", str(exc))
+            return
         except ValueError as exc:
             QMessageBox.warning(self, "Usuario indisponivel", str(exc))
             return
 
         QMessageBox.information(self, "Sucesso", "Dados atualizados com sucesso.")
         self.accept()
+
+
+class VehicleHistoryDialog(QDialog):
+    def __init__(self, vehicle_id: int, parent=None) -> None:
+        super().__init__(parent)
+        self.history = vehicle_service.history(vehicle_id) or {"vehicle": {}, "orders": [], "mileage": []}
+        vehicle = self.history["vehicle"]
+        self.setWindowTitle(f"Historico do veiculo {vehicle.get('license_plate', '')}")
+        self.setModal(True)
+        self.setMinimumSize(760, 480)
+        self._build_ui()
+
+    def _build_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(12)
+
+        vehicle = self.history["vehicle"]
+        parts = (vehicle.get("brand_name"), vehicle.get("model_name"), str(vehicle.get("model_year") or ""))
+        description = " ".join(part for part in parts if part)
+        header = QLabel(
+            f"{vehicle.get('license_plate', '')} - {description} - {vehicle.get('client_name', '')}\n"
+            f"{len(self.history['orders'])} ordens de servico e {len(self.history['mileage'])} leituras de quilometragem."
+        )
+        header.setWordWrap(True)
+        layout.addWidget(header)
+
+        events = self.timeline()
+        self.table = QTableWidget(len(events), 4)
+        self.table.setHorizontalHeaderLabels(["Data", "Registro", "Descricao", "Valor"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        for row, event in enumerate(events):
+            for col, value in enumerate(event):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        layout.addWidget(self.table, stretch=1)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+    def timeline(self) -> list:
+        events = []
+        for order in self.history["orders"]:
+            items = ", ".join(
+                item.get("service_name") or item.get("description") or "" for item in order.get("items", [])
+            )
+            details = " - ".join(
+                part
+                for part in (STATUS_LABELS.get(order.get("status"), order.get("status", "")), order.get("summary"), items)
+                if part
+            )
+            kind = "OS arquivada" if order.get("archived") else "OS"
+            events.append(
+                (
+                    (order.get("created_at") or "")[:10],
+                    f"{kind} {order.get('order_number', '')}",
+                    details,
+                    f"R$ {float(order.get('total_amount') or 0):.2f}",
+                )
+            )
+        for reading in self.history["mileage"]:
+            events.append(((reading.get("recorded_at") or "")[:10], "Quilometragem", f"{reading['mileage']} km", ""))
+        return sorted(events, key=lambda event: event[0])
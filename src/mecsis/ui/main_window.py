@@ -4,7 +4,7 @@ from __future__ import annotations
 from typing import Dict
 
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QAction, QIcon
+from PySide6.QtGui import QAction, QIcon, QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QDialog,
     QFrame,
@@ -20,17 +20,28 @@ from PySide6.QtWidgets import (
 )
 
 from ..utils.config import resource_path
+from .components.change_watcher import ChangeWatcher
+from .components.global_search import GlobalSearchBox
 from .dialogs import AccountSettingsDialog
 from .pages.brands_page import BrandsPage
 from .pages.clients_page import ClientsPage
 from .pages.collaborators_page import CollaboratorsPage
 from .pages.dashboard_page import DashboardPage
+from .pages.diagnostics_page import DiagnosticsPage
 from .pages.help_page import HelpPage
 from .pages.models_page import ModelsPage
 from .pages.orders_page import OrdersPage
 from .pages.services_page import ServicesPage
 from .pages.vehicles_page import VehiclesPage
 
+# Page that opens each kind of result from the toolbar search.
+SEARCH_PAGES = {
+    "clients": "clientes",
+    "vehicles": "veiculos",
+    "orders": "ordens",
+    "services": "servicos",
+}
+
 
 class MainWindow(QMainWindow):
     def __init__(self, user: dict) -> None:
@@ -48,6 +59,9 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage(
             f"Usuario autenticado: {user.get('display_name', user.get('username'))}"
         )
+        self.change_watcher = ChangeWatcher(self)
+        self.change_watcher.tables_changed.connect(self.on_tables_changed)
+        self.change_watcher.start()
 
     def _build_ui(self) -> None:
         container = QWidget()
@@ -98,6 +112,7 @@ class MainWindow(QMainWindow):
             ("marcas", "Marcas"),
             ("modelos", "Modelos"),
             ("ajuda", "Ajuda"),
+            ("diagnostico", "Diagnostico"),
         ]
 
         for key, label in items:
@@ -135,6 +150,7 @@ class MainWindow(QMainWindow):
         self.pages["marcas"] = BrandsPage(self.show_help)
         self.pages["modelos"] = ModelsPage(self.show_help)
         self.pages["ajuda"] = HelpPage(self.show_help)
+        self.pages["diagnostico"] = DiagnosticsPage(self.show_help)
 
         for page in self.pages.values():
             self.stack.addWidget(page)
@@ -168,6 +184,16 @@ class MainWindow(QMainWindow):
         logout_action.triggered.connect(self.close)
         toolbar.addAction(logout_action)
 
+        spacer = QWidget()
+        spacer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        toolbar.addWidget(spacer)
+
+        self.global_search = GlobalSearchBox(self)
+        self.global_search.setFixedWidth(380)
+        self.global_search.result_chosen.connect(self.open_search_result)
+        toolbar.addWidget(self.global_search)
+        QShortcut(QKeySequence("Ctrl+K"), self, activated=self.focus_global_search)
+
     def toggle_fullscreen(self) -> None:
         if self.windowState() & Qt.WindowFullScreen:
             self.showNormal()
@@ -182,6 +208,17 @@ class MainWindow(QMainWindow):
                 f"Usuario autenticado: {self.user.get('display_name', self.user.get('username'))}"
             )
 
+    def focus_global_search(self) -> None:
+        self.global_search.setFocus()
+        self.global_search.selectAll()
+
+    def open_search_result(self, entity: str, record_id: int) -> None:
+        key = SEARCH_PAGES.get(entity)
+        if key is None:
+            return
+        self.navigate_to(key)
+        self.pages[key].show_record(record_id)
+
     def navigate_to(self, key: str) -> None:
         if key not in self.pages:
             return
@@ -212,5 +249,14 @@ class MainWindow(QMainWindow):
         if current:
             self.refresh_page(current)
 
+    def on_tables_changed(self, tables) -> None:
+        current = self.stack.currentWidget()
+        if current is not None and hasattr(current, "on_tables_changed"):
+            current.on_tables_changed(tables)
+
+    def closeEvent(self, event) -> None:
+        self.change_watcher.stop()
+        super().closeEvent(event)
+
     def show_help(self) -> None:
         self.navigate_to("ajuda")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QLineEdit, QPlainTextEdit
 
 from ...services.clients import client_service
@@ -7,6 +8,10 @@ from ..components.crud_page import AbstractCrudPage
 
 
 class ClientsPage(AbstractCrudPage):
+    row_tables = ("client_stats",)
+    # Columns the list can be ordered by (clicking the header); the others keep the current order.
+    sortable_fields = ("full_name", "vehicle_count", "order_count", "last_visit", "lifetime_spend")
+
     def __init__(self, on_help_requested) -> None:
         columns = [
             ("Nome", "full_name"),
@@ -14,12 +19,72 @@ class ClientsPage(AbstractCrudPage):
             ("Telefone", "phone"),
             ("Celular", "mobile"),
             ("Cidade", "city"),
+            ("Veiculos", "vehicle_count"),
+            ("Ordens", "order_count"),
+            ("Ultima visita", "last_visit"),
+            ("Total gasto", "lifetime_spend"),
         ]
+        self.sort_field = "id"
+        self.sort_descending = True
         super().__init__("Clientes", on_help_requested, columns)
+        header = self.table.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self.on_header_clicked)
 
     def get_service(self):
         return client_service
 
+    def load_records(self, keyword=None):
+        if keyword:
+            return self.sorted_records(client_service.search(keyword))
+        return client_service.list_with_stats(self.sort_field, self.sort_descending, compact=True)
+
+    def load_records_by_ids(self, ids):
+        return client_service.list_with_stats(ids=ids, compact=True)
+
+    def sorted_records(self, records):
+        # Search results come by relevance; a header the user clicked takes precedence.
+        if self.sort_field == "id":
+            return records
+        field = self.sort_field
+        present = [record for record in records if record.get(field) is not None]
+        missing = [record for record in records if record.get(field) is None]
+        present.sort(key=lambda record: record[field], reverse=self.sort_descending)
+        return present + missing
+
+    def on_header_clicked(self, column: int) -> None:
+        field = self.table_columns[column][1]
+        if field not in self.sortable_fields:
+            return
+        # Counters and dates start from the highest; names from A.
+        if field == self.sort_field:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_descending = field != "full_name"
+        self.sort_field = field
+        header = self.table.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(column, Qt.DescendingOrder if self.sort_descending else Qt.AscendingOrder)
+        keyword = self.search_input.text().strip()
+        if keyword:
+            self.start_search(keyword)
+        else:
+            self.reload_table()
+
+    def format_row(self, record):
+        values = []
+        for _, field in self.table_columns:
+            value = record.get(field)
+            if field == "lifetime_spend":
+                values.append(f"R$ {float(value or 0):.2f}")
+            elif field in ("vehicle_count", "order_count"):
+                values.append(value or 0)
+            elif field == "last_visit":
+                values.append(str(value)[:10] if value else "")
+            else:
+                values.append("" if value is None else value)
+        return values
+
     def setup_form(self) -> None:
         self.name_input = QLineEdit()
         self.name_input.setPlaceholderText("Nome completo do cliente")
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QComboBox, QDoubleSpinBox, QLineEdit, QTableWidgetItem
+from PySide6.QtWidgets import QComboBox, QDoubleSpinBox, QLineEdit
 
 from ...services.collaborators import collaborator_service
 from ..components.crud_page import AbstractCrudPage
@@ -56,18 +55,12 @@ class CollaboratorsPage(AbstractCrudPage):
         self.status_combo.setToolTip("Define se o colaborador pode ser alocado em Ordens de Servico.")
         self.register_field("is_active", self.status_combo, "Situacao")
 
-    def populate_table(self, records):
-        self.table.setRowCount(len(records))
-        for row_idx, record in enumerate(records):
-            for col_idx, (_, field) in enumerate(self.table_columns):
-                if field == "is_active":
-                    display = "Ativo" if record.get(field) else "Inativo"
-                else:
-                    display = record.get(field, "")
-                item = QTableWidgetItem(str(display) if display is not None else "")
-                item.setData(Qt.UserRole, record)
-                self.table.setItem(row_idx, col_idx, item)
-        self.table.resizeColumnsToContents()
+    def format_row(self, record):
+        values = super().format_row(record)
+        for col_idx, (_, field) in enumerate(self.table_columns):
+            if field == "is_active":
+                values[col_idx] = "Ativo" if record.get(field) else "Inativo"
+        return values
 
     def collect_form_data(self):
         payload = super().collect_form_data()
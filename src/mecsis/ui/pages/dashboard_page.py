@@ -130,6 +130,10 @@ class DashboardPage(BasePage):
         self.metrics["open_orders"].setText(str(totals["open_orders"]))
         self.on_calendar_selection()
 
+    def on_tables_changed(self, tables) -> None:
+        if {"clients", "collaborators", "vehicles", "orders"}.intersection(tables):
+            self.update_stats()
+
     def on_calendar_selection(self) -> None:
         selected_date = self.calendar.selectedDate().toString("yyyy-MM-dd")
         status_labels = {
@@ -139,11 +143,7 @@ class DashboardPage(BasePage):
             "completed": "Concluida",
             "cancelled": "Cancelada",
         }
-        orders = [
-            order
-            for order in order_service.list_summary()
-            if order.get("expected_delivery") == selected_date
-        ]
+        orders = order_service.list_due_on(selected_date)
         self.orders_table.setRowCount(len(orders))
         for row, order in enumerate(orders):
             data = [
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, List, Sequence
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QFileDialog,
+    QFrame,
+    QGridLayout,
+    QHBoxLayout,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QTabWidget,
+    QVBoxLayout,
+)
+
+from ...services.diagnostics import diagnostics_service
+from ..components.base_page import BasePage
+
+
+def _format_bytes(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+class DiagnosticsPage(BasePage):
+    def __init__(self, on_help_requested) -> None:
+        super().__init__("Diagnostico do Sistema", on_help_requested)
+        self._build_content()
+
+    def _build_content(self) -> None:
+        layout = self.content_layout
+
+        caption = QLabel(
+            "Indicadores tecnicos de desempenho do MEC-SIS. "
+            "Exporte o relatorio em JSON para anexar em chamados de suporte."
+        )
+        caption.setWordWrap(True)
+        layout.addWidget(caption)
+
+        stats_grid = QGridLayout()
+        stats_grid.setSpacing(18)
+        self.metrics = {}
+        cards = [
+            ("queries", "Consultas executadas"),
+            ("connections", "Conexoes (ativas / pico)"),
+            ("db_size", "Tamanho do banco"),
+            ("wal_size", "Tamanho do WAL"),
+            ("pool", "Pool de conexoes (em uso / tamanho)"),
+        ]
+        for index, (key, title) in enumerate(cards):
+            card, value_label = self._create_metric_card(title)
+            stats_grid.addWidget(card, index // 2, index % 2)
+            self.metrics[key] = value_label
+        layout.addLayout(stats_grid)
+
+        actions_layout = QHBoxLayout()
+        actions_layout.setSpacing(8)
+
+        refresh_button = QPushButton("Atualizar indicadores")
+        refresh_button.setCursor(Qt.PointingHandCursor)
+        refresh_button.setToolTip("Recarrega os indicadores exibidos nesta tela.")
+        refresh_button.clicked.connect(self.update_stats)
+        actions_layout.addWidget(refresh_button)
+
+        export_button = QPushButton("Exportar JSON")
+        export_button.setCursor(Qt.PointingHandCursor)
+        export_button.setProperty("accent", "true")
+        export_button.setToolTip("Salva todos os indicadores em um arquivo JSON para o suporte.")
+        export_button.clicked.connect(self.on_export)
+        actions_layout.addWidget(export_button)
+
+        reset_button = QPushButton("Zerar contadores")
+        reset_button.setCursor(Qt.PointingHandCursor)
+        reset_button.setToolTip("Reinicia as medicoes de tempo, cache e consultas lentas.")
+        reset_button.clicked.connect(self.on_reset)
+        actions_layout.addWidget(reset_button)
+        actions_layout.addStretch()
+        layout.addLayout(actions_layout)
+
+        self.tabs = QTabWidget()
+        self.methods_table = self._create_table(
+            ["Metodo", "Chamadas", "Erros", "Media (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)"]
+        )
+        self.methods_table.setToolTip("Tempo de resposta de cada operacao dos servicos.")
+        self.tabs.addTab(self.methods_table, "Servicos")
+
+        self.cache_table = self._create_table(["Cache", "Acertos", "Falhas", "Taxa de acerto"])
+        self.cache_table.setToolTip("Eficiencia dos caches internos.")
+        self.tabs.addTab(self.cache_table, "Caches")
+
+        self.pragma_table = self._create_table(["PRAGMA", "Valor"])
+        self.pragma_table.setToolTip("Configuracao ativa do SQLite nesta estacao.")
+        self.tabs.addTab(self.pragma_table, "Banco de dados")
+
+        self.slow_table = self._create_table(["Horario", "Duracao (ms)", "Consulta"])
+        self.slow_table.setToolTip("Ultimas consultas que ultrapassaram o limite de lentidao.")
+        self.tabs.addTab(self.slow_table, "Consultas lentas")
+        layout.addWidget(self.tabs, stretch=1)
+
+        self.status_hint = QLabel("")
+        self.status_hint.setObjectName("statusHint")
+        self.status_hint.setWordWrap(True)
+        layout.addWidget(self.status_hint)
+
+    def _create_metric_card(self, title: str) -> tuple[QFrame, QLabel]:
+        card = QFrame()
+        card.setProperty("role", "card")
+        card_layout = QVBoxLayout(card)
+        card_layout.setContentsMargins(12, 8, 12, 12)
+        card_layout.setSpacing(6)
+
+        title_label = QLabel(title)
+        title_label.setProperty("role", "metricTitle")
+        card_layout.addWidget(title_label)
+
+        value_label = QLabel("0")
+        value_label.setProperty("role", "metricValue")
+        card_layout.addWidget(value_label)
+
+        return card, value_label
+
+    def _create_table(self, headers: Sequence[str]) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(list(headers))
+        table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().setVisible(False)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        return table
+
+    def _fill_table(self, table: QTableWidget, rows: List[Sequence[Any]]) -> None:
+        table.setRowCount(len(rows))
+        for row_idx, values in enumerate(rows):
+            for col_idx, value in enumerate(values):
+                table.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
+        table.resizeColumnsToContents()
+
+    def update_stats(self) -> None:
+        snapshot = diagnostics_service.snapshot()
+        connections = snapshot["connections"]
+        storage = snapshot["storage"]
+        self.metrics["queries"].setText(str(snapshot["queries"]))
+        self.metrics["connections"].setText(f"{connections['active']} / {connections['peak']}")
+        pool = connections["pool"]
+        self.metrics["pool"].setText(
+            f"{pool['in_use']} / {pool['size']} - {pool['waits']} esperas "
+            f"(p95 {pool['wait_p95_ms']:.0f} ms, {pool['timeouts']} esgotadas)"
+            if pool["size"]
+            else "Sem pool (uma conexao por operacao)"
+        )
+        self.metrics["db_size"].setText(_format_bytes(storage["db_bytes"]))
+        self.metrics["wal_size"].setText(_format_bytes(storage["wal_bytes"]))
+
+        self._fill_table(
+            self.methods_table,
+            [
+                (
+                    name,
+                    stats["count"],
+                    stats["errors"],
+                    f"{stats['avg_ms']:.2f}",
+                    f"{stats['p50_ms']:.2f}",
+                    f"{stats['p95_ms']:.2f}",
+                    f"{stats['p99_ms']:.2f}",
+                    f"{stats['max_ms']:.2f}",
+                )
+                for name, stats in snapshot["methods"].items()
+            ],
+        )
+        self._fill_table(
+            self.cache_table,
+            [
+                (name, stats["hits"], stats["misses"], f"{stats['hit_rate'] * 100:.1f}%")
+                for name, stats in snapshot["cache"].items()
+            ],
+        )
+        self._fill_table(self.pragma_table, list(snapshot["pragmas"].items()))
+        self._fill_table(
+            self.slow_table,
+            [(entry["at"], f"{entry['elapsed_ms']:.1f}", entry["sql"]) for entry in snapshot["slow_queries"]],
+        )
+        self.status_hint.setText(
+            f"Atualizado em {datetime.now():%d/%m/%Y %H:%M:%S}. "
+            f"Consultas acima de {snapshot['slow_query_threshold_ms']:.0f} ms sao registradas como lentas."
+        )
+
+    def on_export(self) -> None:
+        default_name = f"mecsis-diagnostico-{datetime.now():%Y%m%d-%H%M%S}.json"
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar diagnostico",
+            default_name,
+            "Arquivo JSON (*.json)",
+        )
+        if not file_path:
+            return
+        try:
+            diagnostics_service.export_json(file_path)
+        except OSError as exc:
+            QMessageBox.critical(self, "Falha ao exportar", f"Nao foi possivel salvar o arquivo.\n\n{exc}")
+            return
+        self.status_hint.setText(f"Diagnostico exportado para {file_path}.")
+
+    def on_reset(self) -> None:
+        diagnostics_service.reset()
+        self.update_stats()
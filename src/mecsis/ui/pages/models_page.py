@@ -8,6 +8,8 @@ from ..components.crud_page import AbstractCrudPage
 
 
 class ModelsPage(AbstractCrudPage):
+    related_tables = ("brands",)
+
     def __init__(self, on_help_requested) -> None:
         columns = [
             ("Marca", "brand_name"),
@@ -19,7 +21,10 @@ class ModelsPage(AbstractCrudPage):
         return model_service
 
     def load_records(self, keyword=None):
-        return model_service.list_with_brand()
+        return model_service.list_with_brand(compact=True)
+
+    def load_records_by_ids(self, ids):
+        return model_service.list_with_brand(compact=True, ids=ids)
 
     def setup_form(self) -> None:
         self.brand_combo = QComboBox()
@@ -28,15 +28,19 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
-from ...services.clients import client_service
+from ...services.base import ConflictError
 from ...services.collaborators import collaborator_service
 from ...services.orders import order_service
 from ...services.services_catalog import service_catalog
-from ...services.vehicles import vehicle_service
+from ..components.client_picker import ClientPicker
 from ..components.crud_page import AbstractCrudPage
+from ..components.vehicle_cache import VehicleCache
 
 
 class OrdersPage(AbstractCrudPage):
+    related_tables = ("clients", "vehicles", "brands", "vehicle_models")
+    move_updated_to_top = True
+
     PAYMENT_METHODS = [
         ("PIX", "PIX"),
         ("Dinheiro", "cash"),
@@ -58,6 +62,7 @@ class OrdersPage(AbstractCrudPage):
         self.current_items: List[Dict] = []
         self.selected_item_index: Optional[int] = None
         self.current_collaborators: List[Dict] = []
+        self.vehicle_cache = VehicleCache()
         columns = [
             ("No OS", "order_number"),
             ("Cliente", "client_name"),
@@ -71,20 +76,24 @@ class OrdersPage(AbstractCrudPage):
     def get_service(self):
         return order_service
 
+    def refresh_table(self):
+        self.vehicle_cache.sync()
+        super().refresh_table()
+
+    def on_tables_changed(self, tables):
+        if {"vehicles", *VehicleCache.label_tables}.intersection(tables):
+            self.vehicle_cache.sync()
+        super().on_tables_changed(tables)
+
     def load_records(self, keyword=None):
-        orders = order_service.list_summary()
-        if keyword:
-            keyword_lower = keyword.lower()
-            orders = [
-                order
-                for order in orders
-                if keyword_lower in str(order.get("order_number", "")).lower()
-                or keyword_lower in str(order.get("client_name", "")).lower()
-                or keyword_lower in str(order.get("license_plate", "")).lower()
-            ]
-        return orders
+        if not keyword:
+            return order_service.list_summary(compact=True)
+        return order_service.search(keyword, compact=True)
 
-    def populate_table(self, records):
+    def load_records_by_ids(self, ids):
+        return order_service.list_summary(compact=True, ids=ids)
+
+    def format_row(self, record):
         status_labels = {
             "open": "Aberta",
             "in_progress": "Em andamento",
@@ -92,34 +101,27 @@ class OrdersPage(AbstractCrudPage):
             "completed": "Concluida",
             "cancelled": "Cancelada",
         }
-        self.table.setRowCount(len(records))
-        for row_idx, record in enumerate(records):
-            status_display = status_labels.get(record.get("status"), record.get("status", ""))
-            updated_at = record.get("updated_at")
-            if isinstance(updated_at, datetime):
-                updated_display = updated_at.strftime("%d/%m/%Y %H:%M")
-            elif updated_at:
-                try:
-                    updated_display = datetime.fromisoformat(str(updated_at)).strftime("%d/%m/%Y %H:%M")
-                except ValueError:
-                    updated_display = str(updated_at)
-            else:
-                updated_display = ""
-
-            total_amount = record.get("total_amount") or 0
-            values = [
-                record.get("order_number", ""),
-                record.get("client_name", ""),
-                record.get("license_plate", ""),
-                status_display,
-                updated_display,
-                f"R$ {float(total_amount):.2f}",
-            ]
-            for col_idx, value in enumerate(values):
-                item = QTableWidgetItem(str(value))
-                item.setData(Qt.UserRole, record)
-                self.table.setItem(row_idx, col_idx, item)
-        self.table.resizeColumnsToContents()
+        status_display = status_labels.get(record.get("status"), record.get("status", ""))
+        updated_at = record.get("updated_at")
+        if isinstance(updated_at, datetime):
+            updated_display = updated_at.strftime("%d/%m/%Y %H:%M")
+        elif updated_at:
+            try:
+                updated_display = datetime.fromisoformat(str(updated_at)).strftime("%d/%m/%Y %H:%M")
+            except ValueError:
+                updated_display = str(updated_at)
+        else:
+            updated_display = ""
+
+        total_amount = record.get("total_amount") or 0
+        return [
+            record.get("order_number", ""),
+            record.get("client_name", ""),
+            record.get("license_plate", ""),
+            status_display,
+            updated_display,
+            f"R$ {float(total_amount):.2f}",
+        ]
 
     def setup_form(self) -> None:
         self.current_items = []
@@ -147,11 +149,16 @@ class OrdersPage(AbstractCrudPage):
         self.order_number_display.setToolTip("Identificador unico da OS.")
         details_layout.addRow("Numero:", self.order_number_display)
 
-        self.client_combo = QComboBox()
+        self.client_combo = ClientPicker()
         self.client_combo.setToolTip("Selecione o cliente para carregar os veiculos disponiveis.")
+        self.client_combo.setPlaceholderText("Cadastre clientes antes de criar OS")
         self.client_combo.currentIndexChanged.connect(self.on_client_changed)
+        # Each page of clients read by the picker brings the vehicles of those clients in one query.
+        self.client_combo.page_model.page_loaded.connect(
+            lambda clients: self.vehicle_cache.prefetch(client["id"] for client in clients)
+        )
         self.form_fields["client_id"] = self.client_combo
-        details_layout.addRow("Cliente:", self.client_combo)
+        details_layout.addRow("Cliente:", self.client_combo.container())
 
         self.vehicle_combo = QComboBox()
         self.vehicle_combo.setToolTip("Escolha o veiculo relacionado a OS.")
@@ -353,14 +360,7 @@ class OrdersPage(AbstractCrudPage):
         return table
 
     def populate_clients(self):
-        self.client_combo.clear()
-        clients = client_service.list_all()
-        for client in clients:
-            display = f"{client['full_name']} ({client['document']})"
-            self.client_combo.addItem(display, client["id"])
-        if not clients:
-            self.client_combo.addItem("Cadastre clientes antes de criar OS", None)
-        self.on_client_changed()
+        self.client_combo.reload()
 
     def populate_services(self):
         self.item_service_combo.clear()
@@ -386,7 +386,7 @@ class OrdersPage(AbstractCrudPage):
         client_id = self.client_combo.currentData()
         self.vehicle_combo.clear()
         if client_id:
-            vehicles = vehicle_service.list_by_client(client_id)
+            vehicles = self.vehicle_cache.get(client_id)
             for vehicle in vehicles:
                 display = f"{vehicle['license_plate']} - {vehicle.get('brand_name', '')} {vehicle.get('model_name', '')}"
                 self.vehicle_combo.addItem(display, vehicle["id"])
@@ -511,7 +511,13 @@ class OrdersPage(AbstractCrudPage):
         if not self.validate_order_payload(order_payload):
             return
         if self._current_id:
-            order_service.update_order(self._current_id, order_payload, items, collaborators)
+            if self._current_version is not None:
+                order_payload["version"] = self._current_version
+            try:
+                order_service.update_order(self._current_id, order_payload, items, collaborators)
+            except ConflictError as exc:
+                self.show_conflict(exc)
+                return
             self.status_hint.setText("Ordem de servico atualizada com sucesso.")
         else:
             self._current_id = order_service.create_order(order_payload, items, collaborators)
@@ -565,12 +571,15 @@ class OrdersPage(AbstractCrudPage):
         full_order = order_service.get_full_order(record["id"])
         if not full_order:
             return
-        self.populate_clients()
         self.populate_services()
         self.populate_collaborators()
 
-        client_id = full_order.get("client_id")
-        self.set_combo_by_value(self.client_combo, client_id)
+        # The picker keeps its loaded pages; selecting the client fills the vehicles once.
+        blocked = self.client_combo.blockSignals(True)
+        try:
+            self.client_combo.set_client(full_order.get("client_id"))
+        finally:
+            self.client_combo.blockSignals(blocked)
         self.on_client_changed()
         self.set_combo_by_value(self.vehicle_combo, full_order.get("vehicle_id"))
         self.set_combo_by_value(self.responsible_combo, full_order.get("responsible_id"))
@@ -605,6 +614,7 @@ class OrdersPage(AbstractCrudPage):
         ]
         self.refresh_collaborators_list()
         self._current_id = full_order["id"]
+        self._current_version = full_order.get("version")
         self.order_number_display.setText(full_order.get("order_number", ""))
         self.status_hint.setText("OS carregada. Ajuste e salve para manter os registros atualizados.")
 
@@ -1,13 +1,11 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QComboBox,
     QDoubleSpinBox,
     QLineEdit,
     QPlainTextEdit,
     QSpinBox,
-    QTableWidgetItem,
 )
 
 from ...services.services_catalog import service_catalog
@@ -58,20 +56,16 @@ class ServicesPage(AbstractCrudPage):
         self.status_combo.setToolTip("Define se o servico aparece para selecao nas Ordens de Servico.")
         self.register_field("is_active", self.status_combo, "Situacao")
 
-    def populate_table(self, records):
-        self.table.setRowCount(len(records))
-        for row_idx, record in enumerate(records):
-            for col_idx, (_, field) in enumerate(self.table_columns):
-                if field == "default_price":
-                    display = f"R$ {record.get(field, 0):.2f}"
-                elif field == "is_active":
-                    display = "Disponivel" if record.get(field) else "Indisponivel"
-                else:
-                    display = record.get(field, "")
-                item = QTableWidgetItem(str(display))
-                item.setData(Qt.UserRole, record)
-                self.table.setItem(row_idx, col_idx, item)
-        self.table.resizeColumnsToContents()
+    def format_row(self, record):
+        values = []
+        for _, field in self.table_columns:
+            if field == "default_price":
+                values.append(f"R$ {record.get(field, 0):.2f}")
+            elif field == "is_active":
+                values.append("Disponivel" if record.get(field) else "Indisponivel")
+            else:
+                values.append(record.get(field, ""))
+        return values
 
     def collect_form_data(self):
         payload = super().collect_form_data()
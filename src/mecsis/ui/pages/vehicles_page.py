@@ -5,18 +5,22 @@ from PySide6.QtWidgets import (
     QComboBox,
     QLineEdit,
     QPlainTextEdit,
+    QPushButton,
     QSpinBox,
-    QTableWidgetItem,
 )
 
 from ...services.brands import brand_service
 from ...services.clients import client_service
 from ...services.models import model_service
 from ...services.vehicles import vehicle_service
+from ...utils.normalize import normalize_plate
 from ..components.crud_page import AbstractCrudPage
+from ..dialogs import VehicleHistoryDialog
 
 
 class VehiclesPage(AbstractCrudPage):
+    related_tables = ("clients", "brands", "vehicle_models")
+
     def __init__(self, on_help_requested) -> None:
         columns = [
             ("Cliente", "client_name"),
@@ -31,7 +35,7 @@ class VehiclesPage(AbstractCrudPage):
         return vehicle_service
 
     def load_records(self, keyword=None):
-        return vehicle_service.list_with_relations()
+        return vehicle_service.list_with_relations(compact=True)
 
     def setup_form(self) -> None:
         self.client_combo = QComboBox()
@@ -86,6 +90,13 @@ class VehiclesPage(AbstractCrudPage):
         self.notes_input.setFixedHeight(100)
         self.register_field("notes", self.notes_input, "Observacoes")
 
+        self.history_button = QPushButton("Ver historico")
+        self.history_button.setCursor(Qt.PointingHandCursor)
+        self.history_button.setToolTip("Mostra as ordens de servico, itens e quilometragens do veiculo, inclusive arquivadas.")
+        self.history_button.setEnabled(False)
+        self.history_button.clicked.connect(self.on_show_history)
+        self.fields_form.addRow("", self.history_button)
+
         self.populate_clients()
         self.populate_brands()
         self.populate_models()
@@ -137,6 +148,15 @@ class VehiclesPage(AbstractCrudPage):
         brand_id = record.get("brand_id")
         self.populate_models(brand_id)
         super().populate_form(record)
+        self.history_button.setEnabled(True)
+
+    def reset_form(self):
+        super().reset_form()
+        self.history_button.setEnabled(False)
+
+    def on_show_history(self):
+        if self._current_id:
+            VehicleHistoryDialog(self._current_id, self).exec()
 
     def collect_form_data(self):
         payload = super().collect_form_data()
@@ -144,7 +164,7 @@ class VehiclesPage(AbstractCrudPage):
         payload["brand_id"] = self.brand_combo.currentData()
         payload["model_id"] = self.model_combo.currentData()
         if payload.get("license_plate"):
-            payload["license_plate"] = payload["license_plate"].replace(" ", "").upper()
+            payload["license_plate"] = normalize_plate(payload["license_plate"])
         return payload
 
     def validate_form(self, payload):
@@ -155,13 +175,3 @@ class VehiclesPage(AbstractCrudPage):
             self.status_hint.setText("Informe a placa do veiculo.")
             return False
         return True
-
-    def populate_table(self, records):
-        self.table.setRowCount(len(records))
-        for row_idx, record in enumerate(records):
-            for col_idx, (_, field) in enumerate(self.table_columns):
-                display = record.get(field, "")
-                item = QTableWidgetItem(str(display) if display is not None else "")
-                item.setData(Qt.UserRole, record)
-                self.table.setItem(row_idx, col_idx, item)
-        self.table.resizeColumnsToContents()
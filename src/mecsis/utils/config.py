@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 import sys
 from pathlib import Path
+from typing import Optional
 
 
 def _runtime_base_dir() -> Path:
@@ -39,3 +40,100 @@ def get_database_path() -> Path:
 
 def resource_path(*relative_parts: str) -> Path:
     return RESOURCE_BASE_DIR.joinpath(*relative_parts)
+
+
+def get_slow_query_threshold_ms() -> float:
+    env_value = os.getenv("MECSIS_SLOW_QUERY_MS")
+    try:
+        return float(env_value) if env_value else 200.0
+    except ValueError:
+        return 200.0
+
+
+def get_fetch_batch_size() -> int:
+    env_value = os.getenv("MECSIS_FETCH_BATCH_SIZE")
+    try:
+        return max(1, int(env_value)) if env_value else 500
+    except ValueError:
+        return 500
+
+
+def _env_number(name: str, default: float) -> float:
+    env_value = os.getenv(name)
+    try:
+        return float(env_value) if env_value else default
+    except ValueError:
+        return default
+
+
+def get_backup_dir() -> Path:
+    env_path = os.getenv("MECSIS_BACKUP_DIR")
+    backup_dir = Path(env_path) if env_path else get_database_path().parent / "backups"
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    return backup_dir
+
+
+def get_backup_settings() -> dict:
+    return {
+        "interval_hours": _env_number("MECSIS_BACKUP_INTERVAL_HOURS", 12),
+        "keep": max(1, int(_env_number("MECSIS_BACKUP_KEEP", 7))),
+        "pages_per_step": max(1, int(_env_number("MECSIS_BACKUP_PAGES_PER_STEP", 256))),
+    }
+
+
+def get_archive_dir(create: bool = True) -> Path:
+    # create=False only looks the path up, for readers that must not leave an empty folder behind.
+    env_path = os.getenv("MECSIS_ARCHIVE_DIR")
+    archive_dir = Path(env_path) if env_path else get_database_path().parent / "archive"
+    if create:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+    return archive_dir
+
+
+def get_write_settings() -> dict:
+    return {
+        "busy_timeout_ms": max(0, int(_env_number("MECSIS_BUSY_TIMEOUT_MS", 5000))),
+        "retries": max(0, int(_env_number("MECSIS_WRITE_RETRIES", 5))),
+        "retry_base_ms": max(1.0, _env_number("MECSIS_RETRY_BASE_MS", 50)),
+        "retry_max_ms": max(1.0, _env_number("MECSIS_RETRY_MAX_MS", 2000)),
+    }
+
+
+# truncate and persist are per connection and would need a PRAGMA on every open; they are not offered.
+JOURNAL_MODES = ("delete", "wal")
+
+
+def get_journal_mode() -> Optional[str]:
+    env_value = (os.getenv("MECSIS_JOURNAL_MODE") or "").strip().lower()
+    return env_value if env_value in JOURNAL_MODES else None
+
+
+def get_pool_size() -> int:
+    return max(0, int(_env_number("MECSIS_DB_POOL_SIZE", 0)))
+
+
+def get_server_url() -> Optional[str]:
+    env_value = (os.getenv("MECSIS_SERVER_URL") or "").strip()
+    return env_value.rstrip("/") or None
+
+
+def get_server_token() -> Optional[str]:
+    return os.getenv("MECSIS_SERVER_TOKEN") or None
+
+
+def get_change_log_keep() -> int:
+    return max(1000, int(_env_number("MECSIS_CHANGE_LOG_KEEP", 200_000)))
+
+
+def get_watch_interval_ms() -> int:
+    return max(0, int(_env_number("MECSIS_WATCH_INTERVAL_MS", 1500)))
+
+
+def get_commission_rate() -> float:
+    # Share of the billed labor paid as commission; 0.05 means 5%.
+    return max(0.0, _env_number("MECSIS_COMMISSION_RATE", 0.05))
+
+
+def get_search_budget_ms() -> float:
+    # Time the toolbar search may spend in the database before answering with what it has.
+    return max(10.0, _env_number("MECSIS_SEARCH_BUDGET_MS", 150))
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator
+
+from .config import get_slow_query_threshold_ms
+
+
+class TimingSeries:
+    def __init__(self, max_samples: int = 1024) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def add(self, elapsed_ms: float, failed: bool = False) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if failed:
+            self.errors += 1
+        self.samples.append(elapsed_ms)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, slow_query_limit: int = 50) -> None:
+        self._lock = threading.Lock()
+        self._timings: Dict[str, TimingSeries] = {}
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, float] = {}
+        self._cache: Dict[str, Dict[str, int]] = {}
+        self._slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_query_limit)
+        self.slow_query_threshold_ms = get_slow_query_threshold_ms()
+
+    def record_timing(self, name: str, elapsed_ms: float, failed: bool = False) -> None:
+        with self._lock:
+            series = self._timings.get(name)
+            if series is None:
+                series = self._timings[name] = TimingSeries()
+            series.add(elapsed_ms, failed)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except GeneratorExit:
+            raise
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record_timing(name, (time.perf_counter() - started) * 1000, failed)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def adjust_gauge(self, name: str, delta: float) -> float:
+        with self._lock:
+            value = self._gauges.get(name, 0) + delta
+            self._gauges[name] = value
+            peak_name = f"{name}.peak"
+            if value > self._gauges.get(peak_name, 0):
+                self._gauges[peak_name] = value
+            return value
+
+    def record_cache(self, name: str, hit: bool) -> None:
+        with self._lock:
+            stats = self._cache.setdefault(name, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def record_query(self, sql: str, elapsed_ms: float) -> None:
+        self.incr("db.queries")
+        if elapsed_ms < self.slow_query_threshold_ms:
+            return
+        with self._lock:
+            self._slow_queries.append(
+                {
+                    "sql": " ".join(sql.split()),
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "at": datetime.now().isoformat(timespec="seconds"),
+                }
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            methods = {name: series.as_dict() for name, series in sorted(self._timings.items())}
+            cache = {}
+            for name, stats in sorted(self._cache.items()):
+                total = stats["hits"] + stats["misses"]
+                cache[name] = {
+                    **stats,
+                    "hit_rate": round(stats["hits"] / total, 4) if total else 0.0,
+                }
+            return {
+                "timings": methods,
+                "counters": dict(sorted(self._counters.items())),
+                "gauges": dict(sorted(self._gauges.items())),
+                "cache": cache,
+                "slow_queries": list(reversed(self._slow_queries)),
+                "slow_query_threshold_ms": self.slow_query_threshold_ms,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self._cache.clear()
+            self._slow_queries.clear()
+            for name in [key for key in self._gauges if key.endswith(".peak")]:
+                self._gauges[name] = self._gauges.get(name[: -len(".peak")], 0)
+
+
+metrics = MetricsRegistry()
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def generator_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with metrics.track(name):
+                    yield from func(*args, **kwargs)
+
+            wrapper = generator_wrapper
+        else:
+
+            @functools.wraps(func)
+            def call_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with metrics.track(name):
+                    return func(*args, **kwargs)
+
+            wrapper = call_wrapper
+        wrapper.__metric_name__ = name  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def instrument_class(cls: type) -> type:
+    seen = set()
+    for klass in cls.__mro__:
+        if klass is object:
+            continue
+        for attr_name, attr in vars(klass).items():
+            if attr_name.startswith("_") or attr_name in seen:
+                continue
+            seen.add(attr_name)
+            if not inspect.isfunction(attr):
+                continue
+            original = getattr(attr, "__wrapped__", attr) if hasattr(attr, "__metric_name__") else attr
+            setattr(cls, attr_name, timed(f"{cls.__name__}.{attr_name}")(original))
+    return cls
+
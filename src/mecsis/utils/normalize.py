@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, Set
+
+_NON_DIGITS = re.compile(r"\D+")
+_NON_ALNUM = re.compile(r"[^0-9A-Za-z]+")
+
+
+def digits_only(value: Any) -> str:
+    return _NON_DIGITS.sub("", str(value or ""))
+
+
+def normalize_document(value: Any) -> str:
+    text = str(value or "").strip()
+    digits = digits_only(text)
+    return digits if digits else text.upper()
+
+
+def normalize_plate(value: Any) -> str:
+    return _NON_ALNUM.sub("", str(value or "")).upper()
+
+
+def plate_key(value: Any) -> str:
+    # Mercosul plates (ABC1C34) swap the fifth digit for a letter, A=0 ... J=9; keying both
+    # formats by the old layout lets a re-plated car match either way. Works on partial input too.
+    plate = normalize_plate(value)
+    if len(plate) >= 5 and plate[:3].isalpha() and plate[3].isdigit() and "A" <= plate[4] <= "J":
+        plate = f"{plate[:4]}{ord(plate[4]) - ord('A')}{plate[5:]}"
+    return plate
+
+
+def normalize_name(value: Any) -> str:
+    return " ".join(str(value or "").split())
+
+
+def fold_text(value: Any) -> str:
+    # Accent- and case-insensitive form used by the fuzzy client search ("Gonçalves" -> "goncalves").
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
+
+
+def trigrams(folded: str, pad_end: bool = True) -> Set[str]:
+    padded = f" {folded} " if pad_end else f" {folded}"
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def prefix_distance(query: str, text: str, limit: int) -> int:
+    # Smallest Levenshtein distance between query and any prefix of text, giving up past limit.
+    previous = list(range(len(text) + 1))
+    for row, query_char in enumerate(query, start=1):
+        current = [row] + [0] * len(text)
+        for column, text_char in enumerate(text, start=1):
+            current[column] = min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (query_char != text_char),
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous)